@@ -21,6 +21,9 @@ Obsługiwane nazwy plików logo:
 Logo zostanie automatycznie przeskalowane i wyświetlone w lewym górnym rogu aplikacji.
 """
 
+import time
+# początek importu modułu - pierwsza faza w podsumowaniu czasu startu
+STARTUP_T0 = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime, date, timedelta
@@ -28,8 +31,18 @@ import calendar
 import traceback
 from dataclasses import dataclass
 from typing import List, Optional, Dict
+from collections import OrderedDict
+from bisect import bisect_left, insort
+from heapq import merge
+from decimal import Decimal, ROUND_HALF_UP
 import sys, os, json
 import re
+import sqlite3
+import threading
+import copy
+import importlib
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 
 # Poprawka dla PyInstaller - określenie base path
 def resource_path(relative_path):
@@ -75,29 +88,45 @@ def create_btn(owner, parent, **kwargs):
         style = 'TButton'
     return ttk.Button(parent, style=style, **kwargs)
 
-# optional dependency for Excel import
-try:
-    import openpyxl
-except Exception:
-    openpyxl = None
-# optional PDF export dependency
-try:
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.lib import colors
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-    from reportlab.lib.utils import ImageReader
-    from reportlab.lib.styles import getSampleStyleSheet
-    REPORTLAB_AVAILABLE = True
-except Exception:
-    REPORTLAB_AVAILABLE = False
+# optional dependencies imported on first use (openpyxl - Excel import, reportlab - PDF
+# export, ttkbootstrap - styles); a failed import is remembered as None
+_LAZY_MODULES: Dict[str, object] = {}
 
-# optional ttkbootstrap for nicer native styles
+def lazy_import(name: str):
+    """Moduł opcjonalnej zależności importowany przy pierwszym użyciu; None, gdy niedostępny."""
+    if name not in _LAZY_MODULES:
+        try:
+            _LAZY_MODULES[name] = importlib.import_module(name)
+        except Exception:
+            _LAZY_MODULES[name] = None
+    return _LAZY_MODULES[name]
+
+# optional NumPy for batch (vectorized) amortization of the whole portfolio
 try:
-    from ttkbootstrap import Style as TBStyle
-    TTKBOOTSTRAP_AVAILABLE = True
+    import numpy as np
+    NUMPY_AVAILABLE = True
 except Exception:
-    TBStyle = None
-    TTKBOOTSTRAP_AVAILABLE = False
+    np = None
+    NUMPY_AVAILABLE = False
+
+class StartupTimer:
+    """Czasy faz startu aplikacji (import, style, wczytywanie, GUI) do podsumowania w konsoli."""
+    def __init__(self, t0: Optional[float] = None):
+        self._last = t0 if t0 is not None else time.perf_counter()
+        self.phases: Dict[str, float] = OrderedDict()
+
+    def mark(self, phase: str):
+        """Zamyka fazę trwającą od poprzedniego znacznika"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def add(self, phase: str, seconds: float):
+        """Faza mierzona osobno (np. wczytywanie w wątku w tle)"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def summary(self) -> str:
+        return " | ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases.items())
 
 APP_NAME = "RMK insGT"
 APP_VERSION = "v0.22.19"
@@ -404,176 +433,129 @@ def configure_single_treeview_borders(tree):
         except Exception as e:
             print(f"UWAGA Błąd konfiguracji podstawowej: {e}")
         
-        # Definiuj tagi z konkretnymi kolorami
-        tree.tag_configure('evenrow', background='#f8f9fa', foreground='black')
-        tree.tag_configure('oddrow', background='white', foreground='black')
-        
-        # Hook dla kolorowania wierszy
-        def colorize_rows(*args):
-            try:
-                items = tree.get_children()
-                for i, item in enumerate(items):
-                    current_tags = list(tree.item(item, 'tags'))
-                    
-                    # Zachowaj ważne tagi statusu (gen, ungen)
-                    important_tags = [tag for tag in current_tags if tag in ['gen', 'ungen']]
-                    
-                    # Jeśli ma ważny tag statusu, zachowaj go bez zmian
-                    if important_tags:
-                        continue
-                    
-                    # Dla pozostałych stosuj alternujące kolory
-                    tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-                    tree.item(item, tags=[tag])
-            except Exception as e:
-                print(f"Błąd kolorowania: {e}")
-        
-        # Binduj zdarzenia
-        tree.bind('<Map>', lambda e: colorize_rows())
-        tree.bind('<<TreeviewSelect>>', lambda e: tree.after_idle(colorize_rows))
+        # Naprzemienne kolory wierszy - tylko widoczny fragment tabeli
+        RowStriper.attach(tree)
         
         tree._rmk_bordered = True
         
-        # Zastosuj kolory natychmiast
-        colorize_rows()
-        
         print(f"OK Obramowania skonfigurowane dla tabeli (tylko alternujące kolory)")
         
     except Exception as e:
         print(f"UWAGA Błąd obramowań tabeli: {e}")
 
+def treeview_row_height(tree) -> int:
+    """Wysokość wiersza Treeview ze stylu (domyślnie 25 px jak w stylach SAP)"""
+    try:
+        return int(ttk.Style(tree).lookup(tree.cget('style') or 'Treeview', 'rowheight')) or 25
+    except Exception:
+        return 25
+
+class RowStriper:
+    """Naprzemienne tło wierszy Treeview liczone tylko dla widocznego fragmentu tabeli.
+
+    Striper podpina się pod yscrollcommand tabeli (zachowując dotychczasowe
+    polecenie, np. pasek przewijania) - Treeview wywołuje je po przewinięciu,
+    zmianie rozmiaru i liczby wierszy. Seria takich zdarzeń daje jedno
+    kolorowanie w after_idle, obejmujące wyłącznie wiersze w oknie. Wiersze
+    z tagiem statusu (gen/ungen) zachowują swoje kolory. Tabele, które same
+    kolorują wiersze, wyłączają striping przez RowStriper.disable(tree).
+    """
+    STATUS_TAGS = ('gen', 'ungen')
+    STRIPE_TAGS = ('evenrow', 'oddrow')
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.enabled = True
+        self.row_height = treeview_row_height(tree)
+        self._pending = None
+        self._chain = ''
+        self._command = tree.register(self._on_yscroll)
+        tree.tag_configure('evenrow', background='#f8f9fa', foreground='black')
+        tree.tag_configure('oddrow', background='white', foreground='black')
+        tree.bind('<Map>', self._on_map, add='+')
+        tree.bind('<Configure>', self.schedule, add='+')
+        self._hook()
+
+    @classmethod
+    def attach(cls, tree) -> Optional['RowStriper']:
+        """Striper tabeli (tworzony raz); None, gdy dla tej tabeli jest wyłączony"""
+        if getattr(tree, '_rmk_no_stripes', False):
+            return None
+        striper = getattr(tree, '_rmk_striper', None)
+        if striper is None:
+            striper = tree._rmk_striper = cls(tree)
+        return striper
+
+    @staticmethod
+    def disable(tree):
+        tree._rmk_no_stripes = True
+        striper = getattr(tree, '_rmk_striper', None)
+        if striper is not None:
+            striper.enabled = False
+            if striper._pending is not None:
+                tree.after_cancel(striper._pending)
+                striper._pending = None
+
+    def _hook(self):
+        # polecenie ustawione po utworzeniu stripera (np. pasek przewijania) zostaje wywoływane dalej
+        current = str(self.tree.cget('yscrollcommand'))
+        if current != self._command:
+            self._chain = current
+            self.tree.configure(yscrollcommand=self._command)
+
+    def _on_map(self, event=None):
+        if self.enabled:
+            self._hook()
+            self.schedule()
+
+    def _on_yscroll(self, first, last):
+        if self._chain:
+            self.tree.tk.eval(f"{self._chain} {first} {last}")
+        self.schedule()
+
+    def schedule(self, event=None):
+        """Kolorowanie przy najbliższej bezczynności - kolejne wywołania przed nim są łączone"""
+        if self.enabled and self._pending is None:
+            self._pending = self.tree.after_idle(self.stripe)
+
+    def stripe(self):
+        self._pending = None
+        tree = self.tree
+        if not self.enabled or not tree.winfo_ismapped():
+            return
+        height = tree.winfo_height()
+        # pierwszy widoczny wiersz - pod nagłówkiem kolumn
+        item = ''
+        for y in range(0, min(height, 4 * self.row_height), max(1, self.row_height // 2)):
+            item = tree.identify_row(y)
+            if item:
+                break
+        if not item:
+            return
+        index = tree.index(item)
+        for _ in range(height // self.row_height + 1):
+            tags = tree.item(item, 'tags') or ()
+            tags = (tags,) if isinstance(tags, str) else tuple(tags)
+            if not any(t in self.STATUS_TAGS for t in tags):
+                stripe = 'evenrow' if index % 2 == 0 else 'oddrow'
+                if stripe not in tags:
+                    tree.item(item, tags=[t for t in tags if t not in self.STRIPE_TAGS] + [stripe])
+            item = tree.next(item)
+            if not item:
+                break
+            index += 1
+
 def configure_treeview_borders(root):
-    """Dodaj faktyczne linie obramowania do tabel"""
+    """Podłącza kolorowanie wierszy widocznego fragmentu do wszystkich tabel (bez nakładki Canvas)"""
     try:
-        def apply_real_borders(widget):
+        def attach(widget):
             if isinstance(widget, ttk.Treeview):
-                print(f"🔲 Dodaję RZECZYWISTE obramowania dla tabeli")
-                
-                try:
-                    # 1. Konfiguruj samą tabelę
-                    widget.configure(
-                        selectmode='extended',
-                        background='gray',
-                        foreground='black', 
-                        fieldbackground='gray'
-                    )
-                    
-                    # 2. Alternujące kolory wierszy
-                    widget.tag_configure('evenrow', background="#b9cafa", foreground='black')
-                    widget.tag_configure('oddrow', background='white', foreground='black')
-                    
-                    def apply_row_colors():
-                        children = widget.get_children()
-                        for i, child in enumerate(children):
-                            tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-                            widget.item(child, tags=[tag])
-                    
-                    # 3. Hook tylko jeśli jeszcze nie ma
-                    if not hasattr(widget, '_rmk_bordered'):
-                        original_insert = widget.insert
-                        def new_insert(*args, **kwargs):
-                            result = original_insert(*args, **kwargs)
-                            widget.after_idle(apply_row_colors)
-                            return result
-                        widget.insert = new_insert
-                        
-                        original_delete = widget.delete  
-                        def new_delete(*args, **kwargs):
-                            result = original_delete(*args, **kwargs)
-                            widget.after_idle(apply_row_colors)
-                            return result
-                        widget.delete = new_delete
-                        
-                        widget._rmk_bordered = True
-                    
-                    # 4. Dodaj Canvas z liniami
-                    def add_border_canvas():
-                        try:
-                            parent = widget.master
-                            
-                            # Znajdź pozycję tabeli
-                            x = widget.winfo_x()
-                            y = widget.winfo_y()
-                            width = widget.winfo_width()
-                            height = widget.winfo_height()
-                            
-                            # Stwórz Canvas dla linii
-                            canvas = tk.Canvas(parent, 
-                                             width=width, height=height,
-                                             highlightthickness=0, bd=0,
-                                             bg='', takefocus=False)
-                            canvas.place(x=x, y=y)
-                            
-                            def draw_grid():
-                                try:
-                                    canvas.delete("border_line")
-                                    
-                                    # Pobierz aktualne wymiary
-                                    w = widget.winfo_width()
-                                    h = widget.winfo_height()
-                                    
-                                    if w > 10 and h > 10:
-                                        # Linie poziome (wiersze)
-                                        row_height = 25  # Wysokość wiersza
-                                        y_pos = row_height  # Zaczynaj po nagłówku
-                                        while y_pos < h:
-                                            canvas.create_line(0, y_pos, w, y_pos, 
-                                                             fill='#cccccc', width=1, 
-                                                             tags="border_line")
-                                            y_pos += row_height
-                                        
-                                        # Linie pionowe (kolumny)
-                                        if hasattr(widget, 'cget') and widget.cget('columns'):
-                                            cols = widget.cget('columns')
-                                            x_pos = 0
-                                            for col in cols:
-                                                try:
-                                                    col_width = widget.column(col, 'width')
-                                                    x_pos += col_width
-                                                    if x_pos < w:
-                                                        canvas.create_line(x_pos, 0, x_pos, h,
-                                                                         fill='#cccccc', width=1,
-                                                                         tags="border_line")
-                                                except:
-                                                    pass
-                                        
-                                        # Obramowanie zewnętrzne
-                                        canvas.create_rectangle(0, 0, w-1, h-1,
-                                                              outline='#999999', width=1,
-                                                              tags="border_line")
-                                        
-                                        print(f"OK Narysowano linie: {w}x{h}")
-                                        
-                                except Exception as e:
-                                    print(f"UWAGA Błąd rysowania linii: {e}")
-                            
-                            # Aktualizuj po zmianach
-                            widget.bind('<Configure>', lambda e: root.after_idle(draw_grid))
-                            widget.bind('<Map>', lambda e: root.after_idle(draw_grid))
-                            
-                            # Pierwsze rysowanie
-                            root.after(500, draw_grid)
-                            
-                        except Exception as e:
-                            print(f"UWAGA Błąd Canvas overlay: {e}")
-                    
-                    # Uruchom dodawanie Canvas z opóźnieniem
-                    root.after(300, add_border_canvas)
-                    
-                    # 5. Zastosuj kolory natychmiast
-                    apply_row_colors()
-                    
-                    print(f"OK Rzeczywiste obramowania dodane")
-                    
-                except Exception as e:
-                    print(f"UWAGA Błąd obramowań: {e}")
-            
-            # Rekurencyjnie
+                RowStriper.attach(widget)
             for child in widget.winfo_children():
-                apply_real_borders(child)
+                attach(child)
         
-        apply_real_borders(root)
-        print("OK Rzeczywiste obramowania tabel skonfigurowane")
+        attach(root)
+        print("OK Kolorowanie wierszy tabel skonfigurowane")
         
     except Exception as e:
         print(f"UWAGA Błąd konfiguracji obramowań: {e}")
@@ -583,14 +565,6 @@ def configure_treeview_tags(root):
     try:
         def configure_widget_tags(widget):
             if isinstance(widget, ttk.Treeview):
-                # Alternujące kolory wierszy - bardziej widoczne
-                widget.tag_configure('odd', 
-                                   background='#F8F8F8',   # Jasnoszary
-                                   foreground=BRAND_COLOR_TEXT)
-                widget.tag_configure('even', 
-                                   background='#FFFFFF',   # Biały
-                                   foreground=BRAND_COLOR_TEXT)
-                
                 # Kolory statusu - jasnozielone/czerwone tło z czarnym tekstem
                 widget.tag_configure('gen', 
                                    background='#d4edda',   # Jasnozielone tło
@@ -601,38 +575,8 @@ def configure_treeview_tags(root):
                                    foreground='#000000',   # Czarny tekst
                                    font=('Segoe UI', 9))
                 
-                # Dodaj automatyczne kolorowanie wierszy
-                def apply_alternating_colors():
-                    """Stosuje alternujące kolory do wszystkich wierszy, zachowując kolory statusu"""
-                    children = widget.get_children()
-                    for i, child in enumerate(children):
-                        current_tags = list(widget.item(child, 'tags'))
-                        
-                        # Zachowaj ważne tagi statusu
-                        important_tags = [tag for tag in current_tags if tag in ['gen', 'ungen']]
-                        
-                        # Jeśli ma ważny tag statusu, nie zmieniaj kolorów
-                        if important_tags:
-                            continue
-                            
-                        # Dla pozostałych wierszy stosuj alternujące kolory
-                        if i % 2 == 0:
-                            # Usuń stare tagi kolorów alternujących
-                            tags = [tag for tag in current_tags if tag not in ['odd', 'even']]
-                            tags.append('even')
-                            widget.item(child, tags=tags)
-                        else:
-                            # Usuń stare tagi kolorów alternujących
-                            tags = [tag for tag in current_tags if tag not in ['odd', 'even']]
-                            tags.append('odd')
-                            widget.item(child, tags=tags)
-                
-                # Zastosuj kolory przy zmianie zawartości
-                widget.bind('<<TreeviewOpen>>', lambda e: widget.after(10, apply_alternating_colors))
-                widget.bind('<<TreeviewClose>>', lambda e: widget.after(10, apply_alternating_colors))
-                
-                # Pierwsze zastosowanie
-                widget.after(100, apply_alternating_colors)
+                # Naprzemienne kolory wierszy - RowStriper, tylko widoczny fragment
+                RowStriper.attach(widget)
             
             # Rekurencyjnie przeglądaj dzieci
             for child in widget.winfo_children():
@@ -644,6 +588,498 @@ def configure_treeview_tags(root):
     except Exception as e:
         print(f"UWAGA  Błąd konfiguracji tagów Treeview: {e}")
 
+VIRTUAL_LIST_THRESHOLD = 1000  # powyżej tylu wierszy Treeview trzyma tylko widoczne okno
+
+class VirtualTreeview:
+    """Lista wierszy, z której w Treeview materializowane jest tylko widoczne okno.
+
+    rows - obiekty listy (np. RMKItem), row_fn(obj) -> (iid, values, tags).
+    Do threshold wierszy wszystkie trafiają do Treeview i działa zwykłe
+    przewijanie. Powyżej Treeview zawiera tylko wiersze mieszczące się
+    w oknie, a pasek przewijania, kółko myszy i klawisze przesuwają okno
+    po liście. Zaznaczenie pamiętane jest po iid, więc przetrwa przewinięcie.
+    """
+    def __init__(self, tree, scrollbar, row_fn, iid_fn=lambda obj: str(obj.id),
+                 threshold: int = VIRTUAL_LIST_THRESHOLD):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_fn = row_fn
+        self.iid_fn = iid_fn
+        self.threshold = threshold
+        self.rows = []
+        self._index: Dict[str, int] = {}
+        self.first = 0
+        self._selected: Dict[str, None] = {}  # zaznaczone iid (słownik zachowuje kolejność)
+        self._replace_selection = False
+        self._visible = 0
+        self.row_height = treeview_row_height(tree)
+        tree.configure(yscrollcommand=self._on_tree_yscroll)
+        scrollbar.configure(command=self.yview)
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<ButtonPress-1>', self._on_click, add='+')
+        for seq in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(seq, self._on_wheel, add='+')
+        for key, step, page in (('Up', -1, False), ('Down', 1, False),
+                                ('Prior', -1, True), ('Next', 1, True)):
+            tree.bind(f'<{key}>', lambda e, step=step, page=page: self._on_key(step, page), add='+')
+            # Shift rozszerza zaznaczenie - także o wiersze spoza okna
+            tree.bind(f'<Shift-{key}>', lambda e, step=step, page=page: self._on_key(step, page, True), add='+')
+        tree.bind('<Configure>', self._on_resize, add='+')
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def virtual(self) -> bool:
+        return len(self.rows) > self.threshold
+
+    def visible_rows(self) -> int:
+        """Liczba wierszy mieszczących się w tabeli (przed pierwszym wyświetleniem - opcja height)"""
+        try:
+            height = self.tree.winfo_height()
+        except Exception:
+            height = 0
+        if height > 2 * self.row_height:
+            # nagłówek kolumn zajmuje mniej więcej jeden wiersz
+            return height // self.row_height - 1
+        return max(1, int(self.tree.cget('height')))
+
+    def set_rows(self, rows):
+        """Podmienia całą listę wierszy; zaznaczenie pozycji, które zostały, jest zachowane"""
+        self.rows = list(rows)
+        self._index = {self.iid_fn(obj): i for i, obj in enumerate(self.rows)}
+        self._selected = {iid: None for iid in self._selected if iid in self._index}
+        self._render()
+
+    def add_row(self, obj):
+        """Dopisuje wiersz na końcu listy - wstawiany jest tylko, gdy trafia do widocznego okna"""
+        was_virtual = self.virtual
+        self._index[self.iid_fn(obj)] = len(self.rows)
+        self.rows.append(obj)
+        if self.virtual != was_virtual:
+            self._render()
+        elif not self.virtual:
+            iid, values, tags = self.row_fn(obj)
+            self.tree.insert('', 'end', iid=iid, values=values, tags=tags)
+        elif self.first + self._visible >= len(self.rows) - 1:
+            # okno pokazywało koniec listy - przesuwa się na nowy wiersz
+            self.scroll_to(len(self.rows))
+        else:
+            self.scrollbar.set(*self._fractions())
+
+    def update_row(self, obj):
+        """Nowe wartości i tagi jednego wiersza (bez zmiany pozycji na liście)"""
+        iid = self.iid_fn(obj)
+        pos = self._index.get(iid)
+        if pos is None:
+            return
+        self.rows[pos] = obj
+        if self.tree.exists(iid):
+            iid, values, tags = self.row_fn(obj)
+            self.tree.item(iid, values=values, tags=tags)
+
+    def remove_rows(self, iids):
+        """Usuwa wiersze - z Treeview znikają tylko one (albo przerysowuje się samo okno)"""
+        iids = [iid for iid in dict.fromkeys(iids) if iid in self._index]
+        if not iids:
+            return
+        was_virtual = self.virtual
+        positions = sorted((self._index.pop(iid) for iid in iids), reverse=True)
+        if len(positions) == 1:
+            del self.rows[positions[0]]
+        else:
+            gone = set(positions)
+            self.rows = [obj for i, obj in enumerate(self.rows) if i not in gone]
+        # pozycje przesuwają się dopiero od pierwszego usuniętego wiersza
+        for i in range(positions[-1], len(self.rows)):
+            self._index[self.iid_fn(self.rows[i])] = i
+        for iid in iids:
+            self._selected.pop(iid, None)
+        if was_virtual:
+            self._render()
+        else:
+            self.tree.delete(*[iid for iid in iids if self.tree.exists(iid)])
+
+    def get(self, iid: str):
+        """Obiekt wiersza o danym iid (także spoza widocznego okna)"""
+        pos = self._index.get(iid)
+        return self.rows[pos] if pos is not None else None
+
+    def values(self, iid: str) -> tuple:
+        return tuple(self.row_fn(self.rows[self._index[iid]])[1])
+
+    def selection(self) -> tuple:
+        """Zaznaczone iid w kolejności listy - także wiersze spoza widocznego okna"""
+        return tuple(sorted((iid for iid in self._selected if iid in self._index), key=self._index.get))
+
+    def scroll_to(self, first: int):
+        self.first = first
+        self._render()
+
+    def see(self, iid: str):
+        pos = self._index.get(iid)
+        if pos is None:
+            return
+        if self.virtual and not self.first <= pos < self.first + self._visible:
+            self.scroll_to(pos - self._visible // 2)
+        elif self.tree.exists(iid):
+            self.tree.see(iid)
+
+    def yview(self, *args):
+        """Polecenie paska przewijania: przewija okno wierszy zamiast samego Treeview"""
+        if not self.virtual:
+            return self.tree.yview(*args)
+        if not args:
+            return self._fractions()
+        if args[0] == 'moveto':
+            self.first = int(round(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= max(1, self._visible - 1)
+            self.first += step
+        self._render()
+
+    def _fractions(self):
+        total = len(self.rows) or 1
+        return self.first / total, min(1.0, (self.first + self._visible) / total)
+
+    def _render(self):
+        tree = self.tree
+        if self.virtual:
+            self._visible = self.visible_rows()
+            self.first = max(0, min(self.first, len(self.rows) - self._visible))
+            shown = self.rows[self.first:self.first + self._visible]
+        else:
+            self.first = 0
+            self._visible = len(self.rows)
+            shown = self.rows
+        tree.delete(*tree.get_children())
+        for obj in shown:
+            iid, values, tags = self.row_fn(obj)
+            tree.insert('', 'end', iid=iid, values=values, tags=tags)
+        self._replace_selection = False
+        shown_selected = [iid for iid in self._selected if tree.exists(iid)]
+        if shown_selected:
+            tree.selection_set(shown_selected)
+        if self.virtual:
+            self.scrollbar.set(*self._fractions())
+
+    def _on_tree_yscroll(self, *args):
+        if not self.virtual:
+            self.scrollbar.set(*args)
+
+    def _on_select(self, event=None):
+        tree = self.tree
+        if self._replace_selection:
+            selected = {}
+        else:
+            # zaznaczenie poza widocznym oknem zostaje
+            selected = {iid: None for iid in self._selected if not tree.exists(iid)}
+        self._replace_selection = False
+        selected.update((iid, None) for iid in tree.selection())
+        self._selected = selected
+
+    def _on_click(self, event):
+        # klik bez Shift/Ctrl zastępuje całe zaznaczenie
+        self._replace_selection = not (event.state & 0x0005)
+
+    def _on_wheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4 or (event.num != 5 and event.delta > 0):
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return 'break'
+
+    def _on_key(self, step: int, page: bool, extend: bool = False):
+        self._replace_selection = not extend
+        if not self.virtual:
+            return None
+        if page:
+            step *= max(1, self._visible - 1)
+        pos = self._index.get(self.tree.focus(), self.first)
+        target = max(0, min(pos + step, len(self.rows) - 1))
+        if not page and self.first <= target < self.first + self._visible:
+            return None  # w obrębie okna - zwykła obsługa Treeview
+        if target < self.first:
+            self.first = target
+        elif target >= self.first + self._visible:
+            self.first = target - self._visible + 1
+        iid = self.iid_fn(self.rows[target])
+        if extend:
+            lo, hi = min(pos, target), max(pos, target)
+            self._selected.update((self.iid_fn(obj), None) for obj in self.rows[lo:hi + 1])
+        else:
+            self._selected = {iid: None}
+        self._render()
+        self.tree.focus(iid)
+        return 'break'
+
+    def _on_resize(self, event=None):
+        if self.virtual and self.visible_rows() != self._visible:
+            self._render()
+
+class TreePopulator:
+    """Wstawia wiersze do Treeview porcjami w pętli zdarzeń Tk (after), bez blokowania okna.
+
+    Jedna porcja trwa najwyżej SLICE_MS, potem Tk obsługuje zdarzenia
+    i odrysowuje okno. rows może być generatorem - wtedy także formatowanie
+    wierszy rozkłada się na porcje. progress(done, total) raportuje postęp
+    (total None, gdy liczba wierszy nie jest znana), on_done() wywoływane jest
+    po ostatnim wierszu. cancel() przerywa wstawianie, np. przy ponownym
+    generowaniu raportu; zniszczenie tabeli przerywa je samo.
+    """
+    SLICE_MS = 30
+
+    def __init__(self, tree, rows, progress=None, on_done=None, clock=time.perf_counter):
+        self.tree = tree
+        self.total = len(rows) if hasattr(rows, '__len__') else None
+        self.done = 0
+        self.finished = False
+        self.cancelled = False
+        self.progress = progress
+        self.on_done = on_done
+        self._rows = iter(rows)
+        self._clock = clock
+        self._after = None
+
+    @property
+    def active(self) -> bool:
+        return not (self.finished or self.cancelled)
+
+    def start(self) -> 'TreePopulator':
+        """Pierwsza porcja od razu (widoczne wiersze bez czekania), kolejne w after()"""
+        self._step()
+        return self
+
+    def cancel(self):
+        if self._after is not None:
+            try:
+                self.tree.after_cancel(self._after)
+            except tk.TclError:
+                pass
+            self._after = None
+        if self.active:
+            self.cancelled = True
+            self._notify()
+
+    def _notify(self):
+        if self.progress is not None:
+            self.progress(self.done, self.total)
+
+    def _step(self):
+        self._after = None
+        if not self.active:
+            return
+        deadline = self._clock() + self.SLICE_MS / 1000.0
+        insert = self.tree.insert
+        exhausted = True
+        try:
+            for values in self._rows:
+                insert('', 'end', values=values)
+                self.done += 1
+                if self._clock() >= deadline:
+                    exhausted = False
+                    break
+        except tk.TclError:
+            # tabela zniszczona (nowy raport, zamknięte okno)
+            self.cancelled = True
+            self._notify()
+            return
+        if exhausted:
+            self.finished = True
+        self._notify()
+        if self.finished:
+            if self.on_done is not None:
+                self.on_done()
+        else:
+            self._after = self.tree.after(1, self._step)
+
+_SCHEDULE_ROW_KEYS = {'miesiac', 'kwota', 'kwota_gr', 'konto', 'konto_rmk', 'kategoria'}
+
+class CompactSchedule:
+    """Zapisany harmonogram pozycji w układzie kolumnowym.
+
+    Zamiast listy słowników powtarzających miesiąc, konta i kategorię dla
+    każdego miesiąca trzyma miesiąc startowy, tablicę kwot (albo groszy)
+    i konta raz na harmonogram. Dla kodu czytającego zachowuje się jak
+    dotychczasowa lista wierszy: iteracja, len() i indeksowanie zwracają
+    słowniki {'miesiac', 'kwota', ['kwota_gr'], 'konto', 'konto_rmk', 'kategoria'}.
+    """
+    __slots__ = ('start', 'kwoty', 'kwoty_gr', 'konto', 'konto_rmk', 'kategoria')
+
+    def __init__(self, start: int, kwoty=None, kwoty_gr=None, konto='', konto_rmk='', kategoria=''):
+        self.start = start
+        self.kwoty_gr = list(kwoty_gr) if kwoty_gr is not None else None
+        # w trybie groszowym kwota to zawsze grosze / 100 - nie jest zapisywana osobno
+        self.kwoty = list(kwoty) if kwoty is not None else [g / 100 for g in self.kwoty_gr]
+        self.konto = konto
+        self.konto_rmk = konto_rmk
+        self.kategoria = kategoria
+
+    @staticmethod
+    def _parse_month(label) -> Optional[int]:
+        try:
+            y, m = str(label).split('-')
+            return int(y) * 12 + int(m)
+        except (ValueError, AttributeError):
+            return None
+
+    @classmethod
+    def from_rows(cls, rows) -> Optional['CompactSchedule']:
+        """Harmonogram z wierszy w starym formacie; None, gdy wierszy nie da się zapisać kolumnowo."""
+        if isinstance(rows, CompactSchedule):
+            return rows
+        if not rows:
+            return None
+        first = rows[0]
+        start = cls._parse_month(first.get('miesiac'))
+        has_gr = 'kwota_gr' in first
+        if start is None:
+            return None
+        for i, r in enumerate(rows):
+            if (not _SCHEDULE_ROW_KEYS.issuperset(r) or ('kwota_gr' in r) != has_gr
+                    or cls._parse_month(r.get('miesiac')) != start + i
+                    or any(r.get(k) != first.get(k) for k in ('konto', 'konto_rmk', 'kategoria'))):
+                return None
+        kwoty = [r.get('kwota') for r in rows]
+        kwoty_gr = [r['kwota_gr'] for r in rows] if has_gr else None
+        if has_gr and all(k == g / 100 for k, g in zip(kwoty, kwoty_gr)):
+            kwoty = None
+        return cls(start, kwoty, kwoty_gr, first.get('konto'), first.get('konto_rmk'), first.get('kategoria'))
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'CompactSchedule':
+        return cls(cls._parse_month(d['od']), d.get('kwoty'), d.get('kwoty_gr'),
+                   d.get('konto', ''), d.get('konto_rmk', ''), d.get('kategoria', ''))
+
+    def to_dict(self) -> dict:
+        d = {'od': ordinal_label(self.start)}
+        if self.kwoty_gr is not None:
+            d['kwoty_gr'] = self.kwoty_gr
+            if any(k != g / 100 for k, g in zip(self.kwoty, self.kwoty_gr)):
+                d['kwoty'] = self.kwoty
+        else:
+            d['kwoty'] = self.kwoty
+        d.update(konto=self.konto, konto_rmk=self.konto_rmk, kategoria=self.kategoria)
+        return d
+
+    def row(self, i: int) -> Dict:
+        r = {'miesiac': ordinal_label(self.start + i), 'kwota': self.kwoty[i],
+             'konto': self.konto, 'konto_rmk': self.konto_rmk, 'kategoria': self.kategoria}
+        if self.kwoty_gr is not None:
+            r['kwota_gr'] = self.kwoty_gr[i]
+        return r
+
+    def rows(self) -> List[Dict]:
+        return [self.row(i) for i in range(len(self.kwoty))]
+
+    def __len__(self):
+        return len(self.kwoty)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self.kwoty)))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.row(j) for j in range(*i.indices(len(self.kwoty)))]
+        if i < 0:
+            i += len(self.kwoty)
+        if not 0 <= i < len(self.kwoty):
+            raise IndexError(i)
+        return self.row(i)
+
+    def __eq__(self, other):
+        if isinstance(other, (CompactSchedule, list)):
+            return self.rows() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompactSchedule(od={ordinal_label(self.start)!r}, miesięcy={len(self.kwoty)})"
+
+class LazySchedule:
+    """Harmonogram wczytywany przy pierwszym użyciu.
+
+    Przy starcie pozycje dostają tylko loader treści harmonogramu (zapisany
+    słownik/lista z data.json albo zapytanie do bazy SQLite); treść jest
+    dekodowana dopiero przy pierwszym odczycie (np. show_selected_harmonogram).
+    Niewczytany harmonogram jest zapisywany bez dekodowania (encoded()).
+
+    W magazynie SQLite treść jest czytana z bazy dopiero na żądanie. W data.json
+    json.load buduje cały dokument, więc odroczone jest tylko dekodowanie -
+    surowa treść harmonogramów i tak jest w pamięci od startu.
+    """
+    __slots__ = ('_loader', '_value')
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._value = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loader is None
+
+    def value(self):
+        if self._loader is not None:
+            self._value = decode_schedule(self._loader())
+            self._loader = None
+        return self._value
+
+    def encoded(self):
+        if self._loader is None:
+            return encode_schedule(self._value)
+        raw = self._loader()
+        if isinstance(raw, dict):
+            return raw
+        # stara lista wierszy - kodowana raz, kolejne zapisy biorą gotową postać
+        encoded = encode_schedule(raw)
+        self._loader = lambda: encoded
+        return encoded
+
+    def __len__(self):
+        return len(self.value())
+
+    def __iter__(self):
+        return iter(self.value())
+
+    def __getitem__(self, i):
+        return self.value()[i]
+
+    def __eq__(self, other):
+        if isinstance(other, LazySchedule):
+            other = other.value()
+        return self.value() == other
+
+    def __repr__(self):
+        return f"LazySchedule({self._value!r})" if self.loaded else "LazySchedule(<niewczytany>)"
+
+def decode_schedule(value):
+    """Harmonogram z data.json: układ kolumnowy albo stara lista wierszy (zamieniana, gdy się da)."""
+    if isinstance(value, LazySchedule):
+        return value.value()
+    if isinstance(value, dict):
+        return CompactSchedule.from_dict(value)
+    return CompactSchedule.from_rows(value) or list(value or [])
+
+def encode_schedule(value):
+    """Harmonogram do zapisu: układ kolumnowy, a gdy wiersze są nieregularne - lista wierszy."""
+    if isinstance(value, LazySchedule):
+        return value.encoded()
+    if not value:
+        return []
+    compact = CompactSchedule.from_rows(value)
+    return compact.to_dict() if compact is not None else list(value)
+
+def schedule_rows(value) -> List[Dict]:
+    """Wiersze harmonogramu niezależnie od formatu zapisu"""
+    if isinstance(value, LazySchedule):
+        return list(value)
+    if isinstance(value, dict):
+        return CompactSchedule.from_dict(value).rows()
+    return list(value or [])
+
 @dataclass
 class RMKItem:
     id: int
@@ -660,6 +1096,7 @@ class RMKItem:
     uwagi: str = ""
     data_koniec: Optional[date] = None
     harmonogram_generated: bool = False
+    # lista wierszy, CompactSchedule albo LazySchedule (zachowują się jak lista wierszy)
     harmonogram: Optional[List[Dict]] = None
     def to_dict(self):
         return {
@@ -677,7 +1114,7 @@ class RMKItem:
             'uwagi': self.uwagi,
             'data_koniec': self.data_koniec.isoformat() if self.data_koniec else None,
             'harmonogram_generated': bool(self.harmonogram_generated),
-            'harmonogram': self.harmonogram or []
+            'harmonogram': encode_schedule(self.harmonogram)
         }
     @staticmethod
     def from_dict(d):
@@ -696,9 +1133,572 @@ class RMKItem:
             uwagi=d.get('uwagi',''),
             data_koniec=datetime.fromisoformat(d['data_koniec']).date() if d.get('data_koniec') else None,
             harmonogram_generated=bool(d.get('harmonogram_generated', False)),
-            harmonogram=d.get('harmonogram', [])
+            harmonogram=RMKItem._lazy_schedule(d.get('harmonogram'))
         )
 
+    @staticmethod
+    def _lazy_schedule(value):
+        """Treść harmonogramu dekodowana dopiero przy pierwszym odczycie"""
+        if isinstance(value, LazySchedule):
+            return value
+        if not value:
+            return []
+        return LazySchedule(lambda: value)
+
+class CompanyItemStore:
+    """Pozycje RMK podzielone na kubełki wg firmy, z indeksem id.
+
+    Pozycje bez firmy trafiają do kubełka "" i są widoczne w każdej firmie
+    (tak jak w dotychczasowym filtrze list i raportów). Widok firmy składa
+    jej kubełek z kubełkiem "" w kolejności dodania pozycji, więc kosztuje
+    tylko pozycje tej firmy. Główna lista (RMKApp.rmk_items) pozostaje
+    źródłem zapisu; store jest z nią synchronizowany jak AggregateStore.
+
+    get() szuka pozycji po id w O(1), a allocate_id() nadaje kolejne id
+    z rosnącej sekwencji - id usuniętych pozycji nie są używane ponownie.
+    """
+    def __init__(self):
+        self._buckets: Dict[str, List[RMKItem]] = {}
+        # id pozycji -> (kolejność dodania, kubełek)
+        self._order: Dict[int, tuple] = {}
+        self._by_id: Dict[int, RMKItem] = {}
+        self._seq = 0
+        self.next_id = 1
+        self._source = None
+
+    def __len__(self):
+        return len(self._order)
+
+    @staticmethod
+    def _bucket_of(it) -> str:
+        return it.firma or ""
+
+    def get(self, item_id: int) -> Optional[RMKItem]:
+        return self._by_id.get(item_id)
+
+    def allocate_id(self) -> int:
+        """Następne wolne id pozycji (sekwencja nigdy nie maleje)."""
+        item_id = self.next_id
+        self.next_id += 1
+        return item_id
+
+    def add(self, it):
+        self.remove(it.id)
+        self._seq += 1
+        bucket = self._bucket_of(it)
+        self._order[it.id] = (self._seq, bucket)
+        self._by_id[it.id] = it
+        self._buckets.setdefault(bucket, []).append(it)
+        if it.id >= self.next_id:
+            self.next_id = it.id + 1
+
+    def remove(self, item_id: int):
+        self.remove_many([item_id])
+
+    def remove_many(self, item_ids):
+        """Usuwa pozycje - każdy dotknięty kubełek jest filtrowany jeden raz."""
+        by_bucket: Dict[str, set] = {}
+        for item_id in item_ids:
+            entry = self._order.pop(item_id, None)
+            if entry is not None:
+                self._by_id.pop(item_id, None)
+                by_bucket.setdefault(entry[1], set()).add(item_id)
+        for bucket, ids in by_bucket.items():
+            items = [it for it in self._buckets.get(bucket, []) if it.id not in ids]
+            if items:
+                self._buckets[bucket] = items
+            else:
+                self._buckets.pop(bucket, None)
+
+    def move(self, it):
+        """Po zmianie firmy pozycji - przenosi ją do właściwego kubełka (kolejność bez zmian)."""
+        entry = self._order.get(it.id)
+        if entry is None:
+            self.add(it)
+            return
+        bucket = self._bucket_of(it)
+        if bucket == entry[1]:
+            return
+        seq = entry[0]
+        self.remove(it.id)
+        self._order[it.id] = (seq, bucket)
+        self._by_id[it.id] = it
+        items = self._buckets.setdefault(bucket, [])
+        items.append(it)
+        items.sort(key=lambda x: self._order[x.id][0])
+
+    def rebuild(self, items):
+        self._buckets.clear()
+        self._order.clear()
+        self._by_id.clear()
+        self._seq = 0
+        for it in items:
+            self.add(it)
+        self._source = items
+
+    def track(self, items):
+        """Wskazuje listę pozycji, z którą kubełki są zgodne (np. po usunięciu pozycji)."""
+        self._source = items
+
+    def ensure(self, items):
+        """Przebudowuje kubełki, jeśli lista pozycji została podmieniona z pominięciem store."""
+        if items is not self._source or len(items) != len(self._order):
+            self.rebuild(items)
+        return self
+
+    def companies(self) -> List[str]:
+        """Firmy mające pozycje ("" - pozycje bez firmy)."""
+        return list(self._buckets)
+
+    def company_items(self, company: str = "") -> List[RMKItem]:
+        """Pozycje widoczne w firmie: jej własne i bez firmy; pusta firma - wszystkie."""
+        if not company:
+            return list(self._source) if self._source is not None else []
+        own = self._buckets.get(company, [])
+        shared = self._buckets.get("", []) if company != "" else []
+        if not shared:
+            return list(own)
+        return list(merge(own, shared, key=lambda it: self._order[it.id][0]))
+
+# ---- magazyn danych SQLite (alternatywa dla data.json) ----
+STORAGE_JSON = "json"
+STORAGE_SQLITE = "sqlite"
+# liczba wpisów dziennika zmian, po której data.json jest zapisywany od nowa
+JOURNAL_COMPACT_ENTRIES = 500
+
+# klucze stanu zapisywane w tabeli settings jako JSON
+_SQLITE_SETTINGS_KEYS = ('companies', 'categories', 'accounts', 'rmk_accounts', 'amortization_mode', 'next_item_id')
+_ITEM_COLUMNS = ('id', 'opis', 'data_start', 'liczba_mies', 'kwota', 'firma', 'kategoria', 'konto_kosztowe',
+                 'konto_rmk', 'numer_faktury', 'kontrahent', 'uwagi', 'data_koniec', 'harmonogram_generated')
+_SCHEDULE_COLUMNS = ('miesiac', 'kwota', 'kwota_gr', 'konto', 'konto_rmk', 'kategoria')
+
+class SQLiteStorage:
+    """Stan aplikacji w bazie SQLite - ten sam słownik stanu co data.json.
+
+    load() zwraca słownik w formacie data.json (rmk_items jako to_dict()),
+    więc _load_state obsługuje oba magazyny tak samo. save() zapisuje
+    w jednej transakcji tylko zmienione pozycje (wraz z ich wierszami
+    harmonogramu), usunięte pozycje oraz te sekcje ustawień, użytkowników
+    i kont, które zmieniły się od poprzedniego zapisu. Stan widoków
+    (view_state) ma osobną ścieżkę zapisu - save_view_state().
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            opis TEXT, data_start TEXT NOT NULL, liczba_mies INTEGER, kwota REAL,
+            firma TEXT, kategoria TEXT, konto_kosztowe TEXT, konto_rmk TEXT,
+            numer_faktury TEXT, kontrahent TEXT, uwagi TEXT, data_koniec TEXT,
+            harmonogram_generated INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_items_firma ON items(firma);
+        CREATE INDEX IF NOT EXISTS idx_items_kategoria ON items(kategoria);
+        CREATE INDEX IF NOT EXISTS idx_items_konto_rmk ON items(konto_rmk);
+        CREATE INDEX IF NOT EXISTS idx_items_data_start ON items(data_start);
+        CREATE TABLE IF NOT EXISTS schedule_rows (
+            item_id INTEGER NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+            pos INTEGER NOT NULL,
+            miesiac TEXT, kwota REAL, kwota_gr INTEGER, konto TEXT, konto_rmk TEXT, kategoria TEXT,
+            PRIMARY KEY (item_id, pos)
+        );
+        CREATE TABLE IF NOT EXISTS accounts (
+            firma TEXT NOT NULL, rodzaj TEXT NOT NULL, pos INTEGER NOT NULL, konto TEXT, opis TEXT,
+            PRIMARY KEY (firma, rodzaj, pos)
+        );
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY, password TEXT, is_admin INTEGER NOT NULL DEFAULT 0, companies TEXT
+        );
+        CREATE TABLE IF NOT EXISTS view_state (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+    """
+    # rodzaje kont w tabeli accounts -> klucz w słowniku stanu
+    ACCOUNT_KINDS = (('koszt', 'accounts_by_company'), ('rmk', 'rmk_accounts_by_company'))
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # zapisy idą z wątku StateSaver - dostęp do połączenia chroni blokada
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(self.SCHEMA)
+        # ostatnio zapisane sekcje (JSON) - niezmienione nie są zapisywane ponownie
+        self._written: Dict[str, str] = {}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._is_empty()
+
+    def _is_empty(self) -> bool:
+        row = self.conn.execute("SELECT (SELECT COUNT(*) FROM items) + (SELECT COUNT(*) FROM settings)").fetchone()
+        return row[0] == 0
+
+    def load(self, lazy_schedules: bool = False) -> dict:
+        """Stan w formacie data.json; lazy_schedules - wiersze harmonogramów czytane przy pierwszym użyciu."""
+        with self._lock:
+            return self._load(lazy_schedules)
+
+    def load_schedule(self, item_id: int) -> List[Dict]:
+        """Wiersze harmonogramu jednej pozycji (klucz główny schedule_rows)"""
+        with self._lock:
+            return [self._schedule_entry(row) for row in self.conn.execute(
+                "SELECT %s FROM schedule_rows WHERE item_id = ? ORDER BY pos" % ", ".join(_SCHEDULE_COLUMNS), (item_id,))]
+
+    @staticmethod
+    def _schedule_entry(row) -> Dict:
+        return {c: v for c, v in zip(_SCHEDULE_COLUMNS, row) if not (c == 'kwota_gr' and v is None)}
+
+    def _load(self, lazy_schedules: bool = False) -> dict:
+        conn = self.conn
+        obj = {}
+        for key, value in conn.execute("SELECT key, value FROM settings"):
+            obj[key] = json.loads(value)
+            self._written['settings:' + key] = value
+        users = {}
+        for username, password, is_admin, companies in conn.execute(
+                "SELECT username, password, is_admin, companies FROM users ORDER BY rowid"):
+            users[username] = {'password': password, 'is_admin': bool(is_admin),
+                               'companies': json.loads(companies) if companies else []}
+        if users:
+            obj['users'] = users
+            self._written['users'] = json.dumps(users, sort_keys=True)
+        for kind, key in self.ACCOUNT_KINDS:
+            by_company: Dict[str, List[Dict]] = {}
+            for firma, konto, opis in conn.execute(
+                    "SELECT firma, konto, opis FROM accounts WHERE rodzaj = ? ORDER BY firma, pos", (kind,)):
+                by_company.setdefault(firma, []).append({'konto': konto, 'opis': opis})
+            obj[key] = by_company
+            self._written[key] = json.dumps(by_company, sort_keys=True)
+        view_state = {}
+        for key, value in conn.execute("SELECT key, value FROM view_state"):
+            view_state[key] = json.loads(value)
+        obj['view_state'] = view_state
+        self._written['view_state'] = json.dumps(view_state, sort_keys=True)
+
+        rows_by_item: Dict[int, List[Dict]] = {}
+        if not lazy_schedules:
+            for row in conn.execute("SELECT item_id, %s FROM schedule_rows ORDER BY item_id, pos" % ", ".join(_SCHEDULE_COLUMNS)):
+                rows_by_item.setdefault(row[0], []).append(self._schedule_entry(row[1:]))
+        items = []
+        for row in conn.execute("SELECT %s FROM items ORDER BY rowid" % ", ".join(_ITEM_COLUMNS)):
+            d = dict(zip(_ITEM_COLUMNS, row))
+            d['harmonogram_generated'] = bool(d['harmonogram_generated'])
+            if lazy_schedules:
+                d['harmonogram'] = LazySchedule(lambda item_id=d['id']: self.load_schedule(item_id))
+            else:
+                d['harmonogram'] = rows_by_item.get(d['id'], [])
+            items.append(d)
+        obj['rmk_items'] = items
+        return obj
+
+    def _write_item(self, d: dict):
+        values = [d.get(c) for c in _ITEM_COLUMNS]
+        values[_ITEM_COLUMNS.index('harmonogram_generated')] = int(bool(d.get('harmonogram_generated')))
+        self.conn.execute(
+            "INSERT INTO items (%s) VALUES (%s) ON CONFLICT(id) DO UPDATE SET %s" % (
+                ", ".join(_ITEM_COLUMNS), ", ".join("?" * len(_ITEM_COLUMNS)),
+                ", ".join(f"{c} = excluded.{c}" for c in _ITEM_COLUMNS[1:])),
+            values)
+        self.conn.execute("DELETE FROM schedule_rows WHERE item_id = ?", (d['id'],))
+        self.conn.executemany(
+            "INSERT INTO schedule_rows (item_id, pos, %s) VALUES (?, ?, %s)" % (
+                ", ".join(_SCHEDULE_COLUMNS), ", ".join("?" * len(_SCHEDULE_COLUMNS))),
+            [(d['id'], pos) + tuple(r.get(c) for c in _SCHEDULE_COLUMNS) for pos, r in enumerate(schedule_rows(d.get('harmonogram')))])
+
+    def _write_meta(self, obj: dict):
+        conn = self.conn
+        for key in _SQLITE_SETTINGS_KEYS:
+            if key not in obj:
+                continue
+            value = json.dumps(obj[key], ensure_ascii=False)
+            if self._written.get('settings:' + key) != value:
+                conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+                self._written['settings:' + key] = value
+        users = obj.get('users', {})
+        value = json.dumps(users, sort_keys=True)
+        if self._written.get('users') != value:
+            conn.execute("DELETE FROM users")
+            conn.executemany("INSERT INTO users (username, password, is_admin, companies) VALUES (?, ?, ?, ?)",
+                             [(name, u.get('password'), int(bool(u.get('is_admin'))), json.dumps(u.get('companies', [])))
+                              for name, u in users.items()])
+            self._written['users'] = value
+        for kind, key in self.ACCOUNT_KINDS:
+            by_company = obj.get(key, {})
+            value = json.dumps(by_company, sort_keys=True)
+            if self._written.get(key) != value:
+                conn.execute("DELETE FROM accounts WHERE rodzaj = ?", (kind,))
+                conn.executemany("INSERT INTO accounts (firma, rodzaj, pos, konto, opis) VALUES (?, ?, ?, ?, ?)",
+                                 [(firma, kind, pos, a.get('konto'), a.get('opis'))
+                                  for firma, accs in by_company.items() for pos, a in enumerate(accs)])
+                self._written[key] = value
+
+    def _write_view_state(self, view_state: dict):
+        value = json.dumps(view_state, sort_keys=True)
+        if self._written.get('view_state') != value:
+            self.conn.execute("DELETE FROM view_state")
+            self.conn.executemany("INSERT INTO view_state (key, value) VALUES (?, ?)",
+                                  [(k, json.dumps(v, ensure_ascii=False)) for k, v in view_state.items()])
+            self._written['view_state'] = value
+
+    def save_view_state(self, view_state: dict):
+        """Zapis samego stanu widoków - bez dotykania pozycji i ustawień"""
+        with self._lock, self.conn:
+            self._write_view_state(view_state)
+
+    def save(self, obj: dict, items=(), deleted_ids=()):
+        """Zapisuje w jednej transakcji zmienione sekcje stanu, pozycje items (to_dict()) i usunięcia."""
+        with self._lock, self.conn:
+            self._write_meta(obj)
+            for d in items:
+                self._write_item(d)
+            deleted = [(item_id,) for item_id in deleted_ids]
+            if deleted:
+                self.conn.executemany("DELETE FROM schedule_rows WHERE item_id = ?", deleted)
+                self.conn.executemany("DELETE FROM items WHERE id = ?", deleted)
+
+    def save_all(self, obj: dict):
+        """Zapisuje pełny stan (słownik jak w data.json) - np. przy migracji."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM schedule_rows")
+            self.conn.execute("DELETE FROM items")
+            self._written.clear()
+            self._write_meta(obj)
+            self._write_view_state(obj.get('view_state', {}))
+            for d in obj.get('rmk_items', []):
+                self._write_item(d)
+
+    def migrate_from_json(self, json_path: str, journal_path: Optional[str] = None) -> bool:
+        """Jednorazowe przeniesienie data.json (wraz z dziennikiem zmian) do pustej bazy; pliki zostają jako kopia."""
+        if not os.path.exists(json_path) or not self.is_empty():
+            return False
+        with open(json_path, 'r', encoding='utf-8') as f:
+            obj = json.load(f)
+        if journal_path:
+            obj = ChangeJournal.replay(obj, ChangeJournal(journal_path).read())
+        self.save_all(obj)
+        return True
+
+    def backup_to(self, path: str):
+        """Spójna kopia bazy (sqlite3 backup API)."""
+        target = sqlite3.connect(path)
+        try:
+            with self._lock:
+                self.conn.backup(target)
+        finally:
+            target.close()
+
+def write_json_atomic(path: str, obj):
+    """Zapis JSON przez plik tymczasowy i os.replace - przerwany zapis nie psuje pliku."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class ChangeJournal:
+    """Dziennik zmian data.json - jedna operacja JSON na linię (append-only).
+
+    Operacje: add/edit/generate (pełna pozycja z to_dict()), delete (lista
+    id) i meta (stan bez pozycji). Operacje są idempotentne, więc dziennik
+    można odtwarzać na migawce, która już je zawiera (przerwane kompaktowanie).
+    Niedokończona ostatnia linia (awaria w trakcie zapisu) jest obcinana;
+    uszkodzony wpis w środku dziennika jest pomijany z ostrzeżeniem, a
+    następne wpisy są wczytywane dalej (plik zostaje bez zmian).
+    """
+    ITEM_OPS = ('add', 'edit', 'generate')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    def read(self) -> List[dict]:
+        entries = []
+        if not os.path.exists(self.path):
+            self.count = 0
+            return entries
+        good_end = 0
+        tail = b""
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # bez końca linii może być tylko ostatnia - zapis przerwany awarią
+                    tail = line
+                    break
+                good_end += len(line)
+                entry = self._parse(line)
+                if entry is not None:
+                    entries.append(entry)
+        if tail:
+            entry = self._parse(tail)
+            # kolejne wpisy nie mogą być doklejone do urwanej linii
+            with open(self.path, 'r+b') as f:
+                if entry is None:
+                    f.truncate(good_end)
+                else:
+                    entries.append(entry)
+                    f.seek(0, os.SEEK_END)
+                    f.write(b"\n")
+        self.count = len(entries)
+        return entries
+
+    def _parse(self, line: bytes) -> Optional[dict]:
+        if not line.strip():
+            return None
+        try:
+            return json.loads(line.decode('utf-8'))
+        except ValueError:
+            print(f"UWAGA Pomijam uszkodzony wpis dziennika: {self.path}")
+            return None
+
+    def append(self, entries: List[dict]):
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def truncate(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @classmethod
+    def replay(cls, obj: dict, entries: List[dict]) -> dict:
+        """Nakłada wpisy dziennika na słownik stanu w formacie data.json"""
+        items = obj.setdefault('rmk_items', [])
+        pos = {d['id']: i for i, d in enumerate(items)}
+        for entry in entries:
+            op = entry.get('op')
+            if op in cls.ITEM_OPS:
+                d = entry['item']
+                if d['id'] in pos:
+                    items[pos[d['id']]] = d
+                else:
+                    pos[d['id']] = len(items)
+                    items.append(d)
+            elif op == 'delete':
+                ids = set(entry.get('ids', []))
+                if ids & pos.keys():
+                    items[:] = [d for d in items if d['id'] not in ids]
+                    pos = {d['id']: i for i, d in enumerate(items)}
+            elif op == 'meta':
+                obj.update(entry.get('state', {}))
+        return obj
+
+class StateSaver:
+    """Zapis stanu w tle (write-behind) z opóźnieniem.
+
+    submit() tylko odkłada migawkę stanu i wraca od razu; wątek zapisujący
+    czeka, aż przez `delay` sekund nie przyjdzie nowa migawka, i zapisuje
+    ostatnią - seria zmian kończy się jednym zapisem. `merge(stara, nowa)`
+    łączy migawki, gdy nowa nie zastępuje starej w całości (zapis
+    pojedynczych pozycji w SQLite). flush() czeka na zapis zaległej migawki;
+    wywoływany przy wyjściu z programu (atexit).
+    """
+    RETRY_DELAY = 5.0
+
+    def __init__(self, write, delay: float = 0.5, merge=None):
+        self._write = write
+        self.delay = delay
+        self._merge = merge
+        self._cond = threading.Condition()
+        self._snapshot = None
+        self._has_snapshot = False
+        self._writing = False
+        self._due = 0.0
+        self._flush_now = False
+        self._closed = False
+        self._thread = None
+        self.last_error: Optional[Exception] = None
+        self._failures = 0
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> bool:
+        """Czy jest migawka czekająca na zapis lub zapisywana"""
+        with self._cond:
+            return self._has_snapshot or self._writing
+
+    def submit(self, snapshot):
+        with self._cond:
+            if self._has_snapshot and self._merge is not None:
+                snapshot = self._merge(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            self._has_snapshot = True
+            self._due = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="StateSaver", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_snapshot and not self._closed:
+                    self._cond.wait()
+                if not self._has_snapshot:
+                    return
+                while not (self._flush_now or self._closed):
+                    remaining = self._due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                snapshot = self._snapshot
+                self._snapshot = None
+                self._has_snapshot = False
+                self._writing = True
+            try:
+                self._write(snapshot)
+                self.last_error = None
+            except Exception as e:
+                print('Error saving state:', e)
+                # migawka wraca do kolejki (przed nowszymi zmianami) i czeka na ponowną próbę
+                with self._cond:
+                    self.last_error = e
+                    self._failures += 1
+                    if self._has_snapshot and self._merge is not None:
+                        snapshot = self._merge(snapshot, self._snapshot)
+                    elif self._has_snapshot:
+                        snapshot = self._snapshot
+                    self._snapshot = snapshot
+                    self._has_snapshot = not self._closed
+                    self._due = time.monotonic() + max(self.delay, self.RETRY_DELAY)
+                    self._flush_now = False
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Zapisuje zaległą migawkę od razu i czeka na koniec zapisu"""
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._flush_now = True
+            self._cond.notify_all()
+            failures = self._failures
+            done = self._cond.wait_for(lambda: not (self._has_snapshot or self._writing) or self._failures != failures,
+                                       timeout)
+            self._flush_now = False
+            return done and not (self._has_snapshot or self._writing)
+
+    def close(self):
+        self.flush(timeout=30)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
 def thousand_sep(value: float) -> str:
     """Format liczby: grupowanie tysięcy spacją, przecinek jako separator dziesiętny.
 
@@ -716,6 +1716,27 @@ def month_add(dt: date, months: int) -> date:
     d = min(dt.day, [31, 29 if y % 4 == 0 and (y % 100 != 0 or y % 400 == 0) else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][m - 1])
     return date(y, m, d)
 
+def month_ordinal(dt: date) -> int:
+    """Numer miesiąca (rok * 12 + miesiąc) - wewnętrzny klucz miesięcy w harmonogramach i agregacjach.
+
+    Kolejne miesiące mają kolejne numery, więc przesunięcie o n miesięcy to
+    dodanie n; daty i teksty 'YYYY-MM' powstają dopiero przy wyświetlaniu.
+    """
+    return dt.year * 12 + dt.month
+
+def ordinal_to_date(ordinal: int) -> date:
+    """Pierwszy dzień miesiąca o podanym numerze."""
+    y, m = divmod(ordinal - 1, 12)
+    return date(y, m + 1, 1)
+
+def ordinal_year(ordinal: int) -> int:
+    return (ordinal - 1) // 12
+
+def ordinal_label(ordinal: int) -> str:
+    """Tekst 'YYYY-MM' miesiąca o podanym numerze."""
+    y, m = divmod(ordinal - 1, 12)
+    return f"{y}-{m + 1:02d}"
+
 def calculate_monthly_amounts_improved(total_amount: float, start_date: date, num_months: int):
     """
     Ulepszone rozliczanie miesięczne:
@@ -780,11 +1801,1041 @@ def calculate_monthly_amounts_improved(total_amount: float, start_date: date, nu
     
     # Ostatni miesiąc - reszta kwoty
     amounts.append(round(remaining_amount, 2))
-    
+
     return amounts
 
+# ---- rozliczanie w całkowitych groszach ----
+AMORTIZATION_FLOAT = "float"    # kwoty float zaokrąglane do 0,01 (domyślnie)
+AMORTIZATION_GROSZE = "grosze"  # dokładna arytmetyka na liczbach całkowitych groszy
+AMORTIZATION_MODES = (AMORTIZATION_FLOAT, AMORTIZATION_GROSZE)
+
+def to_grosze(value) -> int:
+    """Kwota w złotych -> liczba groszy (połówki zaokrąglane od zera).
+
+    Liczy przez Decimal z tekstu liczby, więc np. 1.005 daje 101, a nie 100
+    jak int(round(1.005 * 100)).
+    """
+    return int((Decimal(str(value)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+def format_grosze(value: int) -> str:
+    """Format kwoty podanej w groszach, jak thousand_sep: 123456 -> '1 234,56'."""
+    return thousand_sep(value / 100)
+
+def _div_round(num: int, den: int) -> int:
+    """num / den zaokrąglone do liczby całkowitej (połówki od zera), den > 0."""
+    q, r = divmod(abs(num), den)
+    if 2 * r >= den:
+        q += 1
+    return q if num >= 0 else -q
+
+def _days_in_month(year: int, month: int) -> int:
+    return calendar.monthrange(year, month)[1]
+
+def calculate_monthly_amounts_grosze(total_grosze: int, start_date: date, num_months: int) -> List[int]:
+    """
+    Rozliczanie miesięczne w całkowitych groszach - ten sam podział co
+    calculate_monthly_amounts_improved, ale bez błędów zaokrągleń float:
+    - Pierwszy i ostatni miesiąc: proporcjonalnie do liczby dni
+    - Środkowe miesiące: stała kwota, przedostatni miesiąc domyka sumę
+    Suma harmonogramu zawsze równa się dokładnie total_grosze.
+    """
+    if num_months <= 0:
+        return []
+    if num_months == 1:
+        return [total_grosze]
+
+    first_total = _days_in_month(start_date.year, start_date.month)
+    first_used = first_total - start_date.day + 1
+    end_date = month_add(start_date, num_months - 1)
+    last_total = _days_in_month(end_date.year, end_date.month)
+    last_used = end_date.day
+
+    if num_months == 2:
+        first = _div_round(total_grosze * first_used, first_used + last_used)
+        return [first, total_grosze - first]
+
+    # Udziały jako ułamki o wspólnym mianowniku:
+    # kwota pełnego miesiąca = total * first_total * last_total / den
+    middle_months = num_months - 2
+    den = first_used * last_total + middle_months * first_total * last_total + last_used * first_total
+    first = _div_round(total_grosze * first_used * last_total, den)
+    middle = _div_round(total_grosze * first_total * last_total, den)
+    last = _div_round(total_grosze * last_used * first_total, den)
+    closing = total_grosze - first - middle * (middle_months - 1) - last
+    return [first] + [middle] * (middle_months - 1) + [closing, last]
+
+def calculate_item_schedule(it, mode: str = AMORTIZATION_FLOAT) -> list:
+    """Harmonogram pozycji w wybranym trybie: kwoty float albo grosze (int)."""
+    if mode == AMORTIZATION_GROSZE:
+        return calculate_monthly_amounts_grosze(to_grosze(it.kwota), it.data_start, int(it.liczba_mies))
+    return calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
+
+# ---- wsadowe (wektorowe) rozliczanie całego portfela ----
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+@dataclass
+class AmortizationMatrix:
+    """Macierz rozliczeń pozycja × miesiąc kalendarzowy.
+
+    Wiersz i odpowiada pozycji ids[i], kolumna c miesiącowi o numerze base + c
+    (patrz month_ordinal; base to pierwszy miesiąc portfela).
+    Pozycja i jest rozliczana w kolumnach offsets[i] .. offsets[i] + lengths[i] - 1,
+    pozostałe komórki wiersza są zerowe. W trybie AMORTIZATION_GROSZE macierz
+    jest typu int64 i zawiera grosze.
+    """
+    ids: List[int]
+    base: int
+    offsets: "np.ndarray"
+    lengths: "np.ndarray"
+    amounts: "np.ndarray"
+
+    @property
+    def width(self) -> int:
+        return int(self.amounts.shape[1])
+
+    def column_of(self, ordinal: int) -> int:
+        return ordinal - self.base
+
+    def ordinal(self, col: int) -> int:
+        return self.base + col
+
+    def month_label(self, col: int) -> str:
+        return ordinal_label(self.base + col)
+
+    def row(self, i: int) -> list:
+        off = int(self.offsets[i])
+        return self.amounts[i, off:off + int(self.lengths[i])].tolist()
+
+def _month_lengths(years, months):
+    """Liczba dni miesięcy (tablice NumPy roku i miesiąca 1-12)."""
+    table = np.array(_DAYS_IN_MONTH, dtype=np.int64)
+    leap = ((years % 4 == 0) & (years % 100 != 0)) | (years % 400 == 0)
+    return table[months - 1] + ((months == 2) & leap)
+
+def _round2_array(values):
+    """Wektorowy odpowiednik round(x, 2) dający identyczne wyniki jak wbudowany round.
+
+    rint(x * 100) / 100 różni się od round() tylko wtedy, gdy x * 100 leży
+    tuż przy połówce (błąd mnożenia przesuwa je na drugą stronę) - takie
+    nieliczne elementy zaokrąglamy skalarnie.
+    """
+    scaled = values * 100.0
+    result = np.rint(scaled) / 100.0
+    dist = np.abs(scaled - np.floor(scaled) - 0.5)
+    for i in np.nonzero(dist <= np.abs(scaled) * 1e-15 + 1e-9)[0]:
+        result[i] = round(float(values[i]), 2)
+    return result
+
+def _div_round_array(num, den):
+    """Wektorowy odpowiednik _div_round (tablice int64, den > 0)."""
+    return np.sign(num) * ((2 * np.abs(num) + den) // (2 * den))
+
+class ScheduleCache:
+    """Ograniczony (LRU) cache miesięcznych harmonogramów pozycji RMK.
+
+    Kluczem jest id pozycji, a wpis pamięta dane wejściowe rozliczenia
+    (kwota, data_start, liczba_mies) - zmieniona pozycja nigdy nie dostanie
+    nieaktualnego harmonogramu, nawet bez jawnego invalidate().
+    Wszystkie wpisy są liczone w jednym trybie rozliczania (mode).
+    """
+    def __init__(self, max_items: int = 200000, mode: str = AMORTIZATION_FLOAT):
+        self.max_items = max_items
+        self.mode = mode
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _inputs(it):
+        return (float(it.kwota), it.data_start, int(it.liczba_mies))
+
+    def lookup(self, it):
+        """Zwraca zapamiętany harmonogram pozycji albo None."""
+        entry = self._entries.get(it.id)
+        if entry is None or entry[0] != self._inputs(it):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(it.id)
+        self.hits += 1
+        return entry[1]
+
+    def store(self, it, schedule):
+        self._entries[it.id] = (self._inputs(it), schedule)
+        self._entries.move_to_end(it.id)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def get(self, it) -> list:
+        """Harmonogram pozycji jako lista kwot (liczony tylko przy braku w cache)."""
+        schedule = self.lookup(it)
+        if schedule is None:
+            schedule = calculate_item_schedule(it, self.mode)
+            self.store(it, schedule)
+        # wiersze z rozliczenia wsadowego to tablice numpy - zwracane jako int/float
+        return schedule.tolist() if hasattr(schedule, 'tolist') else list(schedule)
+
+    def invalidate(self, item_id: Optional[int] = None):
+        """Usuwa wpis pozycji; bez argumentu czyści cały cache."""
+        if item_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(item_id, None)
+
+def calculate_monthly_amounts_batch(items, cache: Optional[ScheduleCache] = None,
+                                    mode: str = AMORTIZATION_FLOAT) -> AmortizationMatrix:
+    """Rozlicza wszystkie pozycje naraz (NumPy) - wsadowa wersja calculate_monthly_amounts_improved.
+
+    Równoważność: dla każdej pozycji it = items[i]
+        matrix.row(i) == calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
+    bit w bit - wykonywane są te same operacje zmiennoprzecinkowe w tej samej
+    kolejności (także sekwencyjne odejmowanie reszty w miesiącach środkowych),
+    a zaokrąglenie odpowiada wbudowanemu round(x, 2). Funkcja skalarna pozostaje
+    implementacją wzorcową.
+
+    Tryb AMORTIZATION_GROSZE daje macierz int64 groszy zgodną wierszami
+    z calculate_monthly_amounts_grosze.
+
+    Z podanym cache liczone są tylko pozycje, których w nim brak; pozostałe
+    wiersze są jedynie składane z zapamiętanych harmonogramów. Tryb
+    rozliczania bierze się wtedy z cache.
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Rozliczanie wsadowe wymaga biblioteki numpy")
+    items = list(items)
+    if cache is not None:
+        mode = cache.mode
+    compute = _calculate_batch_matrix_grosze if mode == AMORTIZATION_GROSZE else _calculate_batch_matrix
+    dtype = np.int64 if mode == AMORTIZATION_GROSZE else np.float64
+    if cache is None:
+        return compute(items)
+    rows = [cache.lookup(it) for it in items]
+    missing = [i for i, r in enumerate(rows) if r is None]
+    if missing:
+        fresh = compute([items[i] for i in missing])
+        for j, i in enumerate(missing):
+            off = int(fresh.offsets[j])
+            rows[i] = fresh.amounts[j, off:off + int(fresh.lengths[j])].copy()
+            cache.store(items[i], rows[i])
+    n = len(items)
+    lengths = np.array([len(r) for r in rows], dtype=np.int64)
+    start = np.array([month_ordinal(it.data_start) for it in items], dtype=np.int64)
+    base = int(start.min()) if n else 0
+    offsets = start - base
+    width = int((offsets + lengths).max()) if n else 0
+    amounts = np.zeros((n, width), dtype=dtype)
+    total = int(lengths.sum())
+    if total:
+        row_idx = np.repeat(np.arange(n), lengths)
+        first_flat = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        col_idx = np.repeat(offsets, lengths) + np.arange(total) - first_flat
+        amounts[row_idx, col_idx] = np.concatenate([np.asarray(r, dtype=dtype) for r in rows if len(r)])
+    return AmortizationMatrix([it.id for it in items], base, offsets, lengths, amounts)
+
+def _batch_calendar(items):
+    """Wspólne dane kalendarzowe rozliczenia wsadowego.
+
+    Zwraca (lengths, base, offsets, width, first_total, first_used, last_total, last_used)
+    - liczby dni pierwszego i ostatniego miesiąca każdej pozycji.
+    """
+    n = len(items)
+    lengths = np.array([max(0, int(it.liczba_mies)) for it in items], dtype=np.int64)
+    years = np.array([it.data_start.year for it in items], dtype=np.int64)
+    months = np.array([it.data_start.month for it in items], dtype=np.int64)
+    days = np.array([it.data_start.day for it in items], dtype=np.int64)
+    start = years * 12 + months
+    base = int(start.min()) if n else 0
+    offsets = start - base
+    width = int((offsets + lengths).max()) if n else 0
+
+    # Pierwszy i ostatni miesiąc - dni wykorzystane / dni w miesiącu
+    first_total = _month_lengths(years, months)
+    first_used = first_total - days + 1
+    end = start + np.maximum(lengths, 1) - 1
+    end_years, end_months = (end - 1) // 12, (end - 1) % 12 + 1
+    last_total = _month_lengths(end_years, end_months)
+    last_used = np.minimum(days, last_total)
+    return lengths, base, offsets, width, first_total, first_used, last_total, last_used
+
+def _calculate_batch_matrix(items) -> AmortizationMatrix:
+    n = len(items)
+    kwota = np.array([float(it.kwota) for it in items], dtype=np.float64)
+    lengths, base, offsets, width, first_total, first_used, last_total, last_used = _batch_calendar(items)
+    amounts = np.zeros((n, width), dtype=np.float64)
+    if not n:
+        return AmortizationMatrix([], base, offsets, lengths, amounts)
+
+    # Jeden miesiąc - cała kwota
+    one = np.nonzero(lengths == 1)[0]
+    amounts[one, offsets[one]] = kwota[one]
+
+    # Dwa miesiące - podział proporcjonalny do dni
+    two = np.nonzero(lengths == 2)[0]
+    if two.size:
+        first = _round2_array(kwota[two] * first_used[two] / (first_used[two] + last_used[two]))
+        amounts[two, offsets[two]] = first
+        amounts[two, offsets[two] + 1] = _round2_array(kwota[two] - first)
+
+    # Więcej niż 2 miesiące - pozycje posortowane malejąco wg liczby miesięcy
+    # środkowych, aby w kroku j przetwarzać tylko prefiks wciąż aktywnych pozycji
+    many = np.nonzero(lengths > 2)[0]
+    if many.size:
+        middle = lengths[many] - 2
+        order = np.argsort(-middle, kind='stable')
+        idx = many[order]
+        middle = middle[order]
+        first_ratio = first_used[idx] / first_total[idx]
+        last_ratio = last_used[idx] / last_total[idx]
+        full = kwota[idx] / (first_ratio + middle + last_ratio)
+        first = _round2_array(full * first_ratio)
+        amounts[idx, offsets[idx]] = first
+        remaining = kwota[idx] - first
+        middle_amount = _round2_array(full)
+        last_estimate = _round2_array(full * last_ratio)
+        neg_middle = -middle
+        for j in range(int(middle[0])):
+            cnt = int(np.searchsorted(neg_middle, -j, side='left'))
+            this = middle_amount[:cnt].copy()
+            closing = np.nonzero(middle[:cnt] == j + 1)[0]
+            if closing.size:
+                this[closing] = _round2_array(remaining[closing] - last_estimate[closing])
+            remaining[:cnt] -= this
+            amounts[idx[:cnt], offsets[idx[:cnt]] + 1 + j] = this
+        amounts[idx, offsets[idx] + lengths[idx] - 1] = _round2_array(remaining)
+
+    return AmortizationMatrix([it.id for it in items], base, offsets, lengths, amounts)
+
+def _calculate_batch_matrix_grosze(items) -> AmortizationMatrix:
+    """Wsadowa wersja calculate_monthly_amounts_grosze (int64, bez pętli po miesiącach)."""
+    n = len(items)
+    kwota = np.array([to_grosze(it.kwota) for it in items], dtype=np.int64)
+    lengths, base, offsets, width, first_total, first_used, last_total, last_used = _batch_calendar(items)
+    amounts = np.zeros((n, width), dtype=np.int64)
+    if not n:
+        return AmortizationMatrix([], base, offsets, lengths, amounts)
+
+    one = np.nonzero(lengths == 1)[0]
+    amounts[one, offsets[one]] = kwota[one]
+
+    two = np.nonzero(lengths == 2)[0]
+    if two.size:
+        first = _div_round_array(kwota[two] * first_used[two], first_used[two] + last_used[two])
+        amounts[two, offsets[two]] = first
+        amounts[two, offsets[two] + 1] = kwota[two] - first
+
+    many = np.nonzero(lengths > 2)[0]
+    if many.size:
+        k = kwota[many]
+        ft, fu, lt, lu = first_total[many], first_used[many], last_total[many], last_used[many]
+        middle_months = lengths[many] - 2
+        den = fu * lt + middle_months * ft * lt + lu * ft
+        first = _div_round_array(k * fu * lt, den)
+        middle = _div_round_array(k * ft * lt, den)
+        last = _div_round_array(k * lu * ft, den)
+        off = offsets[many]
+        amounts[many, off] = first
+        # stała kwota w miesiącach środkowych poza ostatnim z nich
+        counts = middle_months - 1
+        total = int(counts.sum())
+        if total:
+            row_idx = np.repeat(many, counts)
+            first_flat = np.repeat(np.cumsum(counts) - counts, counts)
+            col_idx = np.repeat(off + 1, counts) + np.arange(total) - first_flat
+            amounts[row_idx, col_idx] = np.repeat(middle, counts)
+        amounts[many, off + lengths[many] - 2] = k - first - middle * counts - last
+        amounts[many, off + lengths[many] - 1] = last
+
+    return AmortizationMatrix([it.id for it in items], base, offsets, lengths, amounts)
+
+class IntervalIndex:
+    """Posortowany indeks przedziałów miesięcy [start, end] (numery z month_ordinal).
+
+    Wpisy są uporządkowane wg końca przedziału, więc zapytanie o zakres
+    od..do pomija bisekcją wszystko, co zakończyło się przed od - dawno
+    rozliczone pozycje nie kosztują nic przy raportach bieżących lat.
+    """
+    def __init__(self):
+        self._entries: List[tuple] = []  # (end, start, nr, klucz) rosnąco
+        self._spans: Dict[object, tuple] = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._spans)
+
+    def set(self, key, start: int, end: int):
+        """Dodaje lub zmienia przedział klucza."""
+        old = self._spans.get(key)
+        if old is not None:
+            if old[0] == end and old[1] == start:
+                return
+            self.discard(key)
+        self._seq += 1
+        entry = (end, start, self._seq, key)
+        insort(self._entries, entry)
+        self._spans[key] = entry
+
+    def span(self, key) -> Optional[tuple]:
+        """(start, end) przedziału klucza albo None."""
+        entry = self._spans.get(key)
+        return (entry[1], entry[0]) if entry is not None else None
+
+    def discard(self, key):
+        entry = self._spans.pop(key, None)
+        if entry is not None:
+            del self._entries[bisect_left(self._entries, entry)]
+
+    def overlapping(self, od: Optional[int] = None, do: Optional[int] = None) -> list:
+        """Klucze przedziałów mających część wspólną z od..do (None - bez ograniczenia)."""
+        i = bisect_left(self._entries, (od,)) if od else 0
+        return [e[3] for e in self._entries[i:] if not do or e[1] <= do]
+
+class AggregateStore:
+    """Bieżące sumy rozliczeń wg wymiarów pozycji i miesiąca (kostka OLAP).
+
+    Komórka to (firma, kategoria, konto_rmk, konto_kosztowe) × numer miesiąca
+    i przechowuje sumę w groszach oraz liczbę pozycji rozliczanych w tym
+    miesiącu. Dodanie, edycja i usunięcie pozycji zmieniają tylko jej
+    komórki (różnicowo), więc raporty czytają gotowe sumy - koszt zapytania
+    zależy od liczby komórek, a nie od liczby pozycji.
+
+    Sumy są trzymane w całkowitych groszach (kwoty harmonogramu float są
+    już zaokrąglone do 0,01), dzięki czemu odejmowanie przy edycji nie
+    zostawia błędów zaokrągleń. Zapytania: cube() / report_view() zwracają
+    CubeView z operacjami slice/dice/months/rollup.
+
+    Zmiany sum biorą lock; raporty liczone w wątkach roboczych trzymają go
+    na czas zapytania (zwracane MonthPrefix są już niezmienne). version
+    rośnie przy każdej zmianie sum - zapamiętane wyniki zapytań porównują
+    ją, żeby wiedzieć, czy są jeszcze aktualne.
+    """
+    DIMENSIONS = ('firma', 'kategoria', 'konto_rmk', 'konto_kosztowe')
+
+    def __init__(self, cache: ScheduleCache):
+        self.cache = cache
+        self._cells: Dict[tuple, Dict[int, list]] = {}
+        # id pozycji -> (wymiary, pierwszy miesiąc, kwoty w groszach)
+        self._contrib: Dict[int, tuple] = {}
+        # indeks wymiarów: dla każdego wymiaru wartość -> kombinacje wymiarów z komórkami
+        self._by_dim: List[Dict[object, set]] = [{} for _ in self.DIMENSIONS]
+        # sumy narastające kombinacji wymiarów (liczone przy pierwszym użyciu)
+        self._prefix: Dict[tuple, "MonthPrefix"] = {}
+        # firma -> indeks okresów rozliczania kombinacji (pierwszy..ostatni miesiąc)
+        self._periods: Dict[object, IntervalIndex] = {}
+        self._source = None
+        self.version = 0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._contrib)
+
+    def _grosze_schedule(self, it) -> tuple:
+        schedule = self.cache.get(it)
+        if self.cache.mode == AMORTIZATION_GROSZE:
+            return tuple(schedule)
+        return tuple(int(round(v * 100)) for v in schedule)
+
+    def _apply(self, dims: tuple, start: int, amounts: tuple, sign: int):
+        self.version += 1
+        self._prefix.pop(dims, None)
+        cells = self._cells.get(dims)
+        if cells is None:
+            cells = self._cells[dims] = {}
+            for index, value in zip(self._by_dim, dims):
+                index.setdefault(value, set()).add(dims)
+        for i, a in enumerate(amounts):
+            cell = cells.get(start + i)
+            if cell is None:
+                cell = cells[start + i] = [0, 0]
+            cell[0] += sign * a
+            cell[1] += sign
+            if cell[1] <= 0:
+                del cells[start + i]
+        periods = self._periods.get(dims[0])
+        if cells:
+            if periods is None:
+                periods = self._periods[dims[0]] = IntervalIndex()
+            periods.set(dims, *self._span(cells, periods.span(dims), start, start + len(amounts) - 1, sign))
+        elif periods is not None:
+            periods.discard(dims)
+            if not len(periods):
+                del self._periods[dims[0]]
+        if not cells:
+            del self._cells[dims]
+            for index, value in zip(self._by_dim, dims):
+                index[value].discard(dims)
+                if not index[value]:
+                    del index[value]
+
+    @staticmethod
+    def _span(cells: dict, old: Optional[tuple], first: int, last: int, sign: int) -> tuple:
+        """Okres kombinacji po zmianie miesięcy first..last - bez przeglądania wszystkich jej komórek.
+
+        Dodanie tylko poszerza okres; po odjęciu brzeg przesuwa się do
+        najbliższego zajętego miesiąca, gdy jego komórka zniknęła.
+        """
+        if old is None:
+            # nowa kombinacja - komórki to tylko miesiące tej pozycji
+            return min(cells), max(cells)
+        lo, hi = old
+        if first > last:
+            return lo, hi
+        if sign > 0:
+            return min(lo, first), max(hi, last)
+        while lo not in cells:
+            lo += 1
+        while hi not in cells:
+            hi -= 1
+        return lo, hi
+
+    def add(self, it):
+        """Dolicza pozycję (pozycja o tym samym id jest najpierw odejmowana)."""
+        with self.lock:
+            self.remove(it.id)
+            contrib = (tuple(getattr(it, d) for d in self.DIMENSIONS), month_ordinal(it.data_start),
+                       self._grosze_schedule(it))
+            self._contrib[it.id] = contrib
+            self._apply(*contrib, 1)
+
+    def update(self, it):
+        """Po edycji pozycji - odejmuje poprzedni wkład i dolicza bieżący."""
+        self.add(it)
+
+    def remove(self, item_id: int):
+        with self.lock:
+            contrib = self._contrib.pop(item_id, None)
+            if contrib is not None:
+                self._apply(*contrib, -1)
+
+    def rebuild(self, items):
+        """Liczy wszystkie sumy od nowa (po wczytaniu danych lub zmianie trybu)."""
+        with self.lock:
+            self.version += 1
+            self._cells.clear()
+            self._contrib.clear()
+            self._prefix.clear()
+            self._periods.clear()
+            for index in self._by_dim:
+                index.clear()
+            if NUMPY_AVAILABLE and items:
+                # wsadowo wypełnia cache harmonogramów, dalej są już tylko trafienia
+                calculate_monthly_amounts_batch(items, self.cache)
+            for it in items:
+                self.add(it)
+            self._source = items
+
+    def track(self, items):
+        """Wskazuje listę pozycji, z którą sumy są zgodne (np. po usunięciu pozycji)."""
+        with self.lock:
+            self._source = items
+
+    def ensure(self, items):
+        """Przebudowuje sumy, jeśli lista pozycji została podmieniona z pominięciem store."""
+        with self.lock:
+            if items is not self._source or len(items) != len(self._contrib):
+                self.rebuild(items)
+        return self
+
+    @property
+    def divisor(self) -> int:
+        """Dzielnik sum w groszach przy zwracaniu kwot (1 w trybie groszowym)."""
+        return 1 if self.cache.mode == AMORTIZATION_GROSZE else 100
+
+    def combination_prefix(self, dims: tuple) -> "MonthPrefix":
+        """Sumy narastające jednej kombinacji wymiarów (cache do następnej zmiany jej komórek)."""
+        prefix = self._prefix.get(dims)
+        if prefix is None:
+            cells = self._cells.get(dims, {})
+            prefix = self._prefix[dims] = MonthPrefix({m: cell[0] for m, cell in cells.items()}, self.divisor)
+        return prefix
+
+    def cube(self) -> "CubeView":
+        """Cała kostka - punkt wyjścia zapytań."""
+        return CubeView(self)
+
+    def report_view(self, firma: str = "", kategoria: str = "", konto_rmk: str = "") -> "CubeView":
+        """Wycinek z filtrami raportów.
+
+        firma pomija pozycje innych firm (pozycje bez firmy są zawsze
+        wliczane), kategoria jest porównywana bez wielkości liter i spacji
+        na brzegach, konto_rmk dokładnie (po obcięciu spacji). Puste
+        wartości nie filtrują.
+        """
+        view = self.cube()
+        if firma:
+            view = view.dice(firma={firma, "", None})
+        if kategoria:
+            kat = kategoria.casefold()
+            view = view.dice(kategoria=lambda k: str(k).strip().casefold() == kat)
+        if konto_rmk:
+            view = view.dice(konto_rmk=lambda k: str(k).strip() == konto_rmk)
+        return view
+
+class CubeView:
+    """Wycinek kostki AggregateStore; każda operacja zwraca nowy widok.
+
+    Kryterium wymiaru w dice() to wartość, zbiór/lista dopuszczalnych
+    wartości albo funkcja-predykat. Kryteria wartościowe korzystają
+    z indeksu wymiarów, więc wycinek jednej firmy nie przegląda pozostałych,
+    a zakres miesięcy - z indeksu okresów firm (IntervalIndex), więc
+    kombinacje rozliczone poza zakresem są pomijane.
+    """
+    def __init__(self, store: AggregateStore, criteria: tuple = (), od: Optional[int] = None,
+                 do: Optional[int] = None):
+        self.store = store
+        self._criteria = criteria
+        self.od = od
+        self.do = do
+
+    @staticmethod
+    def _dimension(name: str) -> int:
+        try:
+            return AggregateStore.DIMENSIONS.index(name)
+        except ValueError:
+            raise ValueError(f"Nieznany wymiar kostki: {name}")
+
+    def slice(self, dimension: str, value) -> "CubeView":
+        """Ustala jedną wartość wymiaru."""
+        return self.dice(**{dimension: value})
+
+    def dice(self, **criteria) -> "CubeView":
+        """Zawęża kilka wymiarów naraz, np. dice(firma={'A', 'B'}, kategoria='Najem')."""
+        added = tuple((self._dimension(d), c) for d, c in criteria.items())
+        return CubeView(self.store, self._criteria + added, self.od, self.do)
+
+    def months(self, od: Optional[int] = None, do: Optional[int] = None) -> "CubeView":
+        """Zawęża zakres miesięcy (numery z month_ordinal, oba wliczane)."""
+        if od and self.od:
+            od = max(od, self.od)
+        if do and self.do:
+            do = min(do, self.do)
+        return CubeView(self.store, self._criteria, od or self.od, do or self.do)
+
+    def _combinations(self):
+        candidates = None
+        for gi, c in self._criteria:
+            if callable(c):
+                continue
+            values = c if isinstance(c, (set, frozenset, list, tuple)) else (c,)
+            found = set()
+            for v in values:
+                found |= self.store._by_dim[gi].get(v, set())
+            candidates = found if candidates is None else candidates & found
+        if self.od or self.do:
+            firms = None
+            for gi, c in self._criteria:
+                if gi == 0 and not callable(c):
+                    values = set(c) if isinstance(c, (set, frozenset, list, tuple)) else {c}
+                    firms = values if firms is None else firms & values
+            periods = self.store._periods
+            indexes = periods.values() if firms is None else [periods[f] for f in firms if f in periods]
+            active = set()
+            for index in indexes:
+                active.update(index.overlapping(self.od, self.do))
+            candidates = active if candidates is None else candidates & active
+        if candidates is None:
+            candidates = self.store._cells.keys()
+        for dims in candidates:
+            ok = True
+            for gi, c in self._criteria:
+                v = dims[gi]
+                if callable(c):
+                    ok = c(v)
+                elif isinstance(c, (set, frozenset, list, tuple)):
+                    ok = v in c
+                else:
+                    ok = v == c
+                if not ok:
+                    break
+            if ok:
+                yield dims, self.store._cells[dims]
+
+    def rollup(self, *dimensions: str, by_year: bool = False) -> dict:
+        """Sumy {klucz: {okres: kwota}} zwinięte do podanych wymiarów.
+
+        Bez wymiarów kluczem jest "", z jednym - wartość wymiaru (puste jako
+        ""), z kilkoma - krotka wartości. Okresem jest numer miesiąca albo
+        rok (by_year=True). Okres pojawia się, gdy choć jedna pozycja jest
+        w nim rozliczana. W trybie groszowym kwoty są w groszach (int).
+        """
+        totals = self._rollup_grosze(dimensions, by_year)
+        divisor = self.store.divisor
+        if divisor == 1:
+            return totals
+        return {k: {p: v / divisor for p, v in per_period.items()} for k, per_period in totals.items()}
+
+    def _key(self, dims: tuple, idx: List[int]):
+        if not idx:
+            return ""
+        if len(idx) == 1:
+            return dims[idx[0]] or ""
+        return tuple(dims[i] for i in idx)
+
+    def _rollup_grosze(self, dimensions, by_year: bool = False) -> Dict[object, Dict[int, int]]:
+        idx = [self._dimension(d) for d in dimensions]
+        od, do = self.od, self.do
+        totals: Dict[object, Dict[int, int]] = {}
+        for dims, cells in self._combinations():
+            key = self._key(dims, idx)
+            target = None
+            if od and do and do - od + 1 < len(cells):
+                # wąski zakres (np. jeden rok) - tylko jego miesiące
+                in_range = ((m, cells[m]) for m in range(od, do + 1) if m in cells)
+            else:
+                in_range = cells.items()
+            for m, cell in in_range:
+                if od and m < od: continue
+                if do and m > do: continue
+                if target is None:
+                    target = totals.setdefault(key, {})
+                period = ordinal_year(m) if by_year else m
+                target[period] = target.get(period, 0) + cell[0]
+        return totals
+
+    def total(self):
+        """Suma całego wycinku."""
+        return sum(sum(per_period.values()) for per_period in self.rollup().values())
+
+    def prefix_sums(self, *dimensions: str) -> Dict[object, "MonthPrefix"]:
+        """Sumy narastające grup wycinka: {klucz: MonthPrefix}.
+
+        Liczone jednym przejściem po komórkach; potem suma dowolnego
+        zakresu miesięcy i wartość pojedynczego miesiąca to O(1) -
+        np. przy przewijaniu okna miesięcy raportu.
+        """
+        divisor = self.store.divisor
+        return {k: MonthPrefix(per_month, divisor) for k, per_month in self._rollup_grosze(dimensions).items()}
+
+class MonthPrefix:
+    """Sumy narastające jednej grupy po kolejnych miesiącach.
+
+    cum[i] to suma miesięcy base .. base + i - 1 (w groszach), więc suma
+    zakresu od..do i kwota miesiąca to jedna różnica. months to miesiące,
+    w których grupa ma rozliczane pozycje (rosnąco).
+    """
+    __slots__ = ('months', 'base', '_cum', '_divisor')
+
+    def __init__(self, per_month: Dict[int, int], divisor: int = 1):
+        self.months = sorted(per_month)
+        self.base = self.months[0] if self.months else 0
+        span = self.months[-1] - self.base + 1 if self.months else 0
+        cum = [0] * (span + 1)
+        running = 0
+        values = [0] * span
+        for m, v in per_month.items():
+            values[m - self.base] = v
+        for i, v in enumerate(values):
+            running += v
+            cum[i + 1] = running
+        self._cum = cum
+        self._divisor = divisor
+
+    def _bounds(self, od: Optional[int], do: Optional[int]):
+        span = len(self._cum) - 1
+        lo = 0 if not od else min(max(od - self.base, 0), span)
+        hi = span if not do else min(max(do - self.base + 1, 0), span)
+        return lo, hi
+
+    def raw_total(self, od: Optional[int] = None, do: Optional[int] = None) -> int:
+        """Suma zakresu w groszach."""
+        lo, hi = self._bounds(od, do)
+        return self._cum[hi] - self._cum[lo] if hi > lo else 0
+
+    def total(self, od: Optional[int] = None, do: Optional[int] = None):
+        """Suma miesięcy od..do (oba wliczane; None - bez ograniczenia)."""
+        v = self.raw_total(od, do)
+        return v if self._divisor == 1 else v / self._divisor
+
+    def at(self, month: int):
+        """Kwota jednego miesiąca."""
+        return self.total(month, month)
+
+LOGO_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+LOGO_FILENAMES = (
+    'RMK_insGT_logo.png', 'RMK insG.png',  # Konkretne nazwy z aplikacji
+    'logo.png', 'logo.jpg', 'logo.jpeg',   # Ogólne nazwy
+    'rmk.png', 'rmk.jpg', 'rmk.jpeg',      # RMK nazwy
+    'company_logo.png', 'firma_logo.png'   # Firmowe nazwy
+)
+
+class LogoCache:
+    """Jednorazowe wyszukanie logo do nagłówka okna i do PDF.
+
+    Wybrane pliki zapisywane są w logo_cache.json razem z mtime (i wymiarami
+    logo PDF), więc przy kolejnym starcie wystarczy os.stat zapisanej ścieżki.
+    Foldery przeszukiwane są ponownie dopiero, gdy plik zniknął lub się zmienił.
+    Przeskalowane warianty trzymane są w pamięci - kolejne eksporty PDF
+    nie sprawdzają już żadnych obrazów.
+    """
+    HEADER_MAX_HEIGHT = 40
+    PDF_MAX_WIDTH = 80
+    PDF_MIN_BYTES = 100
+    PDF_MIN_PIXELS = 10
+
+    def __init__(self, path: str, base_dir: str):
+        self.path = path
+        self.base_dir = base_dir
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._resolved = {}  # rodzaj -> wpis albo None (już ustalone w tej sesji)
+        self.header_image = None
+        self._pdf_variant = None
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def _cached(self, kind: str) -> Optional[dict]:
+        entry = self.entries.get(kind)
+        if entry and entry.get('path') and self._mtime(entry['path']) == entry.get('mtime'):
+            return entry
+        return None
+
+    def _store(self, kind: str, entry: Optional[dict]):
+        self._resolved[kind] = entry
+        if entry is None:
+            # brak logo nie jest zapisywany - dodany później plik zostanie znaleziony przy starcie
+            if self.entries.pop(kind, None) is None:
+                return
+        else:
+            self.entries[kind] = entry
+        try:
+            write_json_atomic(self.path, self.entries)
+        except OSError as e:
+            print(f"UWAGA Nie zapisano pamięci logo: {e}")
+
+    def _resolve(self, kind: str, find) -> Optional[dict]:
+        if kind in self._resolved:
+            return self._resolved[kind]
+        entry = self._cached(kind)
+        if entry is not None:
+            self._resolved[kind] = entry
+            return entry
+        entry = find()
+        if entry is not None:
+            entry['mtime'] = self._mtime(entry['path'])
+            print(f"OK Znaleziono logo ({kind}): {entry['path']}")
+        self._store(kind, entry)
+        return entry
+
+    def _header_locations(self) -> List[str]:
+        locations = [os.path.join(self.base_dir, 'logo'), self.base_dir]
+        home_dir = os.path.expanduser("~")
+        locations.append(home_dir)
+        if os.name == 'nt':
+            locations.append(os.path.join(home_dir, "Desktop"))
+        locations.append(os.path.join(home_dir, "Documents"))
+        return [d for d in locations if os.path.isdir(d)]
+
+    def _find_header(self) -> Optional[dict]:
+        for location in self._header_locations():
+            try:
+                for filename in LOGO_FILENAMES:
+                    candidate = os.path.join(location, filename)
+                    if os.path.exists(candidate):
+                        return {'path': candidate}
+                # dowolny plik graficzny z "logo" w nazwie
+                for filename in os.listdir(location):
+                    if filename.lower().endswith(LOGO_EXTENSIONS) and 'logo' in filename.lower():
+                        return {'path': os.path.join(location, filename)}
+            except OSError as e:
+                print(f"UWAGA Błąd sprawdzania {location}: {e}")
+        return None
+
+    def _find_pdf(self, size_of) -> Optional[dict]:
+        # największy poprawny plik z folderu logo/, potem typowe nazwy w katalogu aplikacji
+        best, best_size = None, 0
+        logo_dir = os.path.join(self.base_dir, 'logo')
+        if os.path.isdir(logo_dir):
+            for fn in os.listdir(logo_dir):
+                if not fn.lower().endswith(LOGO_EXTENSIONS):
+                    continue
+                candidate = os.path.join(logo_dir, fn)
+                try:
+                    file_size = os.path.getsize(candidate)
+                    if file_size <= self.PDF_MIN_BYTES or file_size <= best_size:
+                        continue
+                    iw, ih = size_of(candidate)
+                except Exception:
+                    continue
+                if iw > self.PDF_MIN_PIXELS and ih > self.PDF_MIN_PIXELS:
+                    best, best_size = {'path': candidate, 'size': [iw, ih]}, file_size
+        if best is not None:
+            return best
+        for fn in ('logo.png', 'logo.jpg', 'logo.jpeg'):
+            candidate = os.path.join(self.base_dir, fn)
+            if os.path.exists(candidate):
+                try:
+                    return {'path': candidate, 'size': list(size_of(candidate))}
+                except Exception:
+                    continue
+        return None
+
+    def header_path(self) -> Optional[str]:
+        """Ścieżka logo do nagłówka okna"""
+        entry = self._resolve('header', self._find_header)
+        return entry['path'] if entry else None
+
+    def pdf_logo(self, size_of):
+        """(ścieżka, szerokość, wysokość) logo nagłówka PDF przeskalowanego do PDF_MAX_WIDTH.
+
+        size_of(path) -> (w, h) wywoływane jest tylko wtedy, gdy logo trzeba wyszukać od nowa.
+        """
+        if self._pdf_variant is None:
+            entry = self._resolve('pdf', lambda: self._find_pdf(size_of))
+            if entry is None:
+                self._pdf_variant = False
+            else:
+                iw, ih = entry['size']
+                scale = min(1.0, float(self.PDF_MAX_WIDTH) / float(iw)) if iw > 0 else 1.0
+                self._pdf_variant = (entry['path'], iw * scale, ih * scale)
+        return self._pdf_variant or None
+
+class LazyTab(ttk.Frame):
+    """Strona notebooka budowana przy pierwszym wybraniu zakładki.
+
+    Buildery zakładek (_build_tab_*) dostają LazyTab zamiast notebooka:
+    ich ramka tworzona jako ttk.Frame(nb) i dodawana przez nb.add(...)
+    trafia do wnętrza tej strony, więc same buildery się nie zmieniają.
+    """
+    def __init__(self, notebook, builder):
+        super().__init__(notebook, style='Light.TFrame')
+        self.builder = builder
+        self.built = False
+
+    def add(self, child, **kwargs):
+        child.pack(fill=tk.BOTH, expand=True)
+
+    def build(self):
+        if not self.built:
+            self.built = True
+            self.builder(self)
+
+class ReportCancelled(Exception):
+    """Liczenie raportu przerwane - anulowane albo zastąpione nowym zleceniem"""
+
+class ReportJob:
+    """Jedno liczenie raportu w wątku roboczym.
+
+    compute(job) wywołuje job.check() między krokami, żeby anulowanie
+    zadziałało szybko. Wynik (result albo error) odbiera wątek Tk, gdy
+    done() zwróci True; anulowane zadanie nie przekazuje wyniku.
+    """
+    def __init__(self, key: str):
+        self.key = key
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise ReportCancelled(self.key)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def run(self, compute):
+        try:
+            self.check()
+            self.result = compute(self)
+        except ReportCancelled:
+            self._cancel.set()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+class ReportWorkers:
+    """Pula wątków liczących raporty poza wątkiem Tk.
+
+    Nowe zlecenie o tym samym kluczu (ponowne "Generuj") anuluje poprzednie,
+    które jeszcze się liczy. Pula tworzona jest przy pierwszym raporcie.
+    """
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self.jobs: Dict[str, ReportJob] = {}
+        self._executor = None
+
+    def submit(self, key: str, compute) -> ReportJob:
+        previous = self.jobs.get(key)
+        if previous is not None:
+            previous.cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='rmk-report')
+        job = self.jobs[key] = ReportJob(key)
+        self._executor.submit(job.run, compute)
+        return job
+
+    @property
+    def running(self) -> bool:
+        return any(not job.done() and not job.cancelled for job in self.jobs.values())
+
+    def cancel_all(self):
+        for job in self.jobs.values():
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+class StateLoader:
+    """Wczytywanie stanu w wątku w tle, gdy na ekranie są splash i logowanie.
+
+    read(on_meta) działa w wątku; meta_ready jest ustawiane, gdy znani są
+    użytkownicy i firmy (potrzebne do logowania), done - po zbudowaniu
+    wszystkich indeksów. Wynik lub wyjątek odbiera wątek Tk (RMKApp._finish_loading).
+    """
+    def __init__(self, read):
+        self.meta_ready = threading.Event()
+        self.done = threading.Event()
+        self.meta: Optional[dict] = None
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.elapsed = 0.0
+        self._read = read
+        self._thread = threading.Thread(target=self._run, name="StateLoader", daemon=True)
+        self._thread.start()
+
+    def _publish_meta(self, meta: dict):
+        self.meta = meta
+        self.meta_ready.set()
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            self.result = self._read(self._publish_meta)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.elapsed = time.perf_counter() - started
+            self.meta_ready.set()
+            self.done.set()
+
 class Splash(tk.Toplevel):
-    def __init__(self, master):
+    # splash bez zdarzenia gotowości znika po stałym czasie
+    DEFAULT_DELAY = 1200
+
+    def __init__(self, master, ready: Optional[threading.Event] = None):
         super().__init__(master)
         print(f"🌟 Debug splash - tworzę splash screen")
         print(f"🌟 Debug splash - kolory: BG={BRAND_COLOR_BG}, YELLOW={BRAND_COLOR_YELLOW}")
@@ -815,7 +2866,18 @@ class Splash(tk.Toplevel):
         tk.Label(self, text="Wczytywanie...", fg="#D0E3FF", bg=bg_color, font=("Segoe UI", 10)).pack(pady=20)
         
         print(f"🌟 Debug splash - etykiety utworzone")
-        self.after(1200, self.destroy)
+        if ready is None:
+            self.after(self.DEFAULT_DELAY, self.destroy)
+        else:
+            self._ready = ready
+            self._close_when_ready()
+
+    def _close_when_ready(self):
+        """Zamyka splash, gdy tylko dane potrzebne do logowania są wczytane"""
+        if self._ready.is_set():
+            self.destroy()
+        else:
+            self.after(30, self._close_when_ready)
 
 class LoginDialog(tk.Toplevel):
     def __init__(self, master, attempts_left: Optional[int] = None):
@@ -1229,6 +3291,8 @@ class CompanyDialog(simpledialog.Dialog):
 
 class RMKApp(tk.Tk):
     def __init__(self):
+        self.startup_timer = StartupTimer(STARTUP_T0)
+        self.startup_timer.mark('import')
         super().__init__()
         
         # Poprawka dla Windows - ustaw kodowanie konsoli
@@ -1258,15 +3322,21 @@ class RMKApp(tk.Tk):
             pass  # Ignoruj błędy z ikoną
         
         self._setup_style()
+        self.startup_timer.mark('style')
         self._init_data()
-        # load persisted state (if any)
-        self._load_state()
+        # load persisted state (if any) - w tle, podczas splash i logowania
+        self.state_loader = StateLoader(self._read_loaded_state)
+        self.startup_timer.mark('init')
 
         print(">>> Debug main - tworzę splash screen")
-        Splash(self)
+        splash = Splash(self, ready=self.state_loader.meta_ready)
         print(">>> Debug main - czekam na zamknięcie splash")
-        self.wait_window(self.winfo_children()[-1])
+        self.wait_window(splash)
         print(">>> Debug main - splash zamknięty")
+        # użytkownicy i firmy do okna logowania; pozycje i indeksy wczytują się dalej
+        if self.state_loader.meta is not None:
+            self.users = self.state_loader.meta['users']
+            self.companies = self.state_loader.meta['companies']
 
         # Keep the main window hidden until successful login
         max_attempts = 3
@@ -1333,7 +3403,10 @@ class RMKApp(tk.Tk):
                 pass
             sys.exit(0)
 
-        # successful login -> show main UI
+        # successful login -> show main UI (po zakończeniu wczytywania danych)
+        self.startup_timer.mark('splash+login')
+        self._finish_loading()
+        self.startup_timer.mark('load wait')
         self.deiconify()
         # set window title to include selected company (if any)
         try:
@@ -1358,6 +3431,8 @@ class RMKApp(tk.Tk):
             except Exception:
                 pass
             sys.exit(1)
+        self.startup_timer.mark('gui')
+        print(f"⏱️ Start aplikacji: {self.startup_timer.summary()}")
         self.update_status(f"Zalogowano: {self.current_user}{' (Admin)' if self.current_user_admin else ''}")
 
     def _init_data(self):
@@ -1367,6 +3442,27 @@ class RMKApp(tk.Tk):
         }
         self.companies: List[str] = ["IntegritasAD", "TestFirma"]
         self.rmk_items: List[RMKItem] = []
+        # pozycje podzielone wg firmy - widoki firm bez przeglądania całej listy
+        self.item_store = CompanyItemStore()
+        # tryb rozliczania: kwoty float albo dokładne grosze (AMORTIZATION_MODES)
+        self.amortization_mode = AMORTIZATION_FLOAT
+        # harmonogramy miesięczne pozycji liczone raz i używane przez wszystkie raporty
+        self.schedule_cache = ScheduleCache(mode=self.amortization_mode)
+        # sumy raportów aktualizowane różnicowo przy zmianach pozycji
+        self.aggregates = AggregateStore(self.schedule_cache)
+        # magazyn SQLite (None = data.json) i pozycje zmienione od ostatniego zapisu
+        self.storage: Optional[SQLiteStorage] = None
+        self._dirty_items: Dict[int, RMKItem] = {}
+        self._deleted_items: set = set()
+        # operacje dziennika (add/edit/generate) zmienionych pozycji - magazyn JSON
+        self._item_ops: Dict[int, str] = {}
+        self.journal: Optional[ChangeJournal] = None
+        self._journal_meta: Optional[str] = None
+        # zapis w tle - tworzony przy pierwszym _save_state dla bieżącego magazynu
+        self.saver: Optional[StateSaver] = None
+        self.view_saver: Optional[StateSaver] = None
+        # raporty liczone w puli wątków (pula tworzona przy pierwszym raporcie)
+        self.report_workers = ReportWorkers()
         self.categories = ["Ubezpieczenia", "Licencje", "Najem", "Subskrypcje"]
         
         # Konta kosztowe per firma
@@ -1444,44 +3540,181 @@ class RMKApp(tk.Tk):
             print(f"📂 PY używa pliku danych: {dev_path}")
             return dev_path
 
-    def _load_state(self):
+    def _journal_file(self):
+        """Dziennik zmian obok data.json"""
+        return os.path.splitext(self._state_file())[0] + '.journal.jsonl'
+
+    def _view_state_file(self):
+        """Stan widoków (filtry raportów, wybrany rok) obok data.json"""
+        return os.path.join(os.path.dirname(self._state_file()), 'view_state.json')
+
+    def _read_view_state(self, legacy: dict, storage: Optional[SQLiteStorage] = None) -> dict:
+        """view_state.json (magazyn JSON) albo tabela view_state; legacy - stan zapisany razem z danymi"""
+        if storage is not None:
+            return legacy
+        try:
+            with open(self._view_state_file(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return legacy
+
+    def _write_view_state(self, view_state: dict):
+        """Zapis stanu widoków w wątku zapisu"""
+        if self.storage is not None:
+            self.storage.save_view_state(view_state)
+        else:
+            write_json_atomic(self._view_state_file(), view_state)
+
+    def _save_view_state(self):
+        """Tania ścieżka zapisu stanu widoków - przeglądanie raportów nie zapisuje danych księgowych."""
+        if self.view_saver is None:
+            self.view_saver = StateSaver(self._write_view_state)
+        self.view_saver.submit(copy.deepcopy(getattr(self, 'view_state', {})))
+
+    def _db_file(self):
+        """Baza SQLite obok data.json"""
+        return os.path.join(os.path.dirname(self._state_file()), 'data.db')
+
+    def _storage_backend(self) -> str:
+        """RMK_STORAGE=json|sqlite wymusza magazyn; domyślnie SQLite, gdy baza już istnieje."""
+        backend = os.environ.get('RMK_STORAGE', '').strip().lower()
+        if backend in (STORAGE_JSON, STORAGE_SQLITE):
+            return backend
+        return STORAGE_SQLITE if os.path.exists(self._db_file()) else STORAGE_JSON
+
+    def _read_state(self) -> tuple:
+        """(słownik stanu albo None, gdy brak danych; magazyn: {'storage': ..., 'journal': ...}).
+
+        Magazyn nie jest przypisywany do aplikacji - robi to _apply_loaded_state w wątku Tk.
+        """
+        path = self._state_file()
+        if self._storage_backend() == STORAGE_SQLITE:
+            storage = SQLiteStorage(self._db_file())
+            backend = {'storage': storage, 'journal': None}
+            if storage.migrate_from_json(path, self._journal_file()):
+                print(f"OK Przeniesiono dane z {path} do {storage.path}")
+            if storage.is_empty():
+                return None, backend
+            # nagłówki pozycji od razu, wiersze harmonogramów przy pierwszym użyciu
+            return storage.load(lazy_schedules=True), backend
+        obj = None
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                obj = json.load(f)
+        # zmiany zapisane w dzienniku po ostatnim kompaktowaniu
+        journal = ChangeJournal(self._journal_file())
+        entries = journal.read()
+        if entries:
+            obj = ChangeJournal.replay(obj if obj is not None else {}, entries)
+            print(f"OK Odtworzono {len(entries)} zmian z dziennika {journal.path}")
+        return obj, {'storage': None, 'journal': journal}
+
+    def _read_loaded_state(self, on_meta=None) -> Optional[dict]:
+        """Odczyt stanu i budowa indeksów bez dotykania interfejsu - może działać w wątku StateLoader.
+
+        Zwraca gotowe atrybuty aplikacji (magazyn, pozycje, cache harmonogramów,
+        kostkę sum, podział wg firm); gdy brak danych - tylko magazyn. on_meta
+        dostaje użytkowników i firmy, gdy tylko są znane - wystarczą do logowania.
+        """
         path = self._state_file()
         print(f"🔄 Ładuję dane z: {path}")
+        obj, backend = self._read_state()
+        if obj is None:
+            print(f"UWAGA Plik danych nie istnieje: {path}")
+            return backend
+        meta = {'users': obj.get('users', self.users), 'companies': obj.get('companies', self.companies)}
+        if on_meta is not None:
+            on_meta(meta)
+        state = dict(meta, **backend,
+                     categories=obj.get('categories', self.categories),
+                     accounts=obj.get('accounts', self.accounts),
+                     rmk_accounts=obj.get('rmk_accounts', self.rmk_accounts),
+                     # Załaduj nowe struktury per firma
+                     accounts_by_company=obj.get('accounts_by_company', getattr(self, 'accounts_by_company', {})),
+                     rmk_accounts_by_company=obj.get('rmk_accounts_by_company', getattr(self, 'rmk_accounts_by_company', {})))
+
+        items = [RMKItem.from_dict(d) for d in obj.get('rmk_items', [])]
+        mode = obj.get('amortization_mode', AMORTIZATION_FLOAT)
+        mode = mode if mode in AMORTIZATION_MODES else AMORTIZATION_FLOAT
+        # Zapewnij kompatybilność wsteczną - dodaj puste uwagi do starych pozycji
+        for item in items:
+            if not hasattr(item, 'uwagi'):
+                item.uwagi = ""
+        # kostka sum raportów i podział wg firm liczone raz po wczytaniu pozycji
+        cache = ScheduleCache(mode=mode)
+        aggregates = AggregateStore(cache)
+        aggregates.rebuild(items)
+        item_store = CompanyItemStore()
+        item_store.rebuild(items)
+        item_store.next_id = max(item_store.next_id, int(obj.get('next_item_id', 1)))
+        state.update(rmk_items=items, amortization_mode=mode, schedule_cache=cache, aggregates=aggregates,
+                     item_store=item_store, view_state=self._read_view_state(obj.get('view_state', {}), backend['storage']))
+        return state
+
+    def _apply_loaded_state(self, state: Optional[dict]):
+        """Przypisuje stan przygotowany przez _read_loaded_state (wątek Tk)"""
+        if state is None:
+            return
+        for name, value in state.items():
+            setattr(self, name, value)
+        if 'rmk_items' not in state:
+            # brak danych - przypisany tylko magazyn
+            return
+        # Debug: sprawdź załadowane firmy
+        print(f"FIRMA Debug companies - załadowano z pliku: {self.companies}")
+        print(f"OK Załadowano dane - firm: {len(self.companies)}, użytkowników: {len(self.users)}")
+
+    def _load_state(self):
         try:
-            if os.path.exists(path):
-                with open(path, 'r', encoding='utf-8') as f:
-                    obj = json.load(f)
-                self.users = obj.get('users', self.users)
-                self.companies = obj.get('companies', self.companies)
-                self.categories = obj.get('categories', self.categories)
-                self.accounts = obj.get('accounts', self.accounts)
-                self.rmk_accounts = obj.get('rmk_accounts', self.rmk_accounts)
-                
-                # Załaduj nowe struktury per firma
-                self.accounts_by_company = obj.get('accounts_by_company', getattr(self, 'accounts_by_company', {}))
-                self.rmk_accounts_by_company = obj.get('rmk_accounts_by_company', getattr(self, 'rmk_accounts_by_company', {}))
-                
-                self.rmk_items = [RMKItem.from_dict(d) for d in obj.get('rmk_items', [])]
-                
-                # Zapewnij kompatybilność wsteczną - dodaj puste uwagi do starych pozycji
-                for item in self.rmk_items:
-                    if not hasattr(item, 'uwagi'):
-                        item.uwagi = ""
-                
-                self.view_state = obj.get('view_state', {})
-                
-                # Debug: sprawdź załadowane firmy
-                print(f"FIRMA Debug companies - załadowano z pliku: {self.companies}")
-                print(f"OK Załadowano dane - firm: {len(self.companies)}, użytkowników: {len(self.users)}")
-            else:
-                print(f"UWAGA Plik danych nie istnieje: {path}")
+            self._apply_loaded_state(self._read_loaded_state())
         except Exception as e:
             print(f"BŁĄD Błąd ładowania danych: {e}")
             print(f"FIRMA Debug companies - używam domyślnych: {self.companies}")
             # Jeśli nie można załadować, utwórz domyślne dane
 
-    def _save_state(self):
-        path = self._state_file()
+    def _finish_loading(self):
+        """Czeka (z działającą pętlą Tk) na StateLoader i przypisuje wczytany stan."""
+        loader = getattr(self, 'state_loader', None)
+        if loader is None:
+            return
+        self.state_loader = None
+        self._wait_for_event(loader.done)
+        # czas wczytywania w tle (nakłada się na splash i logowanie)
+        if hasattr(self, 'startup_timer'):
+            self.startup_timer.add('load (w tle)', loader.elapsed)
+        if loader.error is not None:
+            print(f"BŁĄD Błąd ładowania danych: {loader.error}")
+            print(f"FIRMA Debug companies - używam domyślnych: {self.companies}")
+            return
+        self._apply_loaded_state(loader.result)
+
+    def _wait_for_event(self, event: threading.Event, interval: int = 30):
+        """wait_variable sterowane zdarzeniem z wątku - okna pozostają responsywne"""
+        done = tk.BooleanVar(self, value=event.is_set())
+
+        def poll():
+            if event.is_set():
+                done.set(True)
+            else:
+                self.after(interval, poll)
+        if not done.get():
+            poll()
+            self.wait_variable(done)
+
+    def _mark_item_dirty(self, item: RMKItem, op: str = 'edit'):
+        """Pozycja do zapisania przy najbliższym _save_state (SQLite / dziennik zmian)"""
+        self._deleted_items.discard(item.id)
+        self._dirty_items[item.id] = item
+        # nowa pozycja zostaje w dzienniku jako 'add' także po późniejszych zmianach
+        self._item_ops.setdefault(item.id, op)
+
+    def _mark_items_deleted(self, ids):
+        for it_id in ids:
+            self._dirty_items.pop(it_id, None)
+            self._item_ops.pop(it_id, None)
+            self._deleted_items.add(it_id)
+
+    def _state_obj(self, with_items: bool = True) -> dict:
         obj = {
             'users': self.users,
             'companies': self.companies,
@@ -1490,15 +3723,129 @@ class RMKApp(tk.Tk):
             'rmk_accounts': self.rmk_accounts,  # Zachowaj dla kompatybilności
             'accounts_by_company': getattr(self, 'accounts_by_company', {}),  # Nowa struktura
             'rmk_accounts_by_company': getattr(self, 'rmk_accounts_by_company', {}),  # Nowa struktura
-            'rmk_items': [it.to_dict() for it in self.rmk_items],
-            'view_state': getattr(self, 'view_state', {})
+            'rmk_items': [it.to_dict() for it in self.rmk_items] if with_items else [],
+            'amortization_mode': getattr(self, 'amortization_mode', AMORTIZATION_FLOAT),
+            'next_item_id': self.item_store.next_id
         }
+        if not with_items:
+            del obj['rmk_items']
+        return obj
+
+    @staticmethod
+    def _merge_row_changes(old, new):
+        """Łączy migawki zapisu SQLite: (stan bez pozycji, {id: to_dict()}, usunięte id)"""
+        meta, items, deleted = new
+        merged = {k: v for k, v in old[1].items() if k not in deleted}
+        merged.update(items)
+        return meta, merged, (old[2] - set(items)) | deleted
+
+    @staticmethod
+    def _merge_journal_batches(old, new):
+        """Łączy migawki zapisu JSON: {'state': pełny stan albo None, 'entries': wpisy dziennika}"""
+        if new['state'] is not None:
+            return new
+        return {'state': old['state'], 'entries': old['entries'] + new['entries']}
+
+    def _write_snapshot(self, snapshot):
+        """Zapis migawki w wątku StateSaver"""
+        if self.storage is not None:
+            meta, items, deleted = snapshot
+            self.storage.save(meta, list(items.values()), sorted(deleted))
+            return
+        if snapshot['state'] is not None:
+            # kompaktowanie: pełna migawka, potem pusty dziennik
+            write_json_atomic(self._state_file(), snapshot['state'])
+            self.journal.truncate()
+        self.journal.append(snapshot['entries'])
+
+    def _state_saver(self) -> StateSaver:
+        if self.saver is None:
+            merge_fn = self._merge_row_changes if self.storage is not None else self._merge_journal_batches
+            self.saver = StateSaver(self._write_snapshot, merge=merge_fn)
+        return self.saver
+
+    def _journal_batch(self, compact: bool = False) -> dict:
+        """Wpisy dziennika dla zmian od ostatniego zapisu albo pełna migawka (kompaktowanie)"""
+        if self.journal is None:
+            self.journal = ChangeJournal(self._journal_file())
+        meta = copy.deepcopy(self._state_obj(with_items=False))
+        meta_json = json.dumps(meta, sort_keys=True, ensure_ascii=False)
+        entries = [{'op': self._item_ops.get(it_id, 'edit'), 'item': it.to_dict()}
+                   for it_id, it in self._dirty_items.items()]
+        if self._deleted_items:
+            entries.append({'op': 'delete', 'ids': sorted(self._deleted_items)})
+        if meta_json != self._journal_meta:
+            entries.append({'op': 'meta', 'state': meta})
+        self._journal_meta = meta_json
+        if compact or self.journal.count + len(entries) > JOURNAL_COMPACT_ENTRIES or not os.path.exists(self._state_file()):
+            self.journal.count = 0
+            return {'state': self._state_obj(), 'entries': []}
+        self.journal.count += len(entries)
+        return {'state': None, 'entries': entries}
+
+    def _save_state(self, compact: bool = False):
+        """Odkłada migawkę stanu do zapisu w tle; seria wywołań kończy się jednym zapisem.
+
+        compact=True zapisuje pełny data.json zamiast wpisów dziennika (np. przed backupem).
+        """
+        # migawka powstaje w wątku Tk - wątek zapisu nie czyta żywych struktur aplikacji
+        if self.storage is not None:
+            # tylko zmienione wiersze, w jednej transakcji
+            snapshot = (copy.deepcopy(self._state_obj(with_items=False)),
+                        {it_id: it.to_dict() for it_id, it in self._dirty_items.items()},
+                        set(self._deleted_items))
+        else:
+            # dziennik: zapis proporcjonalny do zmiany, okresowo pełna migawka
+            snapshot = self._journal_batch(compact)
+            if snapshot['state'] is not None:
+                state = snapshot['state']
+                snapshot['state'] = dict(copy.deepcopy({k: v for k, v in state.items() if k != 'rmk_items'}),
+                                         rmk_items=state['rmk_items'])
+        self._dirty_items.clear()
+        self._deleted_items.clear()
+        self._item_ops.clear()
+        self._state_saver().submit(snapshot)
+        self._show_save_status()
+
+    def _flush_state(self):
+        """Czeka na zapis zaległych zmian (wyjście, backup, zmiana magazynu)"""
+        for saver in (self.saver, self.view_saver):
+            if saver is not None:
+                saver.flush()
+
+    def _show_save_status(self):
+        """Stan zapisu w pasku statusu; odświeżany, dopóki zapis w tle trwa."""
+        try:
+            saver = self.saver
+            if saver is not None and saver.pending:
+                self.save_status_var.set("● Zapisywanie…")
+                self.after(200, self._show_save_status)
+            elif saver is not None and saver.last_error is not None:
+                self.save_status_var.set("Błąd zapisu")
+            else:
+                self.save_status_var.set("Zapisano")
+        except Exception:
+            pass
+
+    def migrate_to_sqlite(self):
+        """Przenosi bieżące dane do bazy SQLite; data.json zostaje jako kopia."""
+        if self.storage is not None:
+            messagebox.showinfo(APP_NAME, f"Dane są już w bazie SQLite:\n{self.storage.path}")
+            return
+        self._flush_state()
         try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(obj, f, ensure_ascii=False, indent=2)
+            storage = SQLiteStorage(self._db_file())
+            storage.save_all(dict(self._state_obj(), view_state=getattr(self, 'view_state', {})))
         except Exception as e:
-            print('Error saving state:', e)
+            messagebox.showerror(APP_NAME, f"Błąd przenoszenia danych do SQLite:\n{e}")
+            return
+        self.storage = storage
+        self.saver = None
+        self.view_saver = None
+        self._dirty_items.clear()
+        self._deleted_items.clear()
+        self._item_ops.clear()
+        messagebox.showinfo(APP_NAME, f"Dane przeniesione do bazy SQLite:\n{storage.path}")
 
     def create_backup(self):
         """Tworzy kopię zapasową bazy danych"""
@@ -1506,7 +3853,11 @@ class RMKApp(tk.Tk):
             import shutil
             from datetime import datetime
             
-            source_path = self._state_file()
+            if self.storage is None:
+                # kopia data.json musi zawierać zmiany z dziennika
+                self._save_state(compact=True)
+            self._flush_state()
+            source_path = self.storage.path if self.storage is not None else self._state_file()
             if not os.path.exists(source_path):
                 messagebox.showwarning(APP_NAME, "Brak pliku danych do backupu.")
                 return
@@ -1517,11 +3868,15 @@ class RMKApp(tk.Tk):
             
             # Nazwa pliku z datą i czasem
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"data_backup_{timestamp}.json"
+            ext = os.path.splitext(source_path)[1]
+            backup_filename = f"data_backup_{timestamp}{ext}"
             backup_path = os.path.join(backup_dir, backup_filename)
             
-            # Skopiuj plik
-            shutil.copy2(source_path, backup_path)
+            # Skopiuj plik (bazę SQLite przez backup API - spójna kopia)
+            if self.storage is not None:
+                self.storage.backup_to(backup_path)
+            else:
+                shutil.copy2(source_path, backup_path)
             
             messagebox.showinfo(APP_NAME, f"Backup utworzony:\n{backup_path}")
             
@@ -1539,15 +3894,28 @@ class RMKApp(tk.Tk):
             backup_file = filedialog.askopenfilename(
                 title="Wybierz plik backupu do przywrócenia",
                 initialdir=backup_dir,
-                filetypes=[('JSON files', '*.json'), ('All files', '*.*')]
+                filetypes=[('JSON files', '*.json'), ('SQLite', '*.db'), ('All files', '*.*')]
             )
             
             if not backup_file:
                 return
             
             if messagebox.askyesno(APP_NAME, "Czy na pewno przywrócić backup?\nAktualne dane zostaną zastąpione!"):
+                # zaległy zapis w tle nie może nadpisać przywróconego pliku
+                self._flush_state()
                 import shutil
-                shutil.copy2(backup_file, self._state_file())
+                if backup_file.lower().endswith('.db'):
+                    if self.storage is not None:
+                        self.storage.close()
+                    shutil.copy2(backup_file, self._db_file())
+                else:
+                    shutil.copy2(backup_file, self._state_file())
+                    # dziennik dotyczy zastąpionych danych
+                    ChangeJournal(self._journal_file()).truncate()
+                    # przywrócony data.json ma pierwszeństwo przed bazą
+                    if self.storage is not None:
+                        self.storage.close()
+                        os.remove(self._db_file())
                 messagebox.showinfo(APP_NAME, "Backup przywrócony. Uruchom aplikację ponownie.")
                 self.quit()
                 
@@ -1564,6 +3932,7 @@ class RMKApp(tk.Tk):
         menubar.add_cascade(label="Plik", menu=file_menu)
         file_menu.add_command(label="Utwórz backup", command=self.create_backup)
         file_menu.add_command(label="Przywróć backup", command=self.restore_backup)
+        file_menu.add_command(label="Przenieś dane do SQLite", command=self.migrate_to_sqlite)
         file_menu.add_separator()
         file_menu.add_command(label="Wyjście", command=self.quit)
         
@@ -1573,11 +3942,70 @@ class RMKApp(tk.Tk):
         import_menu.add_command(label="Import Excel", command=self.import_excel)
         # Tutaj można dodać eksport do Excel w przyszłości
         
+        # Menu Ustawienia
+        settings_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Ustawienia", menu=settings_menu)
+        self.grosze_mode_var = tk.BooleanVar(value=self.amortization_mode == AMORTIZATION_GROSZE)
+        settings_menu.add_checkbutton(label="Rozliczenia w groszach (dokładne)", variable=self.grosze_mode_var,
+                                      command=lambda: self.set_amortization_mode(
+                                          AMORTIZATION_GROSZE if self.grosze_mode_var.get() else AMORTIZATION_FLOAT))
+        
         # Menu Pomoc
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Pomoc", menu=help_menu)
         help_menu.add_command(label="O programie", command=self.show_about)
 
+    def set_amortization_mode(self, mode: str):
+        """Przełącza tryb rozliczania; harmonogramy w cache są liczone od nowa."""
+        if mode not in AMORTIZATION_MODES or mode == self.amortization_mode:
+            return
+        # raporty liczone w tle dotyczą poprzedniego trybu
+        self.cancel_reports()
+        self.amortization_mode = mode
+        self.schedule_cache = ScheduleCache(mode=mode)
+        self.aggregates = AggregateStore(self.schedule_cache)
+        self.aggregates.rebuild(self.rmk_items)
+        # sumy okna raportu były liczone w poprzednim trybie
+        self.report_months_full = []
+        self._save_state()
+        try:
+            label = "grosze (dokładne)" if mode == AMORTIZATION_GROSZE else "kwoty zmiennoprzecinkowe"
+            self.status_var.set(f"Tryb rozliczania: {label}")
+        except Exception:
+            pass
+
+    def _item_by_id(self, item_id: int) -> Optional[RMKItem]:
+        return self.item_store.ensure(self.rmk_items).get(item_id)
+
+    def _company_items(self) -> List[RMKItem]:
+        """Pozycje bieżącej firmy (wraz z pozycjami bez firmy)."""
+        store = self.item_store.ensure(self.rmk_items)
+        return store.company_items(getattr(self, 'current_company', ''))
+
+    def _report_cube(self, kategoria: str = "", konto_rmk: str = "",
+                     store: Optional[AggregateStore] = None, company: Optional[str] = None) -> CubeView:
+        """Wycinek kostki dla raportów: firma (domyślnie bieżąca) oraz filtry ("Wszystkie" nie filtruje).
+
+        Bez store sumy są najpierw synchronizowane z listą pozycji (wątek Tk).
+        Wątki robocze podają store zsynchronizowany już przez _run_report
+        oraz firmę odczytaną przy zleceniu - nie czytają stanu aplikacji.
+        """
+        cube = store if store is not None else self.aggregates.ensure(self.rmk_items)
+        if company is None:
+            company = getattr(self, 'current_company', '')
+        return cube.report_view(company,
+                                kategoria if kategoria != "Wszystkie" else "",
+                                konto_rmk if konto_rmk != "Wszystkie" else "")
+
+    def format_amount(self, value, mode: Optional[str] = None) -> str:
+        """Format kwoty z harmonogramu/agregacji - w trybie groszowym wartości są w groszach.
+
+        mode - tryb odczytany przy zleceniu raportu (wątek roboczy); domyślnie bieżący.
+        """
+        if (mode or self.amortization_mode) == AMORTIZATION_GROSZE:
+            return format_grosze(value)
+        return thousand_sep(value)
+
     def show_about(self):
         """Wyświetla informacje o programie"""
         about_text = f"""
@@ -1604,9 +4032,10 @@ Funkcjonalności:
     def _setup_style(self):
         # Prefer ttkbootstrap Style if available for modern look
         try:
-            if TTKBOOTSTRAP_AVAILABLE and TBStyle is not None:
+            ttkbootstrap = lazy_import('ttkbootstrap')
+            if ttkbootstrap is not None:
                 # initialize ttkbootstrap style with a clean theme
-                self.tb_style = TBStyle(theme='litera')
+                self.tb_style = ttkbootstrap.Style(theme='litera')
                 # configure a custom accent via bootstyle if needed
                 # ttkbootstrap uses 'success', 'primary', 'warning' etc. via 'bootstyle' arg
                 return
@@ -1628,7 +4057,7 @@ Funkcjonalności:
         # extract explicit style hints
         bootstyle = k.pop('bootstyle', None)
         style = k.pop('style', None)
-        if TTKBOOTSTRAP_AVAILABLE and bootstyle:
+        if getattr(self, 'tb_style', None) is not None and bootstyle:
             # pass bootstyle to ttk.Button (ttkbootstrap injects support)
             return ttk.Button(parent, bootstyle=bootstyle, **k)
         # fallback: mapuj bootstyle na nasze style
@@ -1643,102 +4072,21 @@ Funkcjonalności:
             style = style_map.get(bootstyle, 'TButton')
         return ttk.Button(parent, style=(style or 'TButton'), **k)
 
+    def _logo_cache_file(self):
+        """Zapamiętane ścieżki logo obok data.json"""
+        return os.path.join(os.path.dirname(self._state_file()), 'logo_cache.json')
+
+    def _logo_cache(self) -> LogoCache:
+        if getattr(self, 'logo_cache', None) is None:
+            self.logo_cache = LogoCache(self._logo_cache_file(), resource_path(""))
+        return self.logo_cache
+
     def _add_logo_header(self):
         """Dodaj logo w lewym górnym rogu aplikacji"""
         try:
-            print("IMG Dodaję logo do głównego okna...")
-            
-            # Znajdź logo sprawdzając różne lokalizacje
-            base_dir = resource_path("")
-            logo_path = None
-            
-            # Lista miejsc do sprawdzenia
-            search_locations = []
-            
-            # 1. Folder logo/ w aplikacji
-            try:
-                logo_dir = os.path.join(base_dir, 'logo')
-                if os.path.isdir(logo_dir):
-                    search_locations.append(logo_dir)
-            except:
-                pass
-            
-            # 2. Główny katalog aplikacji
-            search_locations.append(base_dir)
-            
-            # 3. Folder domyślny użytkownika
-            try:
-                home_dir = os.path.expanduser("~")
-                search_locations.append(home_dir)
-                print(f"🏠 Dodano folder domyślny: {home_dir}")
-            except:
-                pass
-            
-            # 4. Pulpit użytkownika (Windows)
-            try:
-                if os.name == 'nt':
-                    desktop_dir = os.path.join(os.path.expanduser("~"), "Desktop")
-                    if os.path.isdir(desktop_dir):
-                        search_locations.append(desktop_dir)
-                        print(f"MONITOR Dodano pulpit: {desktop_dir}")
-            except:
-                pass
-            
-            # 5. Dokumenty użytkownika
-            try:
-                documents_dir = os.path.join(os.path.expanduser("~"), "Documents")
-                if os.path.isdir(documents_dir):
-                    search_locations.append(documents_dir)
-                    print(f"📁 Dodano dokumenty: {documents_dir}")
-            except:
-                pass
-            
-            # Nazwy plików logo do sprawdzenia
-            logo_filenames = [
-                'RMK_insGT_logo.png', 'RMK insG.png',  # Konkretne nazwy z aplikacji
-                'logo.png', 'logo.jpg', 'logo.jpeg',   # Ogólne nazwy
-                'rmk.png', 'rmk.jpg', 'rmk.jpeg',      # RMK nazwy
-                'company_logo.png', 'firma_logo.png'    # Firmowe nazwy
-            ]
-            
-            print(f"🔍 Sprawdzam {len(search_locations)} lokalizacji...")
-            print(f"📋 Szukam plików: {logo_filenames}")
-            
-            # Przeszukaj wszystkie lokalizacje
-            for location in search_locations:
-                print(f"📂 Sprawdzam: {location}")
-                try:
-                    if os.path.isdir(location):
-                        # Pokaż co jest w folderze
-                        files_in_dir = os.listdir(location)
-                        print(f"   FILES Pliki w folderze: {[f for f in files_in_dir if f.lower().endswith(('.png', '.jpg', '.jpeg'))]}")
-                        
-                        for filename in logo_filenames:
-                            potential_path = os.path.join(location, filename)
-                            if os.path.exists(potential_path):
-                                logo_path = potential_path
-                                print(f"OK ZNALEZIONO LOGO: {logo_path}")
-                                break
-                        
-                        if logo_path:
-                            break
-                            
-                        # Dodatkowo sprawdź wszystkie pliki PNG/JPG w folderze
-                        try:
-                            for file in os.listdir(location):
-                                if file.lower().endswith(('.png', '.jpg', '.jpeg')) and 'logo' in file.lower():
-                                    potential_path = os.path.join(location, file)
-                                    if os.path.exists(potential_path):
-                                        logo_path = potential_path
-                                        print(f"OK ZNALEZIONO LOGO (wzorzec): {logo_path}")
-                                        break
-                            if logo_path:
-                                break
-                        except:
-                            pass
-                            
-                except Exception as e:
-                    print(f"UWAGA Błąd sprawdzania {location}: {e}")
+            # ścieżka z logo_cache.json; foldery przeszukiwane tylko, gdy plik się zmienił
+            logo_cache = self._logo_cache()
+            logo_path = logo_cache.header_path()
             
             if logo_path and os.path.exists(logo_path):
                 try:
@@ -1747,21 +4095,16 @@ Funkcjonalności:
                     header_frame.pack(fill=tk.X, pady=(0, 4))
                     header_frame.pack_propagate(False)  # Zachowaj stałą wysokość
                     
-                    # Załaduj i przeskaluj logo
-                    logo_img = tk.PhotoImage(file=logo_path)
-                    
-                    # Przeskaluj do maksymalnie 40px wysokości
-                    original_width = logo_img.width()
-                    original_height = logo_img.height()
-                    max_height = 40
-                    
-                    if original_height > max_height:
-                        scale_factor = max_height / original_height
-                        new_width = int(original_width * scale_factor)
-                        new_height = max_height
+                    # Załaduj i przeskaluj logo (raz - przeskalowany obraz zostaje w pamięci)
+                    logo_img = logo_cache.header_image
+                    if logo_img is None:
+                        logo_img = tk.PhotoImage(file=logo_path)
                         
-                        # Przeskaluj obraz
-                        logo_img = logo_img.subsample(int(1/scale_factor))
+                        # Przeskaluj do maksymalnie 40px wysokości
+                        if logo_img.height() > LogoCache.HEADER_MAX_HEIGHT:
+                            scale_factor = LogoCache.HEADER_MAX_HEIGHT / logo_img.height()
+                            logo_img = logo_img.subsample(int(1/scale_factor))
+                        logo_cache.header_image = logo_img
                     
                     # Dodaj logo do lewej strony
                     logo_label = tk.Label(header_frame, 
@@ -1779,7 +4122,7 @@ Funkcjonalności:
                                          bg=BRAND_COLOR_HEADER)
                     title_label.pack(side=tk.LEFT, padx=(4, 0), pady=4, anchor='w')
                     
-                    print(f"OK Logo dodane do głównego okna ({original_width}x{original_height}) z: {logo_path}")
+                    print(f"OK Logo dodane do głównego okna z: {logo_path}")
                     
                 except Exception as e:
                     print(f"UWAGA Błąd ładowania logo do GUI: {e}")
@@ -1787,7 +4130,6 @@ Funkcjonalności:
                     self._add_text_header()
             else:
                 print("UWAGA Nie znaleziono logo w żadnej lokalizacji - dodaję tylko tytuł")
-                print(f"🔍 Sprawdzono lokalizacje: {search_locations}")
                 self._add_text_header()
                 
         except Exception as e:
@@ -1813,6 +4155,7 @@ Funkcjonalności:
 
     def _build_gui(self):
         self.status_var = tk.StringVar()
+        self.save_status_var = tk.StringVar(value="Zapisano")
         
         # Dodaj menu
         self._create_menu()
@@ -1822,19 +4165,131 @@ Funkcjonalności:
         
         nb = ttk.Notebook(self)
         nb.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+        self.notebook = nb
+
+        # zakładki budowane przy pierwszym wybraniu (LazyTab); od razu tylko "Lista RMK"
+        tabs = [("Lista RMK", self._build_tab_lista),
+                ("Harmonogram", self._build_tab_harmonogram),
+                # dodatkowa zakładka: podsumowanie (agregacje)
+                ("Podsumowanie", self._build_tab_podsumowanie),
+                ("RMK - następny rok", self._build_tab_rmk_next_year),
+                ("RMK wg lat", self._build_tab_rmk_by_years),
+                ("Słowniki", self._build_tab_slownik)]
+        if self.current_user_admin:
+            tabs.append(("Admin", self._build_tab_admin))
+        tabs.append(("Raporty", self._build_tab_reports))
+        self.lazy_tabs: Dict[str, LazyTab] = {}
+        for title, builder in tabs:
+            page = LazyTab(nb, builder)
+            nb.add(page, text=title)
+            self.lazy_tabs[title] = page
+        self._ensure_tab("Lista RMK")
+        nb.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+
+        status_bar = tk.Frame(self, bg=BRAND_COLOR_ACCENT)
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        save_status = ttk.Label(status_bar, textvariable=self.save_status_var, anchor='e', background=BRAND_COLOR_ACCENT, foreground='white', padding=4)
+        save_status.pack(side=tk.RIGHT)
+        # postęp wypełniania tabel raportów - widoczny tylko w trakcie (_show_progress)
+        self.progress_var = tk.StringVar()
+        self.progress_frame = tk.Frame(status_bar, bg=BRAND_COLOR_ACCENT)
+        ttk.Label(self.progress_frame, textvariable=self.progress_var, background=BRAND_COLOR_ACCENT, foreground='white', padding=4).pack(side=tk.LEFT)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, length=160, mode='determinate')
+        self.progress_bar.pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.progress_frame, text="Anuluj", command=self.cancel_reports).pack(side=tk.LEFT, padx=4)
+        self.populators: Dict[str, TreePopulator] = {}
+        self.status_label = ttk.Label(status_bar, textvariable=self.status_var, anchor='w', background=BRAND_COLOR_ACCENT, foreground='white', padding=4)
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    def _show_progress(self, text: str, done: int = 0, total: Optional[int] = None):
+        """Postęp w pasku statusu; total None - pasek w trybie nieokreślonym"""
+        if not hasattr(self, 'progress_frame'):
+            return
+        self.progress_var.set(text)
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode='determinate', maximum=total, value=done)
+        elif str(self.progress_bar.cget('mode')) != 'indeterminate':
+            self.progress_bar.configure(mode='indeterminate')
+            self.progress_bar.start(50)
+        if not self.progress_frame.winfo_ismapped():
+            self.progress_frame.pack(side=tk.RIGHT, before=self.status_label)
+
+    def _hide_progress(self):
+        """Chowa pasek postępu, gdy nic się już nie liczy ani nie wypełnia"""
+        if not hasattr(self, 'progress_frame'):
+            return
+        if self.report_workers.running or any(p.active for p in self.populators.values()):
+            return
+        self.progress_bar.stop()
+        self.progress_frame.pack_forget()
 
-        self._build_tab_lista(nb)
-        self._build_tab_harmonogram(nb)
-        # dodatkowa zakładka: podsumowanie (agregacje)
-        self._build_tab_podsumowanie(nb)
-        self._build_tab_rmk_next_year(nb)
-        self._build_tab_rmk_by_years(nb)
-        self._build_tab_slownik(nb)
-        self._build_tab_admin(nb)
-        self._build_tab_reports(nb)
+    def _run_report(self, key: str, compute, on_result) -> ReportJob:
+        """Liczy raport w wątku roboczym; on_result(wynik) wykonywane w wątku Tk.
 
-        status = ttk.Label(self, textvariable=self.status_var, anchor='w', background=BRAND_COLOR_ACCENT, foreground='white', padding=4)
-        status.pack(side=tk.BOTTOM, fill=tk.X)
+        Ponowne zlecenie o tym samym kluczu anuluje poprzednie (także
+        wypełnianie jego tabeli) - jego wynik nie trafi już do okna.
+        Ewentualna przebudowa sum (podmieniona lista pozycji) odbywa się
+        tutaj, w wątku Tk - compute tylko czyta kostkę pod jej lockiem.
+        """
+        previous = self.populators.get(key)
+        if previous is not None:
+            previous.cancel()
+        self.aggregates.ensure(self.rmk_items)
+        job = self.report_workers.submit(key, compute)
+        self._show_progress("Liczenie raportu…")
+        self._poll_report(job, on_result)
+        return job
+
+    def _poll_report(self, job: ReportJob, on_result):
+        """Czeka (bez blokowania pętli Tk) na wynik zadania i przekazuje go do okna"""
+        if job.cancelled:
+            self._hide_progress()
+            return
+        if not job.done():
+            self.after(50, lambda: self._poll_report(job, on_result))
+            return
+        if job.error is not None:
+            messagebox.showerror(APP_NAME, f"Błąd generowania raportu: {job.error}")
+        else:
+            on_result(job.result)
+        self._hide_progress()
+
+    def cancel_reports(self):
+        """Przerywa liczenie raportów w tle i wypełnianie ich tabel (przycisk "Anuluj")"""
+        self.report_workers.cancel_all()
+        for populator in self.populators.values():
+            populator.cancel()
+        self._hide_progress()
+
+    def _populate_tree(self, key: str, tree, rows, on_done=None) -> TreePopulator:
+        """Wypełnia tabelę porcjami; poprzednie wypełnianie o tym samym kluczu jest przerywane"""
+        previous = self.populators.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+
+        def progress(done, total):
+            if populator.active:
+                self._show_progress(f"Wczytywanie wierszy: {done}" + (f"/{total}" if total else ""), done, total)
+            else:
+                self._hide_progress()
+
+        populator = TreePopulator(tree, rows, progress=progress, on_done=on_done)
+        self.populators[key] = populator
+        return populator.start()
+
+    def _ensure_tab(self, title: str):
+        """Buduje zakładkę, jeśli jeszcze nie była otwarta (np. przed wpisaniem do jej widgetów)"""
+        page = getattr(self, 'lazy_tabs', {}).get(title)
+        if page is not None:
+            page.build()
+
+    def _on_tab_changed(self, event=None):
+        try:
+            title = self.notebook.tab(self.notebook.select(), 'text')
+        except Exception:
+            return
+        self._ensure_tab(title)
 
     def _build_tab_lista(self, nb):
         tab = ttk.Frame(nb)
@@ -1866,9 +4321,13 @@ Funkcjonalności:
         configure_single_treeview_borders(self.tree)
         
         # Dodaj scrollbary
-        v_scrollbar = ttk.Scrollbar(tree_scroll_frame, orient="vertical", command=self.tree.yview)
+        v_scrollbar = ttk.Scrollbar(tree_scroll_frame, orient="vertical")
         h_scrollbar = ttk.Scrollbar(tree_scroll_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        # przy dużych księgach w Treeview są tylko widoczne wiersze (pionowy pasek przesuwa okno)
+        self.rmk_list = VirtualTreeview(self.tree, v_scrollbar, self._rmk_row)
+        # każdy wiersz ma kolor statusu (gen/ungen) - naprzemienne tło niepotrzebne
+        RowStriper.disable(self.tree)
         
         # Pack scrollbary i treeview
         v_scrollbar.pack(side="right", fill="y")
@@ -1936,9 +4395,9 @@ Funkcjonalności:
         toolbar.pack(fill=tk.X, padx=8, pady=6)
         # wybór pozycji RMK dla której pokażemy harmonogram
         ttk.Label(toolbar, text="Pozycja RMK:").pack(side=tk.LEFT, padx=4)
-        self.harmo_item_cb = ttk.Combobox(toolbar, values=[f"{it.id}: {it.kategoria} | {it.opis} | {it.data_start.strftime('%Y-%m-%d')} - {it.data_koniec.strftime('%Y-%m-%d') if it.data_koniec else 'N/A'}" for it in self.rmk_items], state='readonly', width=80)
-        if self.rmk_items:
-            self.harmo_item_cb.current(0)
+        # pozycje bieżącej firmy z listy RMK; wartości wczytywane przy rozwinięciu listy
+        self.harmo_item_cb = ttk.Combobox(toolbar, state='readonly', width=80, postcommand=self._fill_harmo_item_cb)
+        self._harmo_items_changed(reset=True)
         self.harmo_item_cb.pack(side=tk.LEFT, padx=4)
         create_btn(self, toolbar, text="� Pokaż harmonogram", command=self.show_selected_harmonogram, bootstyle='primary').pack(side=tk.LEFT, padx=4)
         # usuń przycisk filtruj (nieaktywny)
@@ -2008,57 +4467,47 @@ Funkcjonalności:
         if (od and not od_d) or (do and not do_d):
             messagebox.showerror("Błąd", "Niepoprawny format daty (użyj YYYY-MM)")
             return
-        # build aggregation key function
+        # wymiar grupowania w sumach raportów
         if group == 'Kategoria':
-            keyfn = lambda it: it.kategoria
+            group_by = 'kategoria'
         elif group == 'Konto kosztowe':
-            keyfn = lambda it: it.konto_kosztowe
+            group_by = 'konto_kosztowe'
         else:
-            keyfn = lambda it: it.konto_rmk
+            group_by = 'konto_rmk'
 
-        try:
-            is_admin = bool(getattr(self, 'current_user_admin', False))
-        except Exception:
-            is_admin = False
         cur_company = getattr(self, 'current_company', '')
-
-        agg: Dict[str, Dict[str, float]] = {}
-        keys = set()
-        for it in self.rmk_items:
-            if cur_company and it.firma and it.firma != cur_company:
-                continue
-            # Użyj ulepszonego algorytmu rozliczania miesięcznego
-            monthly_amounts = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
-            
-            for i in range(it.liczba_mies):
-                mdate = month_add(it.data_start, i)
-                if od_d and mdate < od_d: continue
-                if do_d and mdate > do_d: continue
-                m = mdate.strftime("%Y-%m")
-                k = keyfn(it) or ""
-                keys.add(k)
-                agg.setdefault(m, {})
-                
-                # Użyj odpowiedniej kwoty z ulepszonego algorytmu
-                amount_to_add = monthly_amounts[i] if i < len(monthly_amounts) else 0.0
-                agg[m][k] = agg[m].get(k, 0.0) + amount_to_add
-
-        for w in self.sum_frame.winfo_children():
-            w.destroy()
-        months = sorted(agg.keys())
-        cols = ["Grupa"] + months + ["Razem"]
-        tree_container, tree = self._make_scrolled_tree(self.sum_frame, cols)
-
-        for k in sorted(keys):
-            row = [k]
-            total = 0.0
-            for m in months:
-                v = agg.get(m, {}).get(k, 0.0)
-                total += v
-                row.append(thousand_sep(v))
-            row.append(thousand_sep(total))
-            tree.insert('', 'end', values=row)
-        tree_container.pack(fill=tk.BOTH, expand=True)
+        mode = self.amortization_mode
+
+        # Gotowe sumy grupa -> miesiąc -> kwota dla bieżącej firmy
+        od_m = month_ordinal(od_d) if od_d else None
+        do_m = month_ordinal(do_d) if do_d else None
+
+        store = self.aggregates
+
+        def compute(job):
+            # w wątku roboczym - sumy narastające grup: kwota miesiąca i suma Od-Do to O(1)
+            with store.lock:
+                by_key = self._report_cube(store=store, company=cur_company).months(od_m, do_m).prefix_sums(group_by)
+            months = sorted(set().union(*(p.months for p in by_key.values())))
+            rows = []
+            for k in sorted(by_key):
+                job.check()
+                prefix = by_key[k]
+                row = [k] + [self.format_amount(prefix.at(m), mode) for m in months]
+                row.append(self.format_amount(prefix.total(od_m, do_m), mode))
+                rows.append(row)
+            return months, rows
+
+        def show(result):
+            months, rows = result
+            for w in self.sum_frame.winfo_children():
+                w.destroy()
+            cols = ["Grupa"] + [ordinal_label(m) for m in months] + ["Razem"]
+            tree_container, tree = self._make_scrolled_tree(self.sum_frame, cols)
+            tree_container.pack(fill=tk.BOTH, expand=True)
+            self._populate_tree('summary', tree, rows)
+
+        self._run_report('summary', compute, show)
 
     def _build_tab_rmk_next_year(self, nb):
         tab = ttk.Frame(nb)
@@ -2109,94 +4558,63 @@ Funkcjonalności:
         konto_rmk = self.rmk_year_rmk_cb.get().strip()
         group_by = self.rmk_year_group_var.get()  # "kategoria" lub "konto_rmk"
         cur_company = getattr(self, 'current_company', '')
+        mode = self.amortization_mode
 
-        # aggregate per month for the chosen year per selected filters
-        agg: Dict[str, Dict[str, float]] = {}
-        keys = set()
-        # months headers for year
-        months = [f"{year}-{m:02d}" for m in range(1,13)]
-
-        for it in self.rmk_items:
-            # respect current company
-            if cur_company and it.firma and it.firma != cur_company:
-                continue
-            # filter by category and konto_rmk if set
-            if cat and cat != "Wszystkie":
-                try:
-                    if str(it.kategoria).strip().casefold() != cat.casefold():
-                        continue
-                except Exception:
-                    continue
-            if konto_rmk and konto_rmk != "Wszystkie":
-                if str(it.konto_rmk).strip() != konto_rmk:
-                    continue
+        # months of the year (month ordinals, labels only for headers)
+        months = [year * 12 + m for m in range(1, 13)]
 
-            # Użyj ulepszonego algorytmu rozliczania miesięcznego
-            monthly_amounts = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
-            
-            for i in range(it.liczba_mies):
-                mdate = month_add(it.data_start, i)
-                if mdate.year != year:
-                    continue
-                m = mdate.strftime("%Y-%m")
-                
-                # Wybierz klucz grupowania według ustawienia
-                if group_by == "konto_rmk":
-                    k = it.konto_rmk or ""
-                else:  # domyślnie kategoria
-                    k = it.kategoria or ""
-                    
-                keys.add(k)
-                agg.setdefault(k, {})
-                
-                # Użyj odpowiedniej kwoty z ulepszonego algorytmu
-                amount_to_add = monthly_amounts[i] if i < len(monthly_amounts) else 0.0
-                agg[k][m] = agg[k].get(m, 0.0) + amount_to_add
+        # Wybierz klucz grupowania według ustawienia
+        if group_by == "konto_rmk":
+            dimension = "konto_rmk"
+        else:  # domyślnie kategoria
+            dimension = "kategoria"
 
         # persist selected year to view_state
         try:
             self.view_state = getattr(self, 'view_state', {})
             self.view_state['rmk_next_year'] = year
+            self._save_view_state()
         except Exception:
             pass
 
-        # build table with rows = groups (kategorie), columns = months
-        for w in self.rmk_year_frame.winfo_children():
-            w.destroy()
-        cols = ["Kategoria"] + months + ["Razem"]
-        tree = ttk.Treeview(self.rmk_year_frame, columns=cols, show='headings')
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, width=100, anchor='e' if c != 'Kategoria' else 'w')
-        tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Dodaj obramowania do tabeli RMK - następny rok
-        configure_single_treeview_borders(tree)
+        store = self.aggregates
+
+        def compute(job):
+            # aggregate per month for the chosen year per selected filters (w wątku roboczym)
+            with store.lock:
+                # respect current company, filter by category and konto_rmk if set
+                year_view = self._report_cube(cat, konto_rmk, store, cur_company).months(months[0], months[-1])
+                agg = year_view.prefix_sums(dimension)
+                all_groups = year_view.prefix_sums().get("", MonthPrefix({}, store.divisor))
+            rows = []
+            for k in sorted(agg):
+                job.check()
+                prefix = agg[k]
+                row = [k] + [self.format_amount(prefix.at(m), mode) for m in months]
+                row.append(self.format_amount(prefix.total(), mode))
+                rows.append(row)
+            # footer: SUMA per month and grand total
+            footer = ["SUMA"] + [self.format_amount(all_groups.at(m), mode) for m in months]
+            footer.append(self.format_amount(all_groups.total(), mode))
+            rows.append(footer)
+            return rows
+
+        def show(rows):
+            # build table with rows = groups (kategorie), columns = months
+            for w in self.rmk_year_frame.winfo_children():
+                w.destroy()
+            cols = ["Kategoria"] + [ordinal_label(m) for m in months] + ["Razem"]
+            tree = ttk.Treeview(self.rmk_year_frame, columns=cols, show='headings')
+            for c in cols:
+                tree.heading(c, text=c)
+                tree.column(c, width=100, anchor='e' if c != 'Kategoria' else 'w')
+            tree.pack(fill=tk.BOTH, expand=True)
+            
+            # Dodaj obramowania do tabeli RMK - następny rok
+            configure_single_treeview_borders(tree)
+            self._populate_tree('rmk_next_year', tree, rows)
 
-        for k in sorted(keys):
-            row = [k]
-            total = 0.0
-            for m in months:
-                v = agg.get(k, {}).get(m, 0.0)
-                total += v
-                row.append(thousand_sep(v))
-            row.append(thousand_sep(total))
-            tree.insert('', 'end', values=row)
-        # footer: SUMA per month and grand total
-        if months:
-            footer = ["SUMA"]
-            grand = 0.0
-            for m in months:
-                s = sum(agg.get(k, {}).get(m, 0.0) for k in keys)
-                grand += s
-                footer.append(thousand_sep(s))
-            footer.append(thousand_sep(grand))
-            tree.insert('', 'end', values=footer)
-        # save view state
-        try:
-            self._save_state()
-        except Exception:
-            pass
+        self._run_report('rmk_next_year', compute, show)
 
     def _build_tab_rmk_by_years(self, nb):
         tab = ttk.Frame(nb)
@@ -2259,79 +4677,67 @@ Funkcjonalności:
         cat = self.rmk_by_year_cat_cb.get().strip()
         konto_rmk = self.rmk_by_year_rmk_cb.get().strip()
         cur_company = getattr(self, 'current_company', '')
+        mode = self.amortization_mode
 
         years = [str(y) for y in range(y1, y2 + 1)]
-        agg: Dict[str, Dict[str, float]] = {}
-        keys = set()
 
         # persist view state
         try:
             self.view_state = getattr(self, 'view_state', {})
             self.view_state['rmk_by_years'] = {'from': y1, 'to': y2, 'category': cat, 'konto_rmk': konto_rmk}
-            self._save_state()
+            self._save_view_state()
         except Exception:
             pass
 
-        for it in self.rmk_items:
-            if cur_company and it.firma and it.firma != cur_company:
-                continue
-            if cat and cat != "Wszystkie":
-                try:
-                    if str(it.kategoria).strip().casefold() != cat.casefold():
-                        continue
-                except Exception:
-                    continue
-            if konto_rmk and konto_rmk != "Wszystkie":
-                if str(it.konto_rmk).strip() != konto_rmk:
-                    continue
-
-            # Użyj ulepszonego algorytmu rozliczania miesięcznego
-            monthly_amounts = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
+        store = self.aggregates
+
+        def compute(job):
+            # sumy lat jako różnice sum narastających (O(1) na komórkę) - w wątku roboczym
+            with store.lock:
+                by_cat = self._report_cube(cat, konto_rmk, store, cur_company).months(y1 * 12 + 1, y2 * 12 + 12).prefix_sums('kategoria')
+            agg: Dict[str, Dict[str, float]] = {}
+            for k, prefix in by_cat.items():
+                agg[k] = {y: prefix.total(int(y) * 12 + 1, int(y) * 12 + 12) for y in years}
+            keys = set(agg)
+
+            rows = []
+            for k in sorted(keys):
+                job.check()
+                row = [k]
+                total = 0.0
+                for y in years:
+                    v = agg.get(k, {}).get(y, 0.0)
+                    total += v
+                    row.append(self.format_amount(v, mode))
+                row.append(self.format_amount(total, mode))
+                rows.append(row)
+
+            # footer: suma per year
+            footer = ["SUMA"]
+            grand = 0.0
+            for y in years:
+                s = sum(agg.get(k, {}).get(y, 0.0) for k in keys)
+                grand += s
+                footer.append(self.format_amount(s, mode))
+            footer.append(self.format_amount(grand, mode))
+            rows.append(footer)
+            return rows
+
+        def show(rows):
+            for w in self.rmk_by_year_frame.winfo_children():
+                w.destroy()
+            cols = ["Kategoria"] + years + ["Razem"]
+            tree = ttk.Treeview(self.rmk_by_year_frame, columns=cols, show='headings')
+            for c in cols:
+                tree.heading(c, text=c)
+                tree.column(c, width=120, anchor='e' if c != 'Kategoria' else 'w')
+            tree.pack(fill=tk.BOTH, expand=True)
             
-            for i in range(it.liczba_mies):
-                mdate = month_add(it.data_start, i)
-                y = mdate.year
-                if y < y1 or y > y2:
-                    continue
-                k = it.kategoria or ""
-                keys.add(k)
-                agg.setdefault(k, {})
-                
-                # Użyj odpowiedniej kwoty z ulepszonego algorytmu
-                amount_to_add = monthly_amounts[i] if i < len(monthly_amounts) else 0.0
-                agg[k][str(y)] = agg[k].get(str(y), 0.0) + amount_to_add
-
-        for w in self.rmk_by_year_frame.winfo_children():
-            w.destroy()
-        cols = ["Kategoria"] + years + ["Razem"]
-        tree = ttk.Treeview(self.rmk_by_year_frame, columns=cols, show='headings')
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, width=120, anchor='e' if c != 'Kategoria' else 'w')
-        tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Dodaj obramowania do tabeli RMK wg lat
-        configure_single_treeview_borders(tree)
+            # Dodaj obramowania do tabeli RMK wg lat
+            configure_single_treeview_borders(tree)
+            self._populate_tree('rmk_by_years', tree, rows)
 
-        for k in sorted(keys):
-            row = [k]
-            total = 0.0
-            for y in years:
-                v = agg.get(k, {}).get(y, 0.0)
-                total += v
-                row.append(thousand_sep(v))
-            row.append(thousand_sep(total))
-            tree.insert('', 'end', values=row)
-
-        # footer: suma per year
-        footer = ["SUMA"]
-        grand = 0.0
-        for y in years:
-            s = sum(agg.get(k, {}).get(y, 0.0) for k in keys)
-            grand += s
-            footer.append(thousand_sep(s))
-        footer.append(thousand_sep(grand))
-        tree.insert('', 'end', values=footer)
+        self._run_report('rmk_by_years', compute, show)
 
     def _build_tab_slownik(self, nb):
         tab = ttk.Frame(nb)
@@ -2521,68 +4927,107 @@ Funkcjonalności:
         new_start = max(0, min(new_start, max_start))
         if new_start != self.report_months_window_start:
             self.report_months_window_start = new_start
-            # regenerate report keeping same filters
-            self.generate_report()
+            if self._report_is_current():
+                # przerysuj okno z zapamiętanych sum - bez ponownego liczenia raportu
+                self._render_report_window()
+            else:
+                self.generate_report()
+
+    def _report_is_current(self) -> bool:
+        """Czy zapamiętane sumy raportu pochodzą z bieżących sum i bieżącej firmy"""
+        source = getattr(self, 'report_source', None)
+        store = self.aggregates
+        return source == (store, store.version, getattr(self, 'current_company', ''))
 
     # ---- refresh helpers ----
+    @staticmethod
+    def _rmk_row(it) -> tuple:
+        """(iid, wartości, tagi) wiersza listy RMK"""
+        # format kwota for display using thousand_sep
+        kw = thousand_sep(it.kwota)
+        generated = getattr(it, 'harmonogram_generated', False)
+        status_sym = '✓' if generated else '✗'
+        uwagi_text = getattr(it, 'uwagi', '') or ''  # Obsługa starych danych bez pola uwagi
+        values = (it.id, it.opis, it.data_start.isoformat(), it.data_koniec.isoformat() if it.data_koniec else "", it.liczba_mies, kw, it.kategoria, it.konto_kosztowe, it.konto_rmk, it.numer_faktury, it.kontrahent, status_sym, uwagi_text)
+        # color row green if generated, red otherwise
+        return str(it.id), values, ('gen',) if generated else ('ungen',)
+
     def refresh_rmk_tree(self):
         if not hasattr(self, 'tree'):
             return
-        self.tree.delete(*self.tree.get_children())
-        # Show only items for the current company for non-admin users
-        try:
-            is_admin = bool(getattr(self, 'current_user_admin', False))
-        except Exception:
-            is_admin = False
-        cur_company = getattr(self, 'current_company', '')
-        for it in self.rmk_items:
-            # always filter by current_company if set - show only items assigned to that company
-            if cur_company and it.firma and it.firma != cur_company:
-                continue
-            # format kwota for display using thousand_sep
-            kw = thousand_sep(it.kwota)
-            status_sym = '✓' if getattr(it, 'harmonogram_generated', False) else '✗'
-            uwagi_text = getattr(it, 'uwagi', '') or ''  # Obsługa starych danych bez pola uwagi
-            self.tree.insert('', 'end', iid=str(it.id), values=(it.id, it.opis, it.data_start.isoformat(), it.data_koniec.isoformat() if it.data_koniec else "", it.liczba_mies, kw, it.kategoria, it.konto_kosztowe, it.konto_rmk, it.numer_faktury, it.kontrahent, status_sym, uwagi_text))
-            # color row green if generated, red otherwise
-            try:
-                if getattr(it, 'harmonogram_generated', False):
-                    self.tree.item(str(it.id), tags=('gen',))
-                else:
-                    self.tree.item(str(it.id), tags=('ungen',))
-            except Exception:
-                pass
+        # only items assigned to the current company (and items without company)
+        company_items = self._company_items()
+        # tag wiersza (gen/ungen) ustawiany od razu przy wstawianiu, tylko dla widocznego okna
+        self.rmk_list.set_rows(company_items)
+        self._harmo_items_changed(reset=True)
         # tag styles (ttk Treeview doesn't support tag foreground/bg directly in all themes)
         try:
             self.tree.tag_configure('gen', background='#d4edda', foreground='#000000')  # Jasnozielone tło, czarny tekst
             self.tree.tag_configure('ungen', background='#f8d7da', foreground='#000000')  # Jasnoróżowe tło, czarny tekst
         except Exception:
             pass
-        
-        # Wymóż odświeżenie kolorów po załadowaniu danych
-        try:
-            self.tree.after(50, lambda: self.tree.event_generate('<<TreeviewOpen>>'))
-        except Exception:
-            pass
-        # update harmonogram item combobox values
+
+    def _update_rmk_rows(self, added=(), changed=(), removed=()):
+        """Przyrostowe odświeżenie listy RMK po dodaniu, edycji lub usunięciu pozycji.
+
+        Zmieniane są tylko dotknięte wiersze, a lista pozycji w zakładce
+        Harmonogram jest oznaczana do przebudowy przy najbliższym rozwinięciu.
+        """
+        if not hasattr(self, 'tree'):
+            return
+        company = getattr(self, 'current_company', '')
+        def visible(it):
+            return not company or (it.firma or "") in (company, "")
+        # pozycja przeniesiona do innej firmy znika z listy
+        removed = [int(i) for i in removed] + [it.id for it in changed if not visible(it)]
+        for it in added:
+            if visible(it):
+                self.rmk_list.add_row(it)
+        for it in changed:
+            if visible(it):
+                self.rmk_list.update_row(it)
+        if removed:
+            self.rmk_list.remove_rows([str(i) for i in removed])
+        self._harmo_items_changed(changed=[it for it in changed if visible(it)], removed=removed)
+
+    @staticmethod
+    def _harmo_label(it) -> str:
+        return f"{it.id}: {it.kategoria} | {it.opis} | {it.data_start.strftime('%Y-%m-%d')} - {it.data_koniec.strftime('%Y-%m-%d') if it.data_koniec else 'N/A'}"
+
+    def _fill_harmo_item_cb(self):
+        """postcommand listy pozycji Harmonogramu - wartości budowane dopiero przy rozwinięciu"""
+        if getattr(self, '_harmo_values_stale', True) and hasattr(self, 'harmo_item_cb'):
+            self.harmo_item_cb['values'] = [self._harmo_label(it) for it in self.rmk_list.rows]
+            self._harmo_values_stale = False
+
+    def _harmo_items_changed(self, reset: bool = False, changed=(), removed=()):
+        """Oznacza listę pozycji Harmonogramu do przebudowy i poprawia wybraną pozycję"""
+        self._harmo_values_stale = True
+        if not hasattr(self, 'harmo_item_cb'):
+            return
         try:
-            vals = [f"{it.id}: {it.kategoria} | {it.opis} | {it.data_start.strftime('%Y-%m-%d')} - {it.data_koniec.strftime('%Y-%m-%d') if it.data_koniec else 'N/A'}" for it in self.rmk_items if not cur_company or not it.firma or it.firma == cur_company]
-            if hasattr(self, 'harmo_item_cb'):
-                self.harmo_item_cb['values'] = vals
-                if vals:
-                    try:
-                        self.harmo_item_cb.current(0)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+            current = int(self.harmo_item_cb.get().split(':', 1)[0])
+        except ValueError:
+            current = None
+        if reset or current is None or current in removed:
+            # update harmonogram item combobox - first item selected
+            rows = self.rmk_list.rows
+            self.harmo_item_cb.set(self._harmo_label(rows[0]) if rows else '')
+            return
+        for it in changed:
+            if it.id == current:
+                self.harmo_item_cb.set(self._harmo_label(it))
 
     def refresh_cat_tree(self):
+        if not hasattr(self, 'cat_tree'):
+            return
         self.cat_tree.delete(*self.cat_tree.get_children())
         for c in self.categories:
             self.cat_tree.insert('', 'end', values=(c,))
 
     def refresh_acc_tree(self):
+        if not hasattr(self, 'acc_tree'):
+            return
         self.acc_tree.delete(*self.acc_tree.get_children())
         
         # Pokaż konta dla aktualnej firmy
@@ -2597,6 +5042,8 @@ Funkcjonalności:
                 self.acc_tree.insert('', 'end', values=(a['konto'], a.get('opis', '')))
 
     def refresh_rmk_acc_tree(self):
+        if not hasattr(self, 'rmk_acc_tree'):
+            return
         self.rmk_acc_tree.delete(*self.rmk_acc_tree.get_children())
         
         # Pokaż konta RMK dla aktualnej firmy
@@ -2611,12 +5058,16 @@ Funkcjonalności:
                 self.rmk_acc_tree.insert('', 'end', values=(r['konto'], r.get('opis', '')))
 
     def refresh_user_tree(self):
+        if not hasattr(self, 'user_tree'):
+            return
         self.user_tree.delete(*self.user_tree.get_children())
         for u, d in self.users.items():
             firms = ", ".join(d.get('companies', []))
             self.user_tree.insert('', 'end', iid=u, values=(u, 'Admin' if d['is_admin'] else 'Użytkownik', firms))
 
     def refresh_company_tree(self):
+        if not hasattr(self, 'company_tree'):
+            return
         self.company_tree.delete(*self.company_tree.get_children())
         for c in self.companies:
             self.company_tree.insert('', 'end', values=(c,))
@@ -2625,7 +5076,7 @@ Funkcjonalności:
     def add_item(self):
         dlg = ItemDialog(self, None)
         if dlg.result:
-            new_id = (max([it.id for it in self.rmk_items]) + 1) if self.rmk_items else 1
+            new_id = self.item_store.ensure(self.rmk_items).allocate_id()
             r = dlg.result
             firma = r.get('firma') or (self.current_company if hasattr(self, 'current_company') else '')
             item = RMKItem(new_id, r['opis'], r['data_start'], r['liczba_mies'], r['kwota'], firma, r['kategoria'], r['konto_kosztowe'], r['konto_rmk'], r['numer_faktury'], r['kontrahent'], r.get('uwagi', ''), r['data_koniec'])
@@ -2635,9 +5086,14 @@ Funkcjonalności:
             item.harmonogram_generated = False
             item.harmonogram = []
             self.rmk_items.append(item)
-            self.refresh_rmk_tree()
+            self.schedule_cache.invalidate(item.id)
+            self.aggregates.add(item)
+            self.item_store.add(item)
+            self._mark_item_dirty(item, 'add')
+            self._update_rmk_rows(added=[item])
             self._save_state()
     def import_excel(self):
+        openpyxl = lazy_import('openpyxl')
         if openpyxl is None:
             messagebox.showerror(APP_NAME, "Brak biblioteki openpyxl. Zainstaluj zależność (pip install openpyxl).")
             return
@@ -2796,7 +5252,7 @@ Funkcjonalności:
         added = 0
         for pr in preview_rows:
             try:
-                new_id = (max([it.id for it in self.rmk_items]) + 1) if self.rmk_items else 1
+                new_id = self.item_store.ensure(self.rmk_items).allocate_id()
                 firma = pr.get('firma') or (self.current_company if hasattr(self, 'current_company') else '')
                 
                 # Nowa logika importu:
@@ -2820,6 +5276,10 @@ Funkcjonalności:
                 item.harmonogram_generated = False
                 item.harmonogram = []
                 self.rmk_items.append(item)
+                self.schedule_cache.invalidate(item.id)
+                self.aggregates.add(item)
+                self.item_store.add(item)
+                self._mark_item_dirty(item, 'add')
                 # Nie dodawaj kategorii z Excela do słownika kategorii (teraz trafia do uwag)
                 # if pr['kategoria'] and pr['kategoria'] not in self.categories:
                 #     self.categories.append(pr['kategoria'])
@@ -2889,9 +5349,9 @@ Funkcjonalności:
                 header_text = str(c)
             tv.heading(c, text=header_text)
             tv.column(c, width=110, anchor='w' if c in ('firma','kategoria','kontrahent','uwagi_excel','faktura') else 'e')
-        for r in rows:
-            tv.insert('', 'end', values=(r['firma'], r['kategoria'], r['od'].isoformat(), r['do'].isoformat(), r['konto_kosztowe'], r['konto_rmk'], thousand_sep(r['wartosc']), r['kontrahent']))
+        preview_rows = [(r['firma'], r['kategoria'], r['od'].isoformat(), r['do'].isoformat(), r['konto_kosztowe'], r['konto_rmk'], thousand_sep(r['wartosc']), r['kontrahent']) for r in rows]
         tv.pack(fill=tk.BOTH, expand=True)
+        populator = self._populate_tree('import_preview', tv, preview_rows)
         
         # Dodaj obramowania do tabeli podglądu importu
         configure_single_treeview_borders(tv)
@@ -2907,16 +5367,17 @@ Funkcjonalności:
         ttk.Button(btnf, text="Anuluj", command=on_cancel).pack(side=tk.RIGHT, padx=6)
         self._btn(btnf, text="Importuj", command=on_confirm, bootstyle='primary').pack(side=tk.RIGHT, padx=6)
         dlg.wait_window()
+        populator.cancel()
         return ans['ok']
 
     def edit_item(self):
-        sel = self.tree.selection()
+        sel = self.rmk_list.selection()
         if not sel:
             messagebox.showinfo(APP_NAME, "Wybierz pozycję do edycji.")
             return
         iid = sel[0]
         it_id = int(iid)
-        item = next((x for x in self.rmk_items if x.id == it_id), None)
+        item = self._item_by_id(it_id)
         if not item:
             messagebox.showerror(APP_NAME, "Nie znaleziono pozycji.")
             return
@@ -2947,32 +5408,50 @@ Funkcjonalności:
                 item.harmonogram = []
             except Exception:
                 pass
-            self.refresh_rmk_tree()
+            self.schedule_cache.invalidate(item.id)
+            self.aggregates.update(item)
+            self.item_store.move(item)
+            self._mark_item_dirty(item)
+            self._update_rmk_rows(changed=[item])
             self._save_state()
 
     def delete_item(self):
-        sel = self.tree.selection()
+        sel = self.rmk_list.selection()
         if not sel:
             messagebox.showinfo(APP_NAME, "Wybierz pozycję do usunięcia.")
             return
         if messagebox.askyesno(APP_NAME, "Czy na pewno usunąć wybrane pozycje?"):
+            ids = set()
             for s in sel:
                 try:
-                    it_id = int(s)
-                    self.rmk_items = [x for x in self.rmk_items if x.id != it_id]
+                    ids.add(int(s))
                 except:
                     pass
-                self.tree.delete(s)
+            # jedno przejście po liście niezależnie od liczby zaznaczonych wierszy
+            self.item_store.ensure(self.rmk_items)
+            self.aggregates.ensure(self.rmk_items)
+            self.rmk_items = [x for x in self.rmk_items if x.id not in ids]
+            self.item_store.remove_many(ids)
+            for it_id in ids:
+                self.schedule_cache.invalidate(it_id)
+                self.aggregates.remove(it_id)
+            self._mark_items_deleted(ids)
+            self._update_rmk_rows(removed=ids)
+            self.aggregates.track(self.rmk_items)
+            self.item_store.track(self.rmk_items)
             self._save_state()
 
     # ---- harmonogram ----
     def generate_harmonogram(self):
-        sel = self.tree.selection()
+        sel = self.rmk_list.selection()
         if not sel:
             messagebox.showinfo(APP_NAME, "Wybierz pozycję z listy RMK.")
             return
+        # wynik trafia do tabeli zakładki "Harmonogram"
+        self._ensure_tab("Harmonogram")
         iid = sel[0]
-        vals = self.tree.item(iid, 'values')
+        # wartości z pozycji - wiersz mógł zostać przewinięty poza widoczne okno
+        vals = self.rmk_list.values(iid)
         start = datetime.strptime(str(vals[2]), "%Y-%m-%d").date()
         
         # Obsłuż pustą datę końca
@@ -3008,6 +5487,9 @@ Funkcjonalności:
         # Oblicz całkowitą liczbę dni
         total_days = (end - start).days + 1
         kwota_na_dzien = kwota / total_days if total_days > 0 else 0
+        # W trybie groszowym kwoty miesięcy są liczbami groszy, a suma jest dokładna
+        grosze_mode = self.amortization_mode == AMORTIZATION_GROSZE
+        kwota_gr = to_grosze(kwota)
         
         current_date = start
         suma_kwot = 0.0
@@ -3032,12 +5514,16 @@ Funkcjonalności:
             days_in_period = (period_end - current_date).days + 1
             
             # Kwota dla tego miesiąca
-            kwota_miesiac = round(kwota_na_dzien * days_in_period, 2)
+            if grosze_mode:
+                kwota_miesiac_gr = _div_round(kwota_gr * days_in_period, total_days)
+                kwota_miesiac = kwota_miesiac_gr / 100
+            else:
+                kwota_miesiac = round(kwota_na_dzien * days_in_period, 2)
             suma_kwot += kwota_miesiac
             
             month_key = current_date.strftime("%Y-%m")
             months_list.append(month_key)
-            harmonogram_data[month_key] = kwota_miesiac
+            harmonogram_data[month_key] = kwota_miesiac_gr if grosze_mode else kwota_miesiac
             
             harmonogram_rows.append({
                 'miesiac': month_key, 
@@ -3046,13 +5532,22 @@ Funkcjonalności:
                 'konto_rmk': vals[8], 
                 'kategoria': vals[6]
             })
+            if grosze_mode:
+                harmonogram_rows[-1]['kwota_gr'] = kwota_miesiac_gr
             
             # Przejdź do pierwszego dnia następnego miesiąca
             current_date = next_month_start
         
         # Sprawdź różnicę i dodaj do ostatniego miesiąca jeśli potrzeba
+        if grosze_mode and months_list:
+            # Ostatni miesiąc domyka sumę co do grosza
+            last_month = months_list[-1]
+            reszta_gr = kwota_gr - sum(row['kwota_gr'] for row in harmonogram_rows[:-1])
+            harmonogram_data[last_month] = reszta_gr
+            harmonogram_rows[-1]['kwota_gr'] = reszta_gr
+            harmonogram_rows[-1]['kwota'] = reszta_gr / 100
         roznica = round(kwota - suma_kwot, 2)
-        if abs(roznica) > 0.01 and months_list:  # Jeśli różnica > 1 grosz
+        if not grosze_mode and abs(roznica) > 0.01 and months_list:  # Jeśli różnica > 1 grosz
             # Dodaj różnicę do ostatniego miesiąca
             last_month = months_list[-1]
             harmonogram_data[last_month] += roznica
@@ -3081,28 +5576,32 @@ Funkcjonalności:
         total_sum = 0.0
         for month in months_list:
             kwota_m = harmonogram_data[month]
-            row_values.append(thousand_sep(kwota_m))
+            row_values.append(self.format_amount(kwota_m))
             total_sum += kwota_m
-        row_values.append(thousand_sep(total_sum))
+        row_values.append(self.format_amount(total_sum))
         
         self.harmo_tree.insert('', 'end', values=row_values)
 
         # persist into RMKItem
         try:
             it_id = int(iid)
-            item = next((x for x in self.rmk_items if x.id == it_id), None)
+            item = self._item_by_id(it_id)
             if item:
                 item.harmonogram = harmonogram_rows
                 item.harmonogram_generated = True
+                self._mark_item_dirty(item, 'generate')
                 self._save_state()
                 # refresh list to update status
-                self.refresh_rmk_tree()
+                self._update_rmk_rows(changed=[item])
         except Exception:
             pass
         
         # Pokaż informacje o wygenerowanym harmonogramie
         miesiecy = len(harmonogram_rows)
-        suma_kontrolna = sum(row['kwota'] for row in harmonogram_rows)
+        if grosze_mode:
+            suma_kontrolna = sum(row['kwota_gr'] for row in harmonogram_rows) / 100
+        else:
+            suma_kontrolna = sum(row['kwota'] for row in harmonogram_rows)
         messagebox.showinfo(APP_NAME, f"Wygenerowano harmonogram na {miesiecy} miesięcy.\nCałkowita kwota: {thousand_sep(kwota)}\nSuma harmonogramu: {thousand_sep(suma_kontrolna)}\nCałkowite dni: {total_days}")
 
     def show_selected_harmonogram(self):
@@ -3121,7 +5620,7 @@ Funkcjonalności:
         except Exception:
             messagebox.showerror(APP_NAME, "Niepoprawny wybór pozycji RMK.")
             return
-        item = next((x for x in self.rmk_items if x.id == it_id), None)
+        item = self._item_by_id(it_id)
         if not item:
             messagebox.showerror(APP_NAME, "Nie znaleziono pozycji RMK.")
             return
@@ -3139,10 +5638,13 @@ Funkcjonalności:
             # Pokaż zapisany harmonogram w nowym formacie (kolumny = miesiące)
             harmonogram_data = {}
             months_list = []
+            # harmonogram zapisany w trybie groszowym ma dokładne kwoty w 'kwota_gr'
+            saved_grosze = all('kwota_gr' in r for r in item.harmonogram)
+            fmt = format_grosze if saved_grosze else thousand_sep
             
             for r in item.harmonogram:
                 month = r.get('miesiac')
-                kwota = r.get('kwota', 0.0)
+                kwota = r['kwota_gr'] if saved_grosze else r.get('kwota', 0.0)
                 if month:
                     months_list.append(month)
                     harmonogram_data[month] = kwota
@@ -3168,9 +5670,9 @@ Funkcjonalności:
             total_sum = 0.0
             for month in months_list:
                 kwota_m = harmonogram_data.get(month, 0.0)
-                row_values.append(thousand_sep(kwota_m))
+                row_values.append(fmt(kwota_m))
                 total_sum += kwota_m
-            row_values.append(thousand_sep(total_sum))
+            row_values.append(fmt(total_sum))
             
             self.harmo_tree.insert('', 'end', values=row_values)
             messagebox.showinfo(APP_NAME, f"Pokażono zapisany harmonogram dla pozycji {item.id}.")
@@ -3181,15 +5683,15 @@ Funkcjonalności:
         liczba_mies = int(item.liczba_mies)
         kwota = float(item.kwota)
         
-        # Użyj ulepszonego algorytmu
-        monthly_amounts = calculate_monthly_amounts_improved(kwota, start, liczba_mies)
+        # Użyj ulepszonego algorytmu (harmonogram z cache, jeśli był już liczony)
+        monthly_amounts = self.schedule_cache.get(item)
         
         months_list = []
         harmonogram_data = {}
         
+        start_m = month_ordinal(start)
         for i in range(liczba_mies):
-            m = month_add(start, i)
-            month_key = m.strftime("%Y-%m")
+            month_key = ordinal_label(start_m + i)
             part = monthly_amounts[i] if i < len(monthly_amounts) else 0.0
             months_list.append(month_key)
             harmonogram_data[month_key] = part
@@ -3215,9 +5717,9 @@ Funkcjonalności:
         total_sum = 0.0
         for month in months_list:
             kwota_m = harmonogram_data[month]
-            row_values.append(thousand_sep(kwota_m))
+            row_values.append(self.format_amount(kwota_m))
             total_sum += kwota_m
-        row_values.append(thousand_sep(total_sum))
+        row_values.append(self.format_amount(total_sum))
         
         self.harmo_tree.insert('', 'end', values=row_values)
         messagebox.showinfo(APP_NAME, f"Pokażono harmonogram dla pozycji {item.id} (wygenerowany tymczasowo).")
@@ -3341,29 +5843,12 @@ Funkcjonalności:
             is_admin = False
         cur_company = getattr(self, 'current_company', '')
 
-        agg: Dict[str, float] = {}
-        for it in self.rmk_items:
-            # always respect current company selection
-            if cur_company and it.firma and it.firma != cur_company:
-                continue
-            # filter by chosen category unless 'Wszystkie'
-            if chosen and chosen != "Wszystkie":
-                try:
-                    if str(it.kategoria).strip().casefold() != chosen.casefold():
-                        continue
-                except Exception:
-                    continue
-            # Użyj ulepszonego algorytmu rozliczania miesięcznego
-            monthly_amounts = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
-            
-            for i in range(it.liczba_mies):
-                m = month_add(it.data_start, i).strftime("%Y-%m")
-                part = monthly_amounts[i] if i < len(monthly_amounts) else 0.0
-                agg[m] = agg.get(m, 0.0) + part
+        # always respect current company selection, filter by chosen category unless 'Wszystkie'
+        agg: Dict[int, float] = self._report_cube(chosen).rollup().get("", {})
 
         self.harmo_tree.delete(*self.harmo_tree.get_children())
         for m in sorted(agg.keys()):
-            self.harmo_tree.insert('', 'end', values=(m, thousand_sep(agg[m]), "", "", chosen if chosen else "Wszystkie"))
+            self.harmo_tree.insert('', 'end', values=(ordinal_label(m), self.format_amount(agg[m]), "", "", chosen if chosen else "Wszystkie"))
         messagebox.showinfo(APP_NAME, f"Wyświetlono podsumowanie RMK wg miesięcy (Kategoria: {chosen}).")
 
     # ---- słowniki CRUD ----
@@ -3615,6 +6100,8 @@ Funkcjonalności:
         cb.grid(row=0, column=1, padx=6, pady=8)
         ans = {'ok': False}
         def on_ok():
+            # raporty liczone w tle dotyczą poprzedniej firmy
+            self.cancel_reports()
             try:
                 self.current_company = cb.get()
                 # update title
@@ -3652,46 +6139,51 @@ Funkcjonalności:
         if (od and not od_d) or (do and not do_d):
             messagebox.showerror("Błąd", "Niepoprawny format daty (użyj YYYY-MM) lub puste pola.")
             return
-        data: Dict[str, Dict[str, float]] = {}
         cats = set(self.categories)
-        try:
-            is_admin = bool(getattr(self, 'current_user_admin', False))
-        except Exception:
-            is_admin = False
         cur_company = getattr(self, 'current_company', '')
         # persist report filters
         try:
             self.view_state = getattr(self, 'view_state', {})
             self.view_state['report_filters'] = {'category': kat, 'od': od, 'do': do}
-            self._save_state()
+            self._save_view_state()
         except Exception:
             pass
 
-        for it in self.rmk_items:
-            # always respect current company selection
-            if cur_company and it.firma and it.firma != cur_company:
-                continue
-            # Użyj ulepszonego algorytmu rozliczania miesięcznego
-            monthly_amounts = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
-            
-            for i in range(it.liczba_mies):
-                mdate = month_add(it.data_start, i)
-                if od_d and mdate < od_d: continue
-                if do_d and mdate > do_d: continue
-                m = mdate.strftime("%Y-%m")
-                part = monthly_amounts[i] if i < len(monthly_amounts) else 0.0
-                data.setdefault(m, {})
-                data[m][it.kategoria] = data[m].get(it.kategoria, 0.0) + part
-                cats.add(it.kategoria)
-        months = sorted(data.keys())
-        cats = sorted(cats)
-        if kat and kat != "Wszystkie":
-            cats = [kat]
+        # always respect current company selection
+        od_m = month_ordinal(od_d) if od_d else None
+        do_m = month_ordinal(do_d) if do_d else None
+
+        store = self.aggregates
+
+        def compute(job):
+            # sumy narastające kategorii - okno miesięcy i jego przewijanie czytają z nich w O(1);
+            # wiersze okna formatuje _render_report_window w wątku Tk
+            with store.lock:
+                report_prefix = self._report_cube(store=store, company=cur_company).months(od_m, do_m).prefix_sums('kategoria')
+                # z jakich sum i dla której firmy liczono - patrz _report_is_current
+                source = (store, store.version, cur_company)
+            months = sorted(set().union(*(p.months for p in report_prefix.values())))
+            return report_prefix, months, source
+
+        def show(result):
+            self.report_prefix, months, self.report_source = result
+            report_cats = sorted(cats.union(self.report_prefix))
+            if kat and kat != "Wszystkie":
+                report_cats = [kat]
+            self.report_cats = report_cats
+
+            # Prepare months window (max self.report_window_size months)
+            self.report_months_full = months
+            self._render_report_window()
+
+        self._run_report('report', compute, show)
+
+    def _render_report_window(self):
+        """Rysuje tabelę raportu dla bieżącego okna miesięcy z zapamiętanych sum narastających."""
+        months = self.report_months_full
+        cats = self.report_cats
         for w in self.report_frame.winfo_children():
             w.destroy()
-
-        # Prepare months window (max self.report_window_size months)
-        self.report_months_full = months
         if not hasattr(self, 'report_months_window_start'):
             self.report_months_window_start = 0
         # clamp window start
@@ -3704,7 +6196,7 @@ Funkcjonalności:
         months_window = months[wnd_start:wnd_end]
         # update window label
         if months_window:
-            lbl = f"Miesiące: {months_window[0]} - {months_window[-1]} ({min(len(months), self.report_window_size)}/{len(months)})"
+            lbl = f"Miesiące: {ordinal_label(months_window[0])} - {ordinal_label(months_window[-1])} ({min(len(months), self.report_window_size)}/{len(months)})"
         else:
             lbl = "Brak miesięcy"
         try:
@@ -3713,7 +6205,7 @@ Funkcjonalności:
             pass
 
         # columns: kategoria | month1 | month2 | ... | Razem
-        cols = ["kategoria"] + months_window + ["Razem"]
+        cols = ["kategoria"] + [ordinal_label(m) for m in months_window] + ["Razem"]
         tree_container, tree = self._make_scrolled_tree(self.report_frame, cols)
         # adjust headings text
         for c in cols:
@@ -3733,26 +6225,27 @@ Funkcjonalności:
         tree_container.pack(fill=tk.BOTH, expand=True)
 
         # rows: one row per category
-        sums_per_month = {m: 0.0 for m in months_window}
-        grand_total = 0.0
-        today = date.today()
-        first_of_current_month = date(today.year, today.month, 1)
-        for c in cats:
-            row = [c]
-            total = 0.0
-            for m in months_window:
-                v = data.get(m, {}).get(c, 0.0)
-                total += v
-                sums_per_month[m] += v
-                row.append(thousand_sep(v))
-            grand_total += total
-            row.append(thousand_sep(total))
-            tree.insert('', 'end', values=row)
-
-        # footer: SUMA | sum(window months...) | grand
-        if months_window:
-            footer = ["SUMA"] + [thousand_sep(sums_per_month[m]) for m in months_window] + [thousand_sep(grand_total)]
-            tree.insert('', 'end', values=footer)
+        report_prefix = self.report_prefix
+        no_data = MonthPrefix({}, self.aggregates.divisor)
+        def rows():
+            sums_per_month = {m: 0.0 for m in months_window}
+            grand_total = 0.0
+            for c in cats:
+                prefix = report_prefix.get(c, no_data)
+                row = [c]
+                for m in months_window:
+                    v = prefix.at(m)
+                    sums_per_month[m] += v
+                    row.append(self.format_amount(v))
+                total = prefix.total(months_window[0], months_window[-1]) if months_window else 0.0
+                grand_total += total
+                row.append(self.format_amount(total))
+                yield row
+
+            # footer: SUMA | sum(window months...) | grand
+            if months_window:
+                yield ["SUMA"] + [self.format_amount(sums_per_month[m]) for m in months_window] + [self.format_amount(grand_total)]
+        self._populate_tree('report', tree, rows())
         self.report_tree = tree
         # attach export path for convenience
         try:
@@ -3838,7 +6331,14 @@ Funkcjonalności:
         return frame, tree
 
     def export_tree_to_pdf(self, tree: ttk.Treeview, title: str, filepath: str):
-        if not REPORTLAB_AVAILABLE:
+        # reportlab importowany dopiero przy pierwszym eksporcie
+        try:
+            from reportlab.lib.pagesizes import A4, landscape
+            from reportlab.lib import colors
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+            from reportlab.lib.utils import ImageReader
+            from reportlab.lib.styles import getSampleStyleSheet
+        except Exception:
             messagebox.showerror(APP_NAME, "Brak biblioteki reportlab. Zainstaluj: pip install reportlab")
             return False
         # collect headers and rows
@@ -3924,89 +6424,17 @@ Funkcjonalności:
                 # if anything goes wrong, fall back to default
                 font_name = 'Helvetica'
 
-            # compute absolute base dir for reliable logo lookups (independent of CWD)
-            base_dir = resource_path("")  # Użyj funkcji resource_path dla PyInstaller
-            logo_path = None
-            
-            print(f"🔍 Debug logo - bazowy katalog: {base_dir}")
-            
-            try:
-                logo_dir = os.path.join(base_dir, 'logo')
-                print(f"🔍 Debug logo - katalog logo: {logo_dir}")
-                print(f"🔍 Debug logo - katalog istnieje: {os.path.isdir(logo_dir)}")
-                
-                if os.path.isdir(logo_dir):
-                    files = os.listdir(logo_dir)
-                    print(f"🔍 Debug logo - pliki w katalogu: {files}")
-                    
-                    # Znajdź najlepszy plik logo (najwiekszy i prawidłowy)
-                    best_logo = None
-                    best_size = 0
-                    
-                    for fn in files:
-                        print(f"🔍 Debug logo - sprawdzam plik: {fn}")
-                        if fn.lower().endswith(('.png', '.jpg', '.jpeg')):
-                            candidate_path = os.path.join(logo_dir, fn)
-                            try:
-                                # Sprawdź rozmiar pliku i czy da się załadować
-                                file_size = os.path.getsize(candidate_path)
-                                if file_size > 100:  # Min 100 bajtów
-                                    # Test czy da się załadować jako obraz
-                                    ir = ImageReader(candidate_path)
-                                    iw, ih = ir.getSize()
-                                    if iw > 10 and ih > 10:  # Min 10x10 pikseli
-                                        print(f"OK Debug logo - KANDYDAT: {candidate_path} ({iw}x{ih}, {file_size}b)")
-                                        if file_size > best_size:
-                                            best_logo = candidate_path
-                                            best_size = file_size
-                                            print(f"🎯 Debug logo - NOWY NAJLEPSZY: {best_logo}")
-                                    else:
-                                        print(f"BŁĄD Debug logo - za małe wymiary: {candidate_path} ({iw}x{ih})")
-                                else:
-                                    print(f"BŁĄD Debug logo - za mały plik: {candidate_path} ({file_size}b)")
-                            except Exception as e:
-                                print(f"BŁĄD Debug logo - błąd ładowania: {candidate_path} - {e}")
-                    
-                    logo_path = best_logo
-                    if logo_path:
-                        print(f"OK Debug logo - WYBRANY FINALNIE: {logo_path}")
-                        
-                # fallback to common filenames in project root
-                if not logo_path:
-                    print("🔍 Debug logo - próbuję fallback w głównym katalogu")
-                    for fn in ('logo.png', 'logo.jpg', 'logo.jpeg'):
-                        p = os.path.join(base_dir, fn)
-                        print(f"🔍 Debug logo - sprawdzam fallback: {p}")
-                        if os.path.exists(p):
-                            logo_path = p
-                            print(f"OK Debug logo - ZNALEZIONO FALLBACK: {logo_path}")
-                            break
-            except Exception as e:
-                print(f"BŁĄD Debug logo - błąd wyszukiwania: {e}")
-                logo_path = None
-
-            print(f"🎯 Debug logo - FINALNY WYNIK: {logo_path}")
-            
-            # Przygotuj logo dla nagłówka (mniejsze, po prawej stronie)
+            # Logo nagłówka (mniejsze, po prawej stronie) - ścieżka i wymiary z pamięci logo;
+            # ImageReader sprawdza pliki tylko przy pierwszym wyszukiwaniu
             logo_element = None
-            if logo_path:
-                try:
-                    print(f"IMG Debug logo - próbuję załadować: {logo_path}")
-                    ir = ImageReader(logo_path)
-                    iw, ih = ir.getSize()
-                    # Zmniejszone logo dla nagłówka - max 80px szerokości
-                    max_w = 80
-                    scale = min(1.0, float(max_w) / float(iw)) if iw and iw > 0 else 1.0
-                    img_w = iw * scale
-                    img_h = ih * scale
+            try:
+                pdf_logo = self._logo_cache().pdf_logo(lambda path: ImageReader(path).getSize())
+                if pdf_logo:
+                    logo_path, img_w, img_h = pdf_logo
                     logo_element = Image(logo_path, width=img_w, height=img_h)
-                    print(f"OK Debug logo - przygotowano dla nagłówka ({img_w}x{img_h})")
-                except Exception as e:
-                    print(f"BŁĄD Debug logo - błąd ładowania: {e}")
-                    logo_element = None
-            
-            if not logo_element:
-                print("BŁĄD Debug logo - brak logo w nagłówku PDF")
+            except Exception as e:
+                print(f"BŁĄD Logo PDF: {e}")
+                logo_element = None
 
             # Header: app name + title + logo w tabeli (use registered font)
             title_style = styles.get('Title', styles['Normal']).clone('CustomTitle')
@@ -4163,6 +6591,9 @@ if __name__ == '__main__':
         
         app = RMKApp()
         app.mainloop()
+        app.report_workers.shutdown()
+        # zapis w tle kończy się przed wyjściem z programu
+        app._flush_state()
     except Exception as e:
         # Zapisz błąd do pliku jeśli aplikacja się nie uruchomi
         try:
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test sum raportów aktualizowanych różnicowo (AggregateStore)
+"""
+
+import os
+import sys
+import random
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import (AggregateStore, ScheduleCache, MonthPrefix, IntervalIndex, AMORTIZATION_FLOAT,
+                  AMORTIZATION_GROSZE, month_ordinal, ordinal_year, RMKItem)
+from test_batch_amortization import _random_items, _aggregate
+
+def _expected(items, keyfn, firma="", od=None, do=None, kategoria=""):
+    chosen = [it for it in items
+              if not (firma and it.firma and it.firma != firma)
+              and not (kategoria and str(it.kategoria).strip().casefold() != kategoria.casefold())]
+    return _aggregate(chosen, keyfn, od, do)
+
+def _rounded(agg):
+    return {k: {m: round(v, 2) for m, v in per_month.items()} for k, per_month in agg.items()}
+
+def test_store_matches_full_aggregation():
+    """Sumy po serii dodań, edycji i usunięć są takie jak liczone od zera"""
+    print("📦 Test różnicowej aktualizacji sum")
+    rnd = random.Random(4)
+    items = _random_items(400, seed=21)
+    for it in items[::7]:
+        it.firma = ""
+    store = AggregateStore(ScheduleCache(mode=AMORTIZATION_GROSZE))
+    store.rebuild(items)
+    for step in range(300):
+        op = rnd.random()
+        if op < 0.4:
+            it = rnd.choice(items)
+            it.kwota = round(rnd.uniform(0, 50000), 2)
+            it.liczba_mies = rnd.randint(0, 36)
+            it.kategoria = rnd.choice(["Najem", "Licencje", "najem "])
+            store.update(it)
+        elif op < 0.7 and items:
+            it = items.pop(rnd.randrange(len(items)))
+            store.remove(it.id)
+        else:
+            new = _random_items(1, seed=1000 + step)[0]
+            new.id = 10000 + step
+            items.append(new)
+            store.add(new)
+    store.track(items)
+    # okresy kombinacji aktualizowane różnicowo są takie jak z pełnego przejrzenia komórek
+    for dims, cells in store._cells.items():
+        assert store._periods[dims[0]].span(dims) == (min(cells), max(cells))
+    assert sum(len(p) for p in store._periods.values()) == len(store._cells)
+    version = store.version
+    assert store.ensure(items) is store and len(store) == len(items)
+    assert store.cube().prefix_sums('kategoria') and store.version == version, "Zapytania nie zmieniają wersji"
+    store.update(items[0])
+    assert store.version > version
+
+    assert store.cube().rollup('kategoria') == _expected(items, lambda it: it.kategoria)
+    assert store.report_view("Firma A").months(2022 * 12 + 5, 2026 * 12 + 1).rollup('konto_rmk') == \
+        _expected(items, lambda it: it.konto_rmk, firma="Firma A", od=2022 * 12 + 5, do=2026 * 12 + 1)
+    assert store.report_view(kategoria="Najem").rollup() == _expected(items, lambda it: "", kategoria="Najem")
+    print("✅ Sumy zgodne z pełnym przeliczeniem")
+
+def test_store_float_mode_and_resync():
+    """Tryb float zwraca złote; podmieniona lista pozycji wymusza przebudowę"""
+    print("🔁 Test trybu float i synchronizacji")
+    items = _random_items(200, seed=8)
+    store = AggregateStore(ScheduleCache())
+    store.ensure(items)
+    expected = _aggregate(items, lambda it: it.firma, mode=AMORTIZATION_FLOAT)
+    assert _rounded(store.cube().rollup('firma')) == _rounded(expected)
+
+    replaced = items[:50]
+    store.ensure(replaced)
+    assert len(store) == 50
+    assert _rounded(store.cube().rollup('firma')) == \
+        _rounded(_aggregate(replaced, lambda it: it.firma, mode=AMORTIZATION_FLOAT))
+    for it in replaced:
+        store.remove(it.id)
+    assert store.cube().rollup() == {}
+    print("✅ Tryb float i synchronizacja poprawne")
+
+def test_cube_slice_dice_rollup():
+    """Operacje kostki odpowiadają filtrowaniu i grupowaniu pozycji"""
+    print("🧊 Test kostki slice/dice/rollup")
+    items = _random_items(600, seed=13)
+    store = AggregateStore(ScheduleCache(mode=AMORTIZATION_GROSZE))
+    store.rebuild(items)
+    cube = store.cube()
+
+    only_a = [it for it in items if it.firma == "Firma A"]
+    assert cube.slice('firma', "Firma A").rollup('kategoria') == \
+        _aggregate(only_a, lambda it: it.kategoria)
+
+    diced = [it for it in items if it.kategoria in ("Najem", "") and it.liczba_mies > 0]
+    view = cube.dice(kategoria={"Najem", ""}, konto_rmk=lambda k: k.startswith("6")).months(2024 * 12 + 1)
+    expected = _aggregate(diced, lambda it: (it.firma, it.kategoria), od=2024 * 12 + 1)
+    assert view.rollup('firma', 'kategoria') == expected
+
+    by_year = {}
+    for k, per_month in expected.items():
+        for m, v in per_month.items():
+            by_year.setdefault(k[0], {})
+            by_year[k[0]][ordinal_year(m)] = by_year[k[0]].get(ordinal_year(m), 0) + v
+    assert view.rollup('firma', by_year=True) == by_year
+    assert view.total() == sum(sum(p.values()) for p in expected.values())
+    assert cube.slice('firma', "Brak firmy").rollup() == {}
+    try:
+        cube.slice('kontrahent', "X")
+        assert False, "Nieznany wymiar powinien zgłosić błąd"
+    except ValueError:
+        pass
+    print("✅ Kostka zgodna z pętlą po pozycjach")
+
+def test_prefix_sums_ranges():
+    """Sumy narastające dają sumy dowolnych zakresów Od-Do jak sumowanie miesięcy"""
+    print("➕ Test sum narastających")
+    prefix = MonthPrefix({24300: 5, 24302: 7, 24305: -2})
+    assert prefix.months == [24300, 24302, 24305]
+    assert prefix.total() == 10 and prefix.at(24302) == 7 and prefix.at(24301) == 0
+    assert prefix.total(24301, 24304) == 7 and prefix.total(24306, 24400) == 0
+    assert MonthPrefix({1: 150}, divisor=100).total() == 1.5
+    assert MonthPrefix({}).total(1, 5) == 0
+
+    items = _random_items(500, seed=17)
+    store = AggregateStore(ScheduleCache(mode=AMORTIZATION_GROSZE))
+    store.rebuild(items)
+    view = store.cube().slice('firma', "Firma B")
+    per_month = view.rollup('kategoria')
+    prefixes = view.prefix_sums('kategoria')
+    assert set(prefixes) == set(per_month)
+    rnd = random.Random(2)
+    for _ in range(200):
+        od = rnd.randint(2017 * 12, 2032 * 12)
+        do = od + rnd.randint(0, 60)
+        for k, months in per_month.items():
+            assert prefixes[k].total(od, do) == sum(v for m, v in months.items() if od <= m <= do)
+
+    # edycja pozycji unieważnia sumy narastające jej kombinacji
+    it = next(it for it in items if it.firma == "Firma B" and it.liczba_mies > 0)
+    before = view.prefix_sums()[""].total()
+    it.kwota += 10
+    store.update(it)
+    assert view.prefix_sums()[""].total() == before + 1000
+    print("✅ Sumy zakresów poprawne")
+
+def test_interval_index_prunes_finished_periods():
+    """Zapytanie o rok dotyka tylko kombinacji rozliczanych w tym roku"""
+    print("📅 Test indeksu okresów")
+    index = IntervalIndex()
+    index.set("a", 10, 20)
+    index.set("b", 5, 8)
+    index.set("c", 18, 40)
+    assert sorted(index.overlapping(19, 25)) == ["a", "c"]
+    assert index.overlapping(9, 9) == []
+    assert sorted(index.overlapping()) == ["a", "b", "c"]
+    index.set("b", 30, 35)
+    index.discard("c")
+    assert sorted(index.overlapping(21, 30)) == ["b"] and len(index) == 2
+
+    items = [RMKItem(i, "stara", date(2010, 1, 1), 12, 1200.0, "Firma A", f"K{i}", "401", "640", "", "")
+             for i in range(1, 40)]
+    items.append(RMKItem(100, "bieżąca", date(2025, 3, 10), 24, 2400.0, "Firma A", "Najem", "401", "640", "", ""))
+    items.append(RMKItem(101, "bez firmy", date(2024, 11, 1), 6, 600.0, "", "Najem", "401", "640", "", ""))
+    items.append(RMKItem(102, "inna firma", date(2025, 1, 1), 6, 600.0, "Firma B", "Najem", "401", "640", "", ""))
+    store = AggregateStore(ScheduleCache(mode=AMORTIZATION_GROSZE))
+    store.rebuild(items)
+    view = store.report_view("Firma A").months(2025 * 12 + 1, 2025 * 12 + 12)
+    assert sorted(dims[0] for dims, _ in view._combinations()) == ["", "Firma A"]
+    chosen = [it for it in items if it.id in (100, 101)]
+    assert view.rollup('kategoria') == _aggregate(chosen, lambda it: it.kategoria, 2025 * 12 + 1, 2025 * 12 + 12)
+
+    # usunięcie i edycja przesuwają okres kombinacji
+    store.remove(101)
+    items[-3].data_start = date(2030, 1, 1)
+    store.update(items[-3])
+    assert view.rollup() == {}
+    assert store.report_view("Firma A").months(month_ordinal(date(2031, 6, 1))).rollup() != {}
+    print("✅ Indeks okresów poprawny")
+
+if __name__ == "__main__":
+    test_store_matches_full_aggregation()
+    test_store_float_mode_and_resync()
+    test_cube_slice_dice_rollup()
+    test_prefix_sums_ranges()
+    test_interval_index_prunes_finished_periods()
+    print("🎯 Testy sum raportów zakończone")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test wsadowego (NumPy) rozliczania całego portfela RMK
+"""
+
+import os
+import sys
+import random
+import calendar
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import (RMKItem, AggregateStore, ScheduleCache, AMORTIZATION_GROSZE, calculate_item_schedule,
+                  calculate_monthly_amounts_improved, calculate_monthly_amounts_batch,
+                  month_add, month_ordinal, ordinal_label, ordinal_to_date, ordinal_year, NUMPY_AVAILABLE)
+
+def _random_items(count, seed=7):
+    rnd = random.Random(seed)
+    items = []
+    for i in range(count):
+        y = rnd.randint(2018, 2030)
+        m = rnd.randint(1, 12)
+        d = rnd.randint(1, calendar.monthrange(y, m)[1])
+        mies = rnd.choice([0, 1, 2, 3, 12, 24, rnd.randint(1, 120)])
+        kwota = round(rnd.uniform(-500, 2_000_000), rnd.choice([0, 2]))
+        items.append(RMKItem(i + 1, f"Pozycja {i}", date(y, m, d), mies, kwota,
+                             rnd.choice(["Firma A", "Firma B"]), rnd.choice(["Najem", "Licencje", ""]),
+                             "401", "640", "", ""))
+    return items
+
+def _aggregate(items, keyfn, od=None, do=None, mode=AMORTIZATION_GROSZE):
+    """Wzorcowa pętla raportów: {klucz: {numer miesiąca: kwota}} z harmonogramów pozycji"""
+    agg = {}
+    for it in items:
+        amounts = calculate_item_schedule(it, mode)
+        start = month_ordinal(it.data_start)
+        k = keyfn(it) or ""
+        for i in range(it.liczba_mies):
+            m = start + i
+            if od and m < od: continue
+            if do and m > do: continue
+            agg.setdefault(k, {})
+            agg[k][m] = agg[k].get(m, 0) + (amounts[i] if i < len(amounts) else 0)
+    return agg
+
+def test_batch_matches_scalar():
+    """Wiersze macierzy są identyczne z calculate_monthly_amounts_improved"""
+    print("🧮 Test równoważności rozliczenia wsadowego i skalarnego")
+    if not NUMPY_AVAILABLE:
+        print("⚠️ Brak numpy - pomijam test")
+        return
+    items = _random_items(3000)
+    mat = calculate_monthly_amounts_batch(items)
+    for i, it in enumerate(items):
+        expected = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
+        assert mat.row(i) == expected, f"Pozycja {it.id}: {mat.row(i)} != {expected}"
+        if expected:
+            assert mat.month_label(int(mat.offsets[i])) == it.data_start.strftime("%Y-%m")
+    print(f"✅ {len(items)} pozycji - wyniki identyczne")
+
+def test_aggregate_matches_loop():
+    """Agregacja grupa × miesiąc odpowiada dotychczasowej pętli raportów"""
+    print("📊 Test agregacji miesięcznej")
+    items = _random_items(500, seed=11)
+    od, do = date(2022, 3, 1), date(2026, 8, 1)
+    expected = {}
+    for it in items:
+        amounts = calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
+        for i in range(it.liczba_mies):
+            mdate = month_add(it.data_start, i).replace(day=1)
+            if mdate < od or mdate > do:
+                continue
+            k = it.kategoria or ""
+            m = mdate.strftime("%Y-%m")
+            expected.setdefault(k, {})
+            expected[k][m] = expected[k].get(m, 0.0) + amounts[i]
+    store = AggregateStore(ScheduleCache())
+    store.rebuild(items)
+    by_ordinal = store.report_view().months(month_ordinal(od), month_ordinal(do)).rollup('kategoria')
+    result = {k: {ordinal_label(m): round(v, 2) for m, v in per_month.items()} for k, per_month in by_ordinal.items()}
+    expected = {k: {m: round(v, 2) for m, v in per_month.items()} for k, per_month in expected.items()}
+    assert result == expected, "Agregacja różni się od pętli skalarnej"
+    assert AggregateStore(ScheduleCache()).ensure([]).cube().rollup('kategoria') == {}
+    print("✅ Agregacja zgodna")
+
+def test_month_ordinals():
+    """Numery miesięcy są zgodne z month_add i formatem 'YYYY-MM'"""
+    print("🔢 Test numerów miesięcy")
+    start = date(2023, 11, 30)
+    for i in range(40):
+        mdate = month_add(start, i)
+        assert month_ordinal(mdate) == month_ordinal(start) + i
+        assert ordinal_label(month_ordinal(start) + i) == mdate.strftime("%Y-%m")
+        assert ordinal_to_date(month_ordinal(mdate)) == mdate.replace(day=1)
+        assert ordinal_year(month_ordinal(mdate)) == mdate.year
+    print("✅ Numery miesięcy poprawne")
+
+if __name__ == "__main__":
+    test_month_ordinals()
+    test_batch_matches_scalar()
+    test_aggregate_matches_loop()
+    print("🎯 Testy rozliczenia wsadowego zakończone")
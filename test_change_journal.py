@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test dziennika zmian data.json (ChangeJournal)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import ChangeJournal, RMKItem
+
+def _item(item_id, kwota=1200.0):
+    return RMKItem(item_id, f"Pozycja {item_id}", date(2024, 1, 1), 12, kwota, "Firma A", "Najem", "401", "640", "", "").to_dict()
+
+def test_replay_operations():
+    """Odtworzenie dziennika daje stan po wszystkich operacjach, w kolejności listy"""
+    print("📜 Test odtwarzania dziennika")
+    obj = {'companies': ["Firma A"], 'rmk_items': [_item(1), _item(2), _item(3)]}
+    entries = [
+        {'op': 'edit', 'item': _item(2, 50.0)},
+        {'op': 'add', 'item': _item(4)},
+        {'op': 'delete', 'ids': [1, 99]},
+        {'op': 'generate', 'item': dict(_item(4), harmonogram_generated=True)},
+        {'op': 'meta', 'state': {'companies': ["Firma A", "Firma B"], 'next_item_id': 5}},
+    ]
+    state = ChangeJournal.replay(obj, entries)
+    assert [d['id'] for d in state['rmk_items']] == [2, 3, 4]
+    assert state['rmk_items'][0]['kwota'] == 50.0 and state['rmk_items'][2]['harmonogram_generated']
+    assert state['companies'] == ["Firma A", "Firma B"] and state['next_item_id'] == 5
+    # ponowne odtworzenie (przerwane kompaktowanie) nie zmienia wyniku
+    assert ChangeJournal.replay(state, entries) == state
+    print("✅ Dziennik odtworzony")
+
+def test_torn_last_entry():
+    """Urwany ostatni wpis jest pomijany, a kolejne wpisy trafiają do nowej linii"""
+    print("✂️ Test urwanego wpisu")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = ChangeJournal(os.path.join(tmp, "data.journal.jsonl"))
+        journal.append([{'op': 'add', 'item': _item(1)}, {'op': 'add', 'item': _item(2)}])
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "edit", "item": {"id"')
+        assert len(journal.read()) == 2 and journal.count == 2
+        journal.append([{'op': 'delete', 'ids': [1]}])
+        entries = ChangeJournal(journal.path).read()
+        assert [e['op'] for e in entries] == ['add', 'add', 'delete']
+        assert [d['id'] for d in ChangeJournal.replay({}, entries)['rmk_items']] == [2]
+        journal.truncate()
+        assert journal.read() == []
+    print("✅ Urwany wpis pominięty")
+
+def test_corrupt_middle_entry_keeps_later_entries():
+    """Uszkodzony wpis w środku jest pomijany - wpisy po nim zostają w pliku"""
+    print("🩹 Test uszkodzonego wpisu w środku dziennika")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = ChangeJournal(os.path.join(tmp, "data.journal.jsonl"))
+        journal.append([{'op': 'add', 'item': _item(1)}])
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "edit", "item": \n')
+        journal.append([{'op': 'add', 'item': _item(2)}, {'op': 'delete', 'ids': [1]}])
+        size = os.path.getsize(journal.path)
+        for _ in range(2):
+            entries = ChangeJournal(journal.path).read()
+            assert [e['op'] for e in entries] == ['add', 'add', 'delete']
+            assert os.path.getsize(journal.path) == size
+
+        # poprawny, ale niezakończony ostatni wpis zostaje i dostaje koniec linii
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "delete", "ids": [2]}')
+        assert [e['op'] for e in journal.read()] == ['add', 'add', 'delete', 'delete']
+        journal.append([{'op': 'add', 'item': _item(3)}])
+        assert [d['id'] for d in ChangeJournal.replay({}, journal.read())['rmk_items']] == [3]
+    print("✅ Późniejsze wpisy zachowane")
+
+if __name__ == "__main__":
+    test_replay_operations()
+    test_torn_last_entry()
+    test_corrupt_middle_entry_keeps_later_entries()
+    print("🎯 Testy dziennika zmian zakończone")
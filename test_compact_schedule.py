@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test kolumnowego zapisu harmonogramów (CompactSchedule)
+"""
+
+import os
+import sys
+import json
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import RMKItem, CompactSchedule, LazySchedule, decode_schedule, encode_schedule, schedule_rows
+
+def _legacy_rows(months=36, grosze=False):
+    rows = []
+    for i in range(months):
+        y, m = divmod(2023 * 12 + 10 + i - 1, 12)
+        kwota_gr = 3333 + (i == months - 2)
+        rows.append({'miesiac': f"{y}-{m + 1:02d}", 'kwota': float(kwota_gr / 100) if grosze else 33.33,
+                     'konto': "401-1", 'konto_rmk': "640", 'kategoria': "Licencje"})
+        if grosze:
+            rows[-1]['kwota_gr'] = kwota_gr
+    return rows
+
+def _item(harmonogram):
+    it = RMKItem(1, "Licencja", date(2023, 10, 1), 36, 1200.0, "Firma A", "Licencje", "401-1", "640", "", "")
+    it.harmonogram_generated = True
+    it.harmonogram = harmonogram
+    return it
+
+def test_legacy_rows_roundtrip():
+    """Stary zapis wierszy jest czytany i zapisywany kolumnowo bez zmiany treści"""
+    print("🗜️ Test zapisu kolumnowego")
+    for grosze in (False, True):
+        rows = _legacy_rows(grosze=grosze)
+        legacy = _item(rows).to_dict()
+        legacy['harmonogram'] = rows  # plik sprzed zmiany
+        item = RMKItem.from_dict(legacy)
+        assert isinstance(item.harmonogram.value(), CompactSchedule)
+        assert list(item.harmonogram) == rows and item.harmonogram == rows
+        assert item.harmonogram[0] == rows[0] and item.harmonogram[-1] == rows[-1] and len(item.harmonogram) == 36
+
+        saved = item.to_dict()
+        assert saved['harmonogram']['od'] == "2023-10" and saved['harmonogram']['konto_rmk'] == "640"
+        assert ('kwoty' in saved['harmonogram']) != grosze, "W trybie groszowym zapisywane są tylko grosze"
+        assert len(json.dumps(saved)) < len(json.dumps(legacy)) / 2
+        assert RMKItem.from_dict(json.loads(json.dumps(saved))) == item
+        assert schedule_rows(saved['harmonogram']) == rows
+    print("✅ Harmonogram zapisany kolumnowo")
+
+def test_irregular_rows_stay_legacy():
+    """Wiersze z różnymi kontami, lukami lub dodatkowymi polami zostają listą"""
+    print("📋 Test nieregularnych harmonogramów")
+    rows = _legacy_rows(3)
+    gap = [rows[0], rows[2]]
+    mixed = [rows[0], dict(rows[1], konto="402")]
+    extra = [dict(rows[0], uwagi="ręcznie")]
+    for case in (gap, mixed, extra):
+        assert CompactSchedule.from_rows(case) is None
+        assert encode_schedule(case) == case and decode_schedule(case) == case
+    assert encode_schedule([]) == [] and encode_schedule(None) == [] and decode_schedule([]) == []
+    print("✅ Nieregularne harmonogramy bez zmian")
+
+def test_schedule_loaded_on_first_use():
+    """Treść harmonogramu jest dekodowana dopiero przy pierwszym odczycie"""
+    print("💤 Test leniwego wczytywania harmonogramu")
+    saved = _item(_legacy_rows(grosze=True)).to_dict()
+    item = RMKItem.from_dict(saved)
+    assert isinstance(item.harmonogram, LazySchedule) and not item.harmonogram.loaded
+    # zapis niewczytanego harmonogramu nie wymaga dekodowania
+    assert item.to_dict() == saved and not item.harmonogram.loaded
+    assert all('kwota_gr' in r for r in item.harmonogram) and item.harmonogram.loaded
+    assert item.to_dict() == saved
+
+    calls = []
+    lazy = LazySchedule(lambda: calls.append(1) or _legacy_rows(2))
+    assert calls == [] and len(lazy) == 2 and lazy[1]['miesiac'] == "2023-11" and calls == [1]
+
+    # niewczytana stara lista wierszy jest kodowana tylko przy pierwszym zapisie
+    calls.clear()
+    lazy = LazySchedule(lambda: calls.append(1) or _legacy_rows(3))
+    first = lazy.encoded()
+    assert lazy.encoded() is first and calls == [1] and not lazy.loaded
+    assert list(lazy) == _legacy_rows(3)
+    assert RMKItem.from_dict(dict(saved, harmonogram=[])).harmonogram == []
+    print("✅ Harmonogram wczytany przy pierwszym użyciu")
+
+if __name__ == "__main__":
+    test_legacy_rows_roundtrip()
+    test_irregular_rows_stay_legacy()
+    test_schedule_loaded_on_first_use()
+    print("🎯 Testy zapisu harmonogramów zakończone")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test podziału pozycji RMK wg firm (CompanyItemStore)
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import RMKItem, CompanyItemStore
+
+def _items():
+    firmy = ["Firma A", "Firma B", "", "Firma A", "", "Firma B", "Firma A"]
+    return [RMKItem(i + 1, f"Pozycja {i + 1}", date(2024, 1, 1), 12, 1200.0, f, "Najem", "401", "640", "", "")
+            for i, f in enumerate(firmy)]
+
+def _filtered(items, company):
+    """Dotychczasowy filtr list i raportów"""
+    return [it for it in items if not (company and it.firma and it.firma != company)]
+
+def test_company_views_match_filter():
+    """Widok firmy zawiera jej pozycje i pozycje bez firmy, w kolejności listy"""
+    print("🏢 Test widoków firm")
+    items = _items()
+    store = CompanyItemStore().ensure(items)
+    for company in ["Firma A", "Firma B", "Firma C", ""]:
+        assert [it.id for it in store.company_items(company)] == [it.id for it in _filtered(items, company)]
+    assert sorted(store.companies()) == ["", "Firma A", "Firma B"]
+    print("✅ Widoki firm zgodne z filtrem")
+
+def test_company_store_updates():
+    """Dodanie, zmiana firmy i usunięcie aktualizują tylko właściwe kubełki"""
+    print("🔄 Test aktualizacji kubełków")
+    items = _items()
+    store = CompanyItemStore()
+    store.rebuild(items)
+
+    new = RMKItem(8, "Nowa", date(2024, 5, 1), 6, 600.0, "Firma B", "Licencje", "401", "640", "", "")
+    items.append(new)
+    store.add(new)
+    assert store.company_items("Firma B")[-1] is new
+
+    items[0].firma = "Firma B"  # pozycja 1 przechodzi do innej firmy, zachowując miejsce na liście
+    store.move(items[0])
+    assert [it.id for it in store.company_items("Firma B")] == [it.id for it in _filtered(items, "Firma B")]
+    assert 1 not in [it.id for it in store.company_items("Firma A")]
+
+    items = [it for it in items if it.id != 3]
+    store.remove(3)
+    store.track(items)
+    assert store.ensure(items) is store and len(store) == len(items)
+    assert [it.id for it in store.company_items("Firma A")] == [it.id for it in _filtered(items, "Firma A")]
+
+    # podmieniona lista (np. przypisanie rmk_items) wymusza przebudowę
+    replaced = items[:2]
+    assert [it.id for it in store.ensure(replaced).company_items("Firma A")] == [it.id for it in _filtered(replaced, "Firma A")]
+    print("✅ Kubełki firm aktualne")
+
+def test_id_index_and_sequence():
+    """Wyszukiwanie po id, rosnąca sekwencja id i usuwanie wielu pozycji naraz"""
+    print("🔑 Test indeksu id")
+    items = _items()
+    store = CompanyItemStore().ensure(items)
+    assert store.get(4) is items[3] and store.get(99) is None
+    assert store.next_id == 8
+
+    new_id = store.allocate_id()
+    assert new_id == 8 and store.allocate_id() == 9
+    new = RMKItem(new_id, "Nowa", date(2024, 5, 1), 6, 600.0, "", "Licencje", "401", "640", "", "")
+    items.append(new)
+    store.add(new)
+    assert store.get(8) is new
+
+    store.remove_many({1, 3, 8, 42})
+    items = [it for it in items if it.id not in (1, 3, 8)]
+    store.track(items)
+    assert store.get(1) is None and store.get(8) is None and len(store) == len(items)
+    assert [it.id for it in store.company_items("Firma A")] == [it.id for it in _filtered(items, "Firma A")]
+    assert store.allocate_id() == 10, "Id usuniętych pozycji nie są używane ponownie"
+    print("✅ Indeks id poprawny")
+
+if __name__ == "__main__":
+    test_company_views_match_filter()
+    test_company_store_updates()
+    test_id_index_and_sequence()
+    print("🎯 Testy podziału pozycji wg firm zakończone")
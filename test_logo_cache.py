@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test pamięci logo (LogoCache) - wyszukiwanie raz, potem tylko os.stat
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import LogoCache
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+
+def test_pdf_logo_probed_once():
+    """Kolejne eksporty (i kolejny start) nie sprawdzają obrazów ponownie"""
+    print("🖼️ Test pamięci logo PDF")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "app")
+        _write(os.path.join(base, "logo", "male.png"), 500)
+        _write(os.path.join(base, "logo", "duze.png"), 2000)
+        _write(os.path.join(base, "logo", "opis.txt"), 5000)
+        probed = []
+
+        def size_of(path):
+            probed.append(os.path.basename(path))
+            return (400, 100)
+
+        cache_file = os.path.join(tmp, "logo_cache.json")
+        cache = LogoCache(cache_file, base)
+        for _ in range(3):
+            path, w, h = cache.pdf_logo(size_of)
+        assert os.path.basename(path) == "duze.png" and (w, h) == (80.0, 20.0)
+        assert len(probed) <= 2
+
+        # nowy start: ścieżka, mtime i wymiary z pliku - bez przeszukiwania
+        probed.clear()
+        assert LogoCache(cache_file, base).pdf_logo(size_of) == (path, w, h)
+        assert probed == []
+
+        # zmieniony plik - wyszukanie od nowa
+        time.sleep(0.01)
+        _write(path, 2100)
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        assert LogoCache(cache_file, base).pdf_logo(size_of)[0] == path and probed
+    print("✅ Logo PDF wyszukane raz")
+
+def test_header_logo_and_missing_logo():
+    """Logo nagłówka wg nazw plików; brak logo nie jest zapamiętywany na dysku"""
+    print("🔍 Test logo nagłówka")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "app")
+        os.makedirs(base)
+        cache_file = os.path.join(tmp, "logo_cache.json")
+        empty = LogoCache(cache_file, base)
+        assert empty.pdf_logo(lambda p: (100, 100)) is None
+        assert not os.path.exists(cache_file)
+
+        _write(os.path.join(base, "logo", "RMK insG.png"), 300)
+        cache = LogoCache(cache_file, base)
+        assert cache.header_path() == os.path.join(base, "logo", "RMK insG.png")
+        assert LogoCache(cache_file, base).entries['header']['path'] == cache.header_path()
+    print("✅ Logo nagłówka poprawne")
+
+if __name__ == "__main__":
+    test_pdf_logo_probed_once()
+    test_header_logo_and_missing_logo()
+    print("🎯 Testy pamięci logo zakończone")
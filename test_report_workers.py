@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test liczenia raportów w tle (ReportWorkers) - wynik, błąd i anulowanie
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import ReportWorkers
+
+def test_result_and_error_delivered():
+    """Wynik i wyjątek obliczeń trafiają do zadania, nie do wątku roboczego"""
+    print("🧮 Test wyniku raportu w tle")
+    workers = ReportWorkers()
+    try:
+        job = workers.submit('summary', lambda job: [["Najem", "1 200,00"]])
+        assert job.wait(5) and job.result == [["Najem", "1 200,00"]] and job.error is None
+
+        def broken(job):
+            raise ValueError("zły zakres dat")
+        failed = workers.submit('report', broken)
+        assert failed.wait(5) and isinstance(failed.error, ValueError) and failed.result is None
+        assert not workers.running
+    finally:
+        workers.shutdown()
+    print("✅ Wynik i błąd przekazane")
+
+def test_new_request_cancels_previous():
+    """Ponowne "Generuj" anuluje liczące się zlecenie o tym samym kluczu"""
+    print("🛑 Test anulowania poprzedniego raportu")
+    workers = ReportWorkers()
+    started, release = threading.Event(), threading.Event()
+    rows_done = []
+
+    def slow(job):
+        started.set()
+        for i in range(1000):
+            release.wait(5)
+            job.check()
+            rows_done.append(i)
+        return "stary"
+
+    try:
+        first = workers.submit('summary', slow)
+        assert started.wait(5) and workers.running
+        other = workers.submit('rmk_by_years', lambda job: "inny")
+        second = workers.submit('summary', lambda job: "nowy")
+        assert first.cancelled and not other.cancelled
+        release.set()
+        assert first.wait(5) and second.wait(5) and other.wait(5)
+        assert first.result is None and first.error is None and len(rows_done) < 1000
+        assert second.result == "nowy" and other.result == "inny"
+
+        # przycisk "Anuluj" - wszystkie zlecenia
+        release.clear()
+        started.clear()
+        job = workers.submit('report', slow)
+        assert started.wait(5)
+        workers.cancel_all()
+        release.set()
+        assert job.wait(5) and job.cancelled and not workers.running
+    finally:
+        release.set()
+        workers.shutdown()
+    print("✅ Poprzednie zlecenie anulowane")
+
+if __name__ == "__main__":
+    test_result_and_error_delivered()
+    test_new_request_cancels_previous()
+    print("🎯 Testy raportów w tle zakończone")
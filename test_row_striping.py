@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test kolorowania wierszy widocznego fragmentu tabeli (RowStriper) na atrapie Treeview
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import RowStriper
+
+class FakeTk:
+    def __init__(self):
+        self.calls = []
+
+    def eval(self, script):
+        self.calls.append(script)
+
+class FakeTree:
+    """Atrapa ttk.Treeview: 10 tys. wierszy, widocznych 10 (wiersz 25 px, nagłówek 25 px)"""
+    def __init__(self, rows=10000, top=0):
+        self.order = [f"I{i}" for i in range(rows)]
+        self.pos = {iid: i for i, iid in enumerate(self.order)}
+        self.tags = {iid: () for iid in self.order}
+        self.top = top
+        self.options = {'yscrollcommand': '.sb set', 'style': ''}
+        self.idle = []
+        self.tk = FakeTk()
+        self.item_calls = 0
+
+    def register(self, func):
+        self.command = func
+        return "striper_cmd"
+
+    def cget(self, option):
+        return self.options[option]
+
+    def configure(self, **kw):
+        self.options.update(kw)
+
+    def bind(self, *args, **kw):
+        pass
+
+    def tag_configure(self, *args, **kw):
+        pass
+
+    def after_idle(self, func):
+        self.idle.append(func)
+        return f"after#{len(self.idle)}"
+
+    def after_cancel(self, ident):
+        self.idle.clear()
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for func in idle:
+            func()
+
+    def winfo_ismapped(self):
+        return True
+
+    def winfo_height(self):
+        return 275
+
+    def identify_row(self, y):
+        return self.order[self.top + (y - 25) // 25] if y >= 25 else ''
+
+    def index(self, iid):
+        return self.pos[iid]
+
+    def next(self, iid):
+        pos = self.pos[iid] + 1
+        return self.order[pos] if pos < len(self.order) else ''
+
+    def item(self, iid, option=None, tags=None):
+        if option == 'tags':
+            return self.tags[iid]
+        self.item_calls += 1
+        self.tags[iid] = tuple(tags)
+
+def test_only_viewport_striped():
+    """Kolorowane są tylko widoczne wiersze, a zdarzenia są łączone"""
+    print("🦓 Test kolorowania widocznych wierszy")
+    tree = FakeTree(top=5000)
+    tree.tags["I5002"] = ('gen',)
+    striper = RowStriper.attach(tree)
+    assert RowStriper.attach(tree) is striper
+    assert tree.options['yscrollcommand'] == "striper_cmd"
+
+    # seria przewinięć - polecenie paska wywoływane dalej, kolorowanie raz
+    for _ in range(20):
+        tree.command("0.5", "0.501")
+    assert len(tree.tk.calls) == 20 and tree.tk.calls[0] == ".sb set 0.5 0.501"
+    assert len(tree.idle) == 1
+    tree.run_idle()
+    striped = [iid for iid, tags in tree.tags.items() if 'evenrow' in tags or 'oddrow' in tags]
+    assert 9 <= len(striped) <= 12 and all(5000 <= tree.pos[iid] <= 5011 for iid in striped)
+    assert tree.tags["I5000"] == ('evenrow',) and tree.tags["I5001"] == ('oddrow',)
+    assert tree.tags["I5002"] == ('gen',), "Kolor statusu zostaje"
+
+    # ponowne kolorowanie tego samego okna nie zmienia wierszy
+    calls = tree.item_calls
+    striper.schedule()
+    tree.run_idle()
+    assert tree.item_calls == calls
+    print("✅ Pokolorowane tylko widoczne wiersze")
+
+def test_disabled_per_tree():
+    """Wyłączony striper nie koloruje, a attach go nie tworzy ponownie"""
+    print("🚫 Test wyłączenia kolorowania")
+    tree = FakeTree(rows=50)
+    RowStriper.disable(tree)
+    assert RowStriper.attach(tree) is None and tree.options['yscrollcommand'] == '.sb set'
+
+    tree = FakeTree(rows=50)
+    striper = RowStriper.attach(tree)
+    striper.schedule()
+    RowStriper.disable(tree)
+    tree.run_idle()
+    striper.schedule()
+    assert tree.idle == [] and all(tags == () for tags in tree.tags.values())
+    print("✅ Kolorowanie wyłączone")
+
+if __name__ == "__main__":
+    test_only_viewport_striped()
+    test_disabled_per_tree()
+    print("🎯 Testy kolorowania wierszy zakończone")
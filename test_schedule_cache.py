@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cache harmonogramów pozycji RMK (ScheduleCache)
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import (RMKItem, AggregateStore, ScheduleCache, calculate_monthly_amounts_improved,
+                  calculate_monthly_amounts_batch, NUMPY_AVAILABLE)
+
+def _item(item_id, kwota=12000.0, start=date(2024, 1, 15), mies=12, kategoria="Najem"):
+    return RMKItem(item_id, "Pozycja", start, mies, kwota, "Firma A", kategoria, "401", "640", "", "")
+
+def test_cache_hits_and_input_check():
+    """Powtórne pobranie nie liczy harmonogramu, zmiana danych wymusza przeliczenie"""
+    print("🗂️ Test trafień cache harmonogramów")
+    cache = ScheduleCache()
+    it = _item(1)
+    first = cache.get(it)
+    assert first == calculate_monthly_amounts_improved(it.kwota, it.data_start, it.liczba_mies)
+    assert cache.misses == 1 and cache.hits == 0
+    assert cache.get(it) == first
+    assert cache.hits == 1, "Drugie pobranie powinno trafić w cache"
+
+    # zmiana kwoty bez invalidate() - wpis nie może zostać użyty
+    it.kwota = 6000.0
+    assert cache.get(it) == calculate_monthly_amounts_improved(6000.0, it.data_start, it.liczba_mies)
+    assert cache.misses == 2
+    cache.invalidate(it.id)
+    assert len(cache) == 0
+    print("✅ Cache trafia i wykrywa zmiany")
+
+def test_cache_eviction():
+    """Cache ma ograniczony rozmiar i usuwa najdawniej używane wpisy"""
+    print("♻️ Test wypierania wpisów")
+    cache = ScheduleCache(max_items=3)
+    items = [_item(i) for i in range(1, 5)]
+    for it in items[:3]:
+        cache.get(it)
+    cache.get(items[0])  # odśwież pozycję 1
+    cache.get(items[3])  # wypiera pozycję 2
+    assert len(cache) == 3
+    assert cache.lookup(items[1]) is None
+    assert cache.lookup(items[0]) is not None
+    print("✅ Wypieranie LRU działa")
+
+def test_batch_with_cache():
+    """Macierz złożona z cache jest identyczna z liczoną od zera"""
+    print("🧮 Test rozliczenia wsadowego z cache")
+    items = [_item(i, kwota=1000.0 * i, start=date(2023, i % 12 + 1, i % 27 + 1), mies=i % 30)
+             for i in range(1, 60)]
+    cache = ScheduleCache()
+    fresh_store = AggregateStore(ScheduleCache())
+    fresh_store.rebuild(items)
+    expected = fresh_store.cube().rollup('firma')
+    store = AggregateStore(cache)
+    store.rebuild(items)
+    assert store.cube().rollup('firma') == expected
+    misses = cache.misses
+    store.rebuild(items)
+    assert store.cube().rollup('firma') == expected
+    assert cache.misses == misses, "Ponowna agregacja nie powinna niczego przeliczać"
+    if NUMPY_AVAILABLE:
+        fresh = calculate_monthly_amounts_batch(items)
+        cached = calculate_monthly_amounts_batch(items, cache)
+        assert (fresh.amounts == cached.amounts).all()
+    print("✅ Agregacja z cache zgodna")
+
+if __name__ == "__main__":
+    test_cache_hits_and_input_check()
+    test_cache_eviction()
+    test_batch_with_cache()
+    print("🎯 Testy cache harmonogramów zakończone")
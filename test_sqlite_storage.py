@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test magazynu danych SQLite (SQLiteStorage)
+"""
+
+import os
+import sys
+import json
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import SQLiteStorage, RMKItem, LazySchedule
+
+def _state():
+    items = [RMKItem(1, "Polisa", date(2024, 1, 15), 12, 1200.0, "Firma A", "Ubezpieczenia", "401", "640", "F/1", "PZU",
+                     "uwaga", date(2024, 12, 31)),
+             RMKItem(2, "Licencja", date(2024, 3, 1), 2, 300.0, "", "Licencje", "402", "641", "", "")]
+    items[0].harmonogram_generated = True
+    items[0].harmonogram = [{'miesiac': "2024-01", 'kwota': 55.56, 'konto': "401", 'konto_rmk': "640", 'kategoria': "Ubezpieczenia"},
+                            {'miesiac': "2024-02", 'kwota': 100.0, 'kwota_gr': 10000, 'konto': "401", 'konto_rmk': "640",
+                             'kategoria': "Ubezpieczenia"}]
+    return {
+        'users': {'admin': {'password': 'admin', 'is_admin': True, 'companies': ['Firma A']}},
+        'companies': ["Firma A", "Firma B"],
+        'categories': ["Ubezpieczenia", "Licencje"],
+        'accounts': [],
+        'rmk_accounts': [],
+        'accounts_by_company': {"Firma A": [{'konto': "401", 'opis': "Koszty"}, {'konto': "402", 'opis': ""}]},
+        'rmk_accounts_by_company': {"Firma A": [{'konto': "640", 'opis': "RMK"}]},
+        'rmk_items': [it.to_dict() for it in items],
+        'amortization_mode': "grosze",
+        'next_item_id': 5,
+        'view_state': {'rmk_next_year': 2025, 'report_filters': {'od': "2024-01", 'do': "2024-12"}},
+    }
+
+def _items(obj):
+    return [RMKItem.from_dict(d) for d in obj['rmk_items']]
+
+def test_roundtrip_and_indexes():
+    """Zapis i odczyt dają ten sam stan co data.json; tabela pozycji ma indeksy"""
+    print("🗄️ Test zapisu i odczytu SQLite")
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "data.db"))
+        assert storage.is_empty()
+        state = _state()
+        storage.save_all(state)
+        storage.close()
+
+        loaded = SQLiteStorage(os.path.join(tmp, "data.db")).load()
+        for key in state:
+            if key != 'rmk_items':
+                assert loaded[key] == state[key], key
+        assert _items(loaded) == _items(state)
+        assert 'kwota_gr' not in loaded['rmk_items'][0]['harmonogram'][0]
+
+        storage = SQLiteStorage(os.path.join(tmp, "data.db"))
+        indexes = {row[0] for row in storage.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_items_firma", "idx_items_kategoria", "idx_items_konto_rmk", "idx_items_data_start"} <= indexes
+        plan = storage.conn.execute("EXPLAIN QUERY PLAN SELECT id FROM items WHERE firma = ?", ("Firma A",)).fetchall()
+        assert any("idx_items_firma" in str(row) for row in plan)
+        storage.close()
+    print("✅ Stan odczytany bez zmian")
+
+def test_per_row_save():
+    """Zapis obejmuje tylko zmienione i usunięte pozycje"""
+    print("✏️ Test zapisu pojedynczych pozycji")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.db")
+        storage = SQLiteStorage(path)
+        state = _state()
+        storage.save_all(state)
+        items = _items(state)
+
+        meta = {k: v for k, v in state.items() if k != 'rmk_items'}
+        items[1].kwota = 450.0
+        items[1].harmonogram = [{'miesiac': "2024-03", 'kwota': 450.0, 'konto': "402", 'konto_rmk': "641", 'kategoria': "Licencje"}]
+        new = RMKItem(3, "Najem", date(2025, 1, 1), 6, 600.0, "Firma B", "Najem", "401", "640", "", "")
+        meta['view_state'] = {'rmk_next_year': 2026}
+        storage.save(meta, [items[1].to_dict(), new.to_dict()], [1])
+        assert storage.load()['view_state'] == state['view_state'], "Stan widoków ma osobny zapis"
+        storage.save_view_state({'rmk_next_year': 2026})
+        storage.close()
+
+        loaded = SQLiteStorage(path).load()
+        assert [it.id for it in _items(loaded)] == [2, 3]
+        assert [it.to_dict() for it in _items(loaded)] == [items[1].to_dict(), new.to_dict()]
+        assert loaded['view_state'] == {'rmk_next_year': 2026}
+        assert loaded['accounts_by_company'] == state['accounts_by_company']
+
+        storage = SQLiteStorage(path)
+        assert storage.conn.execute("SELECT COUNT(*) FROM schedule_rows WHERE item_id = 1").fetchone()[0] == 0
+        storage.close()
+    print("✅ Zapis pozycji poprawny")
+
+def test_migration_from_json():
+    """Jednorazowa migracja data.json do pustej bazy; plik JSON zostaje"""
+    print("🚚 Test migracji data.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "data.json")
+        state = _state()
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        storage = SQLiteStorage(os.path.join(tmp, "data.db"))
+        assert storage.migrate_from_json(json_path)
+        assert os.path.exists(json_path)
+        assert not storage.migrate_from_json(json_path), "Migracja tylko do pustej bazy"
+        assert _items(storage.load()) == _items(state)
+
+        backup = os.path.join(tmp, "kopia.db")
+        storage.backup_to(backup)
+        storage.close()
+        assert _items(SQLiteStorage(backup).load()) == _items(state)
+    print("✅ Migracja poprawna")
+
+def test_lazy_schedule_rows():
+    """Przy leniwym odczycie wiersze harmonogramu są czytane dopiero przy użyciu"""
+    print("💤 Test leniwego odczytu harmonogramów")
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "data.db"))
+        state = _state()
+        storage.save_all(state)
+        loaded = storage.load(lazy_schedules=True)
+        items = _items(loaded)
+        assert all(isinstance(it.harmonogram, LazySchedule) and not it.harmonogram.loaded for it in items)
+        assert items == _items(state)
+        assert storage.load_schedule(1) == state['rmk_items'][0]['harmonogram'] and storage.load_schedule(2) == []
+        storage.close()
+    print("✅ Harmonogramy czytane przy użyciu")
+
+if __name__ == "__main__":
+    test_roundtrip_and_indexes()
+    test_lazy_schedule_rows()
+    test_per_row_save()
+    test_migration_from_json()
+    print("🎯 Testy magazynu SQLite zakończone")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test szybkiego startu: leniwe importy zależności i pomiar faz startu
+"""
+
+import os
+import sys
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import lazy_import, StartupTimer
+
+def test_heavy_dependencies_not_imported_at_startup():
+    """Import main nie ładuje openpyxl, reportlab ani ttkbootstrap"""
+    print("🚀 Test leniwych importów")
+    code = ("import sys, main; "
+            "print(sorted(m for m in ('openpyxl', 'reportlab', 'ttkbootstrap') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+    assert lazy_import('json') is sys.modules['json']
+    assert lazy_import('brak_takiego_modulu_rmk') is None
+    assert lazy_import('brak_takiego_modulu_rmk') is None
+    print("✅ Zależności importowane przy pierwszym użyciu")
+
+def test_startup_timer_phases():
+    """Fazy startu są sumowane w kolejności znaczników"""
+    print("⏱️ Test pomiaru faz startu")
+    timer = StartupTimer()
+    timer.mark('import')
+    timer.mark('style')
+    timer.add('load (w tle)', 0.25)
+    timer.mark('import')
+    assert list(timer.phases) == ['import', 'style', 'load (w tle)']
+    assert all(v >= 0 for v in timer.phases.values())
+    assert "load (w tle) 250 ms" in timer.summary()
+    print("✅ Pomiar faz poprawny")
+
+if __name__ == "__main__":
+    test_heavy_dependencies_not_imported_at_startup()
+    test_startup_timer_phases()
+    print("🎯 Testy startu zakończone")
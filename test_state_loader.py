@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test wczytywania stanu w tle (StateLoader)
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import StateLoader
+
+def test_meta_ready_before_done():
+    """Dane logowania są dostępne, zanim wczytywanie pozycji się skończy"""
+    print("⏳ Test etapów wczytywania")
+    release = threading.Event()
+
+    def read(on_meta):
+        on_meta({'users': {'admin': {}}, 'companies': ["Firma A"]})
+        release.wait(5)
+        return {'rmk_items': [1, 2, 3]}
+
+    loader = StateLoader(read)
+    assert loader.meta_ready.wait(5)
+    assert loader.meta['companies'] == ["Firma A"] and not loader.done.is_set()
+    release.set()
+    assert loader.done.wait(5)
+    assert loader.result == {'rmk_items': [1, 2, 3]} and loader.error is None
+    print("✅ Etapy wczytywania poprawne")
+
+def test_error_and_missing_data_release_waiters():
+    """Błąd odczytu lub brak danych nie blokuje splash ani logowania"""
+    print("⚠️ Test błędów wczytywania")
+
+    def broken(on_meta):
+        raise ValueError("uszkodzony plik")
+
+    loader = StateLoader(broken)
+    assert loader.done.wait(5) and loader.meta_ready.is_set()
+    assert isinstance(loader.error, ValueError) and loader.meta is None
+
+    loader = StateLoader(lambda on_meta: None)
+    assert loader.done.wait(5) and loader.meta_ready.is_set()
+    assert loader.result is None and loader.error is None
+    print("✅ Błędy obsłużone")
+
+if __name__ == "__main__":
+    test_meta_ready_before_done()
+    test_error_and_missing_data_release_waiters()
+    print("🎯 Testy wczytywania w tle zakończone")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test zapisu stanu w tle (StateSaver, write_json_atomic)
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import StateSaver, write_json_atomic
+
+def test_saver_coalesces_bursts():
+    """Seria migawek kończy się jednym zapisem ostatniej"""
+    print("💾 Test łączenia zapisów")
+    writes = []
+    saver = StateSaver(writes.append, delay=0.05)
+    for i in range(50):
+        saver.submit({'wersja': i})
+    assert saver.pending
+    assert saver.flush(timeout=5)
+    assert writes == [{'wersja': 49}] and not saver.pending
+
+    merged = []
+    saver = StateSaver(merged.append, delay=0.05, merge=lambda old, new: old | new)
+    saver.submit({1})
+    saver.submit({2})
+    saver.flush(timeout=5)
+    assert merged == [{1, 2}]
+    saver.close()
+    print("✅ Zapisy połączone")
+
+def test_failed_write_is_retried():
+    """Nieudany zapis wraca do kolejki i jest ponawiany"""
+    print("🔁 Test ponowienia zapisu")
+    writes = []
+    failures = [IOError("dysk pełny")]
+
+    def write(snapshot):
+        if failures:
+            raise failures.pop()
+        writes.append(snapshot)
+
+    saver = StateSaver(write, delay=0.5)
+    saver.RETRY_DELAY = 0.05
+    saver.submit("stan")
+    assert not saver.flush(timeout=5)
+    assert saver.last_error is not None and saver.pending
+    deadline = time.monotonic() + 5
+    while saver.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writes == ["stan"] and saver.last_error is None
+    print("✅ Zapis ponowiony")
+
+def test_write_json_atomic():
+    """Plik JSON jest podmieniany w całości, bez pliku tymczasowego"""
+    print("📝 Test atomowego zapisu JSON")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dane", "data.json")
+        write_json_atomic(path, {'firma': "Zażółć"})
+        write_json_atomic(path, {'firma': "Nowa"})
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f) == {'firma': "Nowa"}
+        assert os.listdir(os.path.dirname(path)) == ["data.json"]
+    print("✅ Zapis atomowy poprawny")
+
+if __name__ == "__main__":
+    test_saver_coalesces_bursts()
+    test_failed_write_is_retried()
+    test_write_json_atomic()
+    print("🎯 Testy zapisu w tle zakończone")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test wypełniania tabel porcjami (TreePopulator) na atrapie Treeview
+"""
+
+import os
+import sys
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import TreePopulator
+
+class FakeTree:
+    """Atrapa Treeview z ręcznie uruchamianą kolejką after()"""
+    def __init__(self):
+        self.rows = []
+        self.queue = []
+        self.destroyed = False
+
+    def insert(self, parent, index, values):
+        if self.destroyed:
+            raise tk.TclError('invalid command name ".!treeview"')
+        self.rows.append(values)
+
+    def after(self, ms, func):
+        self.queue.append(func)
+        return f"after#{len(self.queue)}"
+
+    def after_cancel(self, ident):
+        self.queue.clear()
+
+    def run_pending(self):
+        queue, self.queue = self.queue, []
+        for func in queue:
+            func()
+
+class Clock:
+    """Zegar przesuwany o 10 ms przy każdym odczycie - porcja to 3 wiersze"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.010
+        return self.now
+
+def test_rows_inserted_in_slices():
+    """Wiersze trafiają do tabeli porcjami, z postępem i wywołaniem on_done"""
+    print("🧩 Test wstawiania porcjami")
+    tree, progress, done = FakeTree(), [], []
+    populator = TreePopulator(tree, [[i] for i in range(10)], progress=lambda d, t: progress.append((d, t)),
+                              on_done=lambda: done.append(True), clock=Clock()).start()
+    assert len(tree.rows) == 3 and populator.active and progress == [(3, 10)]
+    while tree.queue:
+        tree.run_pending()
+    assert tree.rows == [[i] for i in range(10)] and populator.finished and done == [True]
+    assert progress[-1] == (10, 10)
+
+    # generator - liczba wierszy nieznana
+    gen = TreePopulator(FakeTree(), ([i] for i in range(2)), progress=lambda d, t: progress.append((d, t))).start()
+    assert gen.finished and progress[-1] == (2, None)
+    print("✅ Wiersze wstawione porcjami")
+
+def test_cancel_and_destroyed_tree():
+    """Anulowanie i zniszczona tabela przerywają wstawianie"""
+    print("🛑 Test przerwania wstawiania")
+    tree, done = FakeTree(), []
+    populator = TreePopulator(tree, [[i] for i in range(100)], on_done=lambda: done.append(True), clock=Clock()).start()
+    populator.cancel()
+    tree.run_pending()
+    assert len(tree.rows) == 3 and populator.cancelled and not populator.active and done == []
+
+    tree = FakeTree()
+    populator = TreePopulator(tree, [[i] for i in range(100)], clock=Clock()).start()
+    tree.destroyed = True
+    tree.run_pending()
+    assert populator.cancelled and tree.queue == []
+    print("✅ Wstawianie przerwane")
+
+if __name__ == "__main__":
+    test_rows_inserted_in_slices()
+    test_cancel_and_destroyed_tree()
+    print("🎯 Testy wypełniania tabel zakończone")
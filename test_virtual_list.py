@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test wirtualnej listy RMK (VirtualTreeview) na atrapie Treeview
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import VirtualTreeview
+
+class FakeTree:
+    """Minimalna atrapa ttk.Treeview - tylko to, czego używa VirtualTreeview"""
+    def __init__(self, height=10):
+        self.rows = {}
+        self.order = []
+        self.selected = []
+        self.focused = ''
+        self.height = height
+        self.master = self
+        self.inserts = 0
+
+    def configure(self, **kw):
+        pass
+
+    def bind(self, *args, **kw):
+        pass
+
+    def cget(self, option):
+        return {'height': self.height, 'style': ''}[option]
+
+    def winfo_height(self):
+        return 1
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.order.remove(iid)
+            del self.rows[iid]
+        self.selected = [iid for iid in self.selected if iid in self.rows]
+
+    def insert(self, parent, index, iid, values, tags):
+        self.rows[iid] = (values, tags)
+        self.order.append(iid)
+        self.inserts += 1
+
+    def item(self, iid, values, tags):
+        self.rows[iid] = (values, tags)
+
+    def exists(self, iid):
+        return iid in self.rows
+
+    def selection(self):
+        return tuple(self.selected)
+
+    def selection_set(self, iids):
+        self.selected = list(iids)
+
+    def focus(self, iid=None):
+        if iid is None:
+            return self.focused
+        self.focused = iid
+
+class FakeScrollbar:
+    def configure(self, **kw):
+        pass
+
+    def set(self, first, last):
+        self.fractions = (first, last)
+
+class Row:
+    def __init__(self, row_id):
+        self.id = row_id
+
+def _row(obj):
+    return str(obj.id), (obj.id, f"Pozycja {obj.id}"), ('gen',) if obj.id % 2 else ('ungen',)
+
+def test_only_visible_window_materialized():
+    """Przy 50 tys. wierszy Treeview trzyma tylko widoczne okno"""
+    print("📜 Test wirtualnej listy")
+    tree, bar = FakeTree(height=10), FakeScrollbar()
+    lst = VirtualTreeview(tree, bar, _row)
+    lst.set_rows([Row(i) for i in range(1, 50001)])
+    assert lst.virtual and tree.get_children() == tuple(str(i) for i in range(1, 11))
+    assert tree.rows['1'][1] == ('gen',) and bar.fractions == (0.0, 10 / 50000)
+
+    lst.yview('moveto', 0.5)
+    assert tree.get_children()[0] == "25001" and len(tree.get_children()) == 10
+    lst.yview('scroll', 1, 'pages')
+    assert tree.get_children()[0] == "25010"
+    lst.yview('moveto', 1.0)
+    assert tree.get_children()[-1] == "50000"
+
+    # wartości i zaznaczenie dostępne także dla wierszy spoza okna
+    assert lst.values("7") == (7, "Pozycja 7")
+    tree.selection_set(["49995"])
+    lst._on_select()
+    lst.scroll_to(0)
+    assert lst.selection() == ("49995",) and tree.selection() == ()
+    print("✅ Materializowane tylko widoczne wiersze")
+
+def test_keyboard_and_small_lists():
+    """Strzałka za krawędzią okna przesuwa okno; małe listy są wstawiane w całości"""
+    print("⌨️ Test przewijania klawiaturą")
+    tree, bar = FakeTree(height=5), FakeScrollbar()
+    lst = VirtualTreeview(tree, bar, _row, threshold=20)
+    lst.set_rows([Row(i) for i in range(1, 101)])
+    tree.focus("5")
+    assert lst._on_key(1, False) == 'break'
+    assert tree.get_children()[-1] == "6" and lst.selection() == ("6",) and tree.focus() == "6"
+    tree.focus("3")
+    assert lst._on_key(1, False) is None  # w obrębie okna - zwykła obsługa Treeview
+
+    # Shift na krawędzi okna rozszerza zaznaczenie, także o wiersze już niewidoczne
+    lst.scroll_to(0)
+    tree.selection_set(["1", "2", "3", "4", "5"])
+    lst._on_select()
+    tree.focus("5")
+    assert lst._on_key(1, False, True) == 'break' and not lst._replace_selection
+    assert lst.selection() == ("1", "2", "3", "4", "5", "6") and "1" not in tree.get_children()
+    assert lst._on_key(1, True, True) == 'break'
+    assert lst.selection() == tuple(str(i) for i in range(1, 11))
+    tree.focus("6")
+    lst._on_key(1, False)
+    assert lst._replace_selection
+    tree.selection_set(["6"])
+    lst._on_select()
+    assert lst.selection() == ("6",)
+
+    lst.remove_rows(["6"] + [str(i) for i in range(21, 101)])
+    assert not lst.virtual and len(tree.get_children()) == 19 and lst.selection() == ()
+    print("✅ Klawiatura i małe listy poprawne")
+
+def test_incremental_updates():
+    """Dodanie, edycja i usunięcie pozycji zmieniają tylko dotknięte wiersze"""
+    print("✏️ Test przyrostowego odświeżania")
+    for rows, threshold in ((100, 1000), (5000, 1000)):
+        tree, bar = FakeTree(height=10), FakeScrollbar()
+        lst = VirtualTreeview(tree, bar, _row, threshold=threshold)
+        items = [Row(i) for i in range(1, rows + 1)]
+        lst.set_rows(items)
+        before = tree.inserts
+
+        edited = items[2]
+        tree.rows["3"] = None
+        lst.update_row(edited)
+        assert tree.rows["3"] == ((3, "Pozycja 3"), ('gen',)) and tree.inserts == before
+
+        lst.remove_rows(["2"])
+        assert "2" not in tree.rows and lst.values("4") == (4, "Pozycja 4")
+        assert lst.selection() == () and len(lst) == rows - 1
+        new = Row(rows + 1)
+        lst.add_row(new)
+        assert lst.get(str(rows + 1)) is new and lst.values(str(rows + 1))[0] == rows + 1
+        if lst.virtual:
+            # koniec listy poza oknem - Treeview bez zmian
+            assert str(rows + 1) not in tree.rows and len(tree.get_children()) == 10
+        else:
+            assert tree.get_children()[-1] == str(rows + 1) and tree.inserts == before + 1
+    print("✅ Odświeżane tylko zmienione wiersze")
+
+if __name__ == "__main__":
+    test_only_visible_window_materialized()
+    test_keyboard_and_small_lists()
+    test_incremental_updates()
+    print("🎯 Testy wirtualnej listy zakończone")